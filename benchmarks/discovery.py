@@ -0,0 +1,117 @@
+"""
+Benchmark of file discovery on a package surrounded by the kind of junk real
+checkouts have: node_modules, build output and a virtualenv, all of which are
+listed in .gitignore. Compares the scandir walker with the os.walk based walker
+it replaced. Run with: python -m benchmarks.discovery
+"""
+
+import argparse
+import os
+import os.path
+import tempfile
+import time
+
+from pycodegraph.analysis.discovery import walk_python_files
+from .generate import generate_tree
+
+GITIGNORE = "node_modules/\nbuild/\nvenv/\n*.egg-info/\n"
+
+
+def walk_python_files_os_walk(root_path, exclude=None, filter=None):
+    """
+    The os.walk based walker find_module_files used to use, for comparison.
+    """
+    exclude = set(exclude or [])
+    filter = set(filter) if filter else None
+
+    def dir_excluded(path):
+        if path.startswith("."):
+            return True
+        if path in exclude:
+            return True
+        if filter is not None:
+            return path not in filter
+        return False
+
+    for root, dirs, files in os.walk(root_path):
+        dirs[:] = [d for d in dirs if not dir_excluded(d)]
+        for file in files:
+            path = os.path.join(root, file)
+            relpath = os.path.relpath(path, root_path)
+            if file.endswith(".py"):
+                yield relpath, path
+
+
+def generate_junk(root_path, dirs, files_per_dir, python_share=0.1):
+    """
+    Write dirs directories of files_per_dir files each below root_path, spread
+    over two levels, some of them python files.
+    """
+    for dir_idx in range(dirs):
+        path = os.path.join(root_path, "dep%d" % (dir_idx // 10), "sub%d" % dir_idx)
+        os.makedirs(path, exist_ok=True)
+        for file_idx in range(files_per_dir):
+            is_python = file_idx < files_per_dir * python_share
+            name = "file%d.%s" % (file_idx, "py" if is_python else "js")
+            with open(os.path.join(path, name), "w"):
+                pass
+
+
+def generate_checkout(root_path, files=1000, junk_dirs=200, junk_files=100):
+    generate_tree(root_path, files=files, filler=0)
+    with open(os.path.join(root_path, ".gitignore"), "w") as filehandle:
+        filehandle.write(GITIGNORE)
+    for name in ("node_modules", "build", "venv"):
+        generate_junk(os.path.join(root_path, name), junk_dirs, junk_files)
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in func())
+        times.append(time.perf_counter() - start)
+    return min(times), count
+
+
+def run(root_path, repeat=3, threads=4):
+    scenarios = [
+        ("os.walk", lambda: walk_python_files_os_walk(root_path)),
+        (
+            "scandir, no ignore files",
+            lambda: walk_python_files(root_path, ignore_files=False),
+        ),
+        ("scandir", lambda: walk_python_files(root_path)),
+        (
+            "scandir, %d threads" % threads,
+            lambda: walk_python_files(root_path, threads=threads),
+        ),
+    ]
+    results = []
+    for name, func in scenarios:
+        seconds, count = best_time(func, repeat)
+        results.append({"walker": name, "seconds": seconds, "files": count})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--junk-dirs", type=int, default=200)
+    parser.add_argument("--junk-files", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        generate_checkout(tmpdir, args.files, args.junk_dirs, args.junk_files)
+        print("%-28s %10s %8s" % ("walker", "time", "files"))
+        for result in run(tmpdir, args.repeat, args.threads):
+            print(
+                "%-28s %9.3fs %8d"
+                % (result["walker"], result["seconds"], result["files"])
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Generate synthetic Python package trees to benchmark against.
+"""
+
+import argparse
+import os
+import os.path
+import random
+
+EXTERNAL_MODULES = ["os", "sys", "json", "typing", "collections", "requests", "yaml"]
+
+FILLER = '''
+
+def function_{idx}(arg, *args, **kwargs):
+    """Docstring mentioning import {idx} in some text."""
+    result = [x * {idx} for x in range(arg) if x % 3]
+    if args:
+        return {{"key": result, "other": kwargs.get("other", "import")}}
+    return result
+
+
+class Class{idx}(object):
+    attribute = "from x import y"
+
+    def method(self, value):
+        return function_{idx}(value) or None
+'''
+
+
+def _module_path(root_path, module, is_package=False):
+    path = os.path.join(root_path, *module.split("."))
+    if is_package:
+        return os.path.join(path, "__init__.py")
+    return path + ".py"
+
+
+def generate_tree(
+    root_path,
+    files=1000,
+    nesting=3,
+    branching=8,
+    imports_per_file=10,
+    relative_share=0.2,
+    external_share=0.2,
+    filler=5,
+    package="synth",
+    seed=0,
+):
+    """
+    Write a package named `package` with `files` modules in up to `nesting`
+    levels of subpackages to root_path, along with a setup.py. Each module gets
+    `imports_per_file` imports, of which roughly `relative_share` are relative
+    imports of sibling modules and `external_share` are imports of modules
+    outside the package, plus `filler` functions and classes.
+
+    Returns a list of the generated module names.
+    """
+    rng = random.Random(seed)
+    os.makedirs(root_path, exist_ok=True)
+    with open(os.path.join(root_path, "setup.py"), "w") as filehandle:
+        filehandle.write("import setuptools\nsetuptools.setup(name=%r)\n" % package)
+
+    packages = set([package])
+    modules = []
+    by_package = {}
+    for idx in range(files):
+        parts = [package]
+        for _ in range(rng.randint(0, nesting)):
+            parts.append("sub%d" % rng.randrange(branching))
+            packages.add(".".join(parts))
+        parent = ".".join(parts)
+        module = "%s.mod%d" % (parent, idx)
+        modules.append(module)
+        by_package.setdefault(parent, []).append(module)
+
+    for pkg in packages:
+        path = _module_path(root_path, pkg, is_package=True)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as filehandle:
+            filehandle.write('"""Package %s."""\n' % pkg)
+
+    for module in modules:
+        parent, _, _ = module.rpartition(".")
+        lines = ['"""Module %s."""' % module]
+        for _ in range(imports_per_file):
+            roll = rng.random()
+            if roll < external_share:
+                lines.append("import %s" % rng.choice(EXTERNAL_MODULES))
+            elif roll < external_share + relative_share:
+                sibling = rng.choice(by_package[parent]).rpartition(".")[2]
+                lines.append("from . import %s" % sibling)
+            else:
+                target = rng.choice(modules)
+                target_parent, _, target_name = target.rpartition(".")
+                lines.append("from %s import %s" % (target_parent, target_name))
+        for idx in range(filler):
+            lines.append(FILLER.format(idx=idx))
+        with open(_module_path(root_path, module), "w") as filehandle:
+            filehandle.write("\n".join(lines) + "\n")
+
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=generate_tree.__doc__)
+    parser.add_argument("path")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--nesting", type=int, default=3)
+    parser.add_argument("--branching", type=int, default=8)
+    parser.add_argument("--imports-per-file", type=int, default=10)
+    parser.add_argument("--relative-share", type=float, default=0.2)
+    parser.add_argument("--external-share", type=float, default=0.2)
+    parser.add_argument("--filler", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_tree(
+        args.path,
+        files=args.files,
+        nesting=args.nesting,
+        branching=args.branching,
+        imports_per_file=args.imports_per_file,
+        relative_share=args.relative_share,
+        external_share=args.external_share,
+        filler=args.filler,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Microbenchmark of module_matches vs. ModuleMatcher as the number of patterns
+grows. Run with: python -m benchmarks.matcher
+"""
+
+import random
+import timeit
+
+from pycodegraph.analysis.imports import module_matches
+from pycodegraph.analysis.matcher import ModuleMatcher
+
+
+def make_modules(count, rng):
+    return [
+        ".".join("mod%d" % rng.randrange(50) for _ in range(rng.randint(1, 4)))
+        for _ in range(count)
+    ]
+
+
+def run(pattern_counts=(1, 10, 100, 1000), module_count=2000, seed=0):
+    rng = random.Random(seed)
+    modules = make_modules(module_count, rng)
+    results = []
+    for pattern_count in pattern_counts:
+        prefixes = make_modules(pattern_count, rng)
+        globs = ["*.%s" % p for p in make_modules(pattern_count, rng)]
+        for kind, patterns in (("prefix", prefixes), ("glob", prefixes + globs)):
+            matcher = ModuleMatcher(patterns, allow_fnmatch=True)
+
+            def old():
+                for module in modules:
+                    module_matches(module, patterns, allow_fnmatch=True)
+
+            def new():
+                for module in modules:
+                    matcher.matches(module)
+
+            number = 3
+            old_time = min(timeit.repeat(old, number=number, repeat=3))
+            new_time = min(timeit.repeat(new, number=number, repeat=3))
+            results.append(
+                {
+                    "kind": kind,
+                    "patterns": len(patterns),
+                    "module_matches_ns": old_time / number / module_count * 1e9,
+                    "matcher_ns": new_time / number / module_count * 1e9,
+                }
+            )
+    return results
+
+
+def main():
+    print("%-8s %8s %18s %12s" % ("kind", "patterns", "module_matches", "matcher"))
+    for result in run():
+        print(
+            "%-8s %8d %15.0f ns %9.0f ns"
+            % (
+                result["kind"],
+                result["patterns"],
+                result["module_matches_ns"],
+                result["matcher_ns"],
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Time each phase of an import analysis on synthetic package trees, and save the
+results as JSON so that runs can be compared across commits.
+
+    python -m benchmarks.run --sizes 1000,10000 --json before.json
+    python -m benchmarks.run --sizes 1000,10000 --compare before.json
+"""
+
+import argparse
+import json
+import os
+import os.path
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+
+from pycodegraph.analysis import find_module_files
+from pycodegraph.analysis.imports import ImportAnalysis, find_imports_in_file
+from pycodegraph.renderers.graphviz import render_to
+
+from .generate import generate_tree
+
+
+class MemoryParseCache:
+    """
+    Stand-in for ParseCache holding already parsed imports in memory, so that
+    resolution can be timed without parsing.
+    """
+
+    hits = misses = 0
+
+    def __init__(self, imports):
+        self.imports = imports
+
+    def find_imports_in_file(self, path, root_path=None, scanner="ast", **kwargs):
+        return self.imports[path]
+
+    def pop_stats(self):
+        return {}
+
+    def maybe_prune(self):
+        pass
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def _best_of(repeat, func):
+    best, result = _timed(func)
+    for _ in range(repeat - 1):
+        best = min(best, _timed(func)[0])
+    return best, result
+
+
+def run_scenarios(tree_path, repeat=1, depth=10):
+    """
+    Run all scenarios against a generated tree. Generates (scenario, seconds)
+    tuples.
+    """
+    package_path = os.path.join(tree_path, "synth")
+
+    seconds, module_files = _best_of(
+        repeat, lambda: list(find_module_files(package_path))
+    )
+    yield "discovery", seconds
+
+    root_path = tree_path
+    for scanner in ("ast", "fast"):
+        seconds, raw_imports = _best_of(
+            repeat,
+            lambda: {
+                path: list(find_imports_in_file(path, root_path, scanner=scanner))
+                for _, path in module_files
+            },
+        )
+        yield "parsing_%s" % scanner, seconds
+
+    analysis = ImportAnalysis(
+        package_path, depth=depth, include=[], cache=MemoryParseCache(raw_imports)
+    )
+    seconds, graph = _best_of(repeat, analysis.find_imports)
+    yield "resolution", seconds
+
+    with open(os.devnull, "w") as devnull:
+        seconds, _ = _best_of(repeat, lambda: render_to(devnull, graph))
+    yield "rendering", seconds
+
+    seconds, _ = _best_of(
+        repeat,
+        lambda: ImportAnalysis(package_path, depth=depth, include=[]).find_imports(),
+    )
+    yield "end_to_end", seconds
+
+
+def _git_commit():
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat=1, depth=10, **generate_kwargs):
+    results = []
+    for size in sizes:
+        tree_path = tempfile.mkdtemp(prefix="pycodegraph-bench-")
+        try:
+            generate_tree(tree_path, files=size, **generate_kwargs)
+            for scenario, seconds in run_scenarios(
+                tree_path, repeat=repeat, depth=depth
+            ):
+                results.append(
+                    {"scenario": scenario, "files": size, "seconds": seconds}
+                )
+                print("%-12s %8d files %10.3fs" % (scenario, size, seconds))
+        finally:
+            shutil.rmtree(tree_path)
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        "results": results,
+    }
+
+
+def compare(baseline, current):
+    baseline_seconds = {
+        (r["scenario"], r["files"]): r["seconds"] for r in baseline["results"]
+    }
+    print(
+        "%-12s %8s %10s %10s %8s"
+        % ("scenario", "files", "baseline", "current", "change")
+    )
+    for result in current["results"]:
+        key = (result["scenario"], result["files"])
+        if key not in baseline_seconds:
+            continue
+        before = baseline_seconds[key]
+        after = result["seconds"]
+        print(
+            "%-12s %8d %9.3fs %9.3fs %+7.1f%%"
+            % (key[0], key[1], before, after, (after - before) / before * 100)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        help="comma separated list of numbers of files to generate",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--depth", type=int, default=10, help="depth to analyze and render at"
+    )
+    parser.add_argument("--imports-per-file", type=int, default=10)
+    parser.add_argument("--nesting", type=int, default=3)
+    parser.add_argument("--relative-share", type=float, default=0.2)
+    parser.add_argument("--external-share", type=float, default=0.2)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="compare against results in this file")
+    args = parser.parse_args()
+
+    results = run(
+        [int(size) for size in args.sizes.split(",")],
+        repeat=args.repeat,
+        depth=args.depth,
+        imports_per_file=args.imports_per_file,
+        nesting=args.nesting,
+        relative_share=args.relative_share,
+        external_share=args.external_share,
+    )
+    if args.json:
+        with open(args.json, "w") as filehandle:
+            json.dump(results, filehandle, indent=2)
+    if args.compare:
+        with open(args.compare) as filehandle:
+            compare(json.load(filehandle), results)
+
+
+if __name__ == "__main__":
+    main()
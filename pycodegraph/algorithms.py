@@ -0,0 +1,233 @@
+"""
+Graph algorithms operating on ImportGraphs. Everything here is iterative, so
+that it works on graphs far larger than the recursion limit.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import deque
+import re
+
+from pycodegraph.analysis.matcher import ModuleMatcher
+from pycodegraph.graph import ImportGraphBuilder
+
+
+def strongly_connected_components(graph):
+    """
+    Find the strongly connected components of a graph using Tarjan's
+    algorithm. Returns a list of lists of module ids, in reverse topological
+    order: no component has edges to a component that comes after it.
+    """
+    count = graph.module_count
+    index = array("l", [-1]) * count
+    lowlink = array("l", [0]) * count
+    on_stack = bytearray(count)
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(count):
+        if index[root] != -1:
+            continue
+
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, iter(graph.successor_ids(root)))]
+
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if index[succ] == -1:
+                    index[succ] = lowlink[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack[succ] = 1
+                    work.append((succ, iter(graph.successor_ids(succ))))
+                    break
+                if on_stack[succ] and index[succ] < lowlink[node]:
+                    lowlink[node] = index[succ]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    return components
+
+
+def _shortest_cycle(graph, start, members):
+    """
+    Find the shortest cycle from start back to itself, only going through
+    members. Returns a list of module ids, beginning and ending with start.
+    """
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for succ in graph.successor_ids(node):
+            if succ == start:
+                path = [start]
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                path.reverse()
+                return path
+            if succ in members and succ not in parents:
+                parents[succ] = node
+                queue.append(succ)
+    return None
+
+
+def find_cycles(graph):
+    """
+    Find import cycles. Returns a sorted list of (modules, cycle) tuples, one
+    for each strongly connected component that contains a cycle, where
+    modules is every module in the component and cycle is one of the shortest
+    cycles through the component's first module.
+    """
+    cycles = []
+    for component in strongly_connected_components(graph):
+        start = min(component)
+        if len(component) == 1 and start not in graph.successor_ids(start):
+            continue
+        cycle = _shortest_cycle(graph, start, set(component))
+        cycles.append(
+            (
+                [graph.modules[i] for i in sorted(component)],
+                [graph.modules[i] for i in cycle],
+            )
+        )
+    return sorted(cycles)
+
+
+def transitive_reduction(graph):
+    """
+    Remove every edge a -> b for which there is also a longer path from a to
+    b, returning a new ImportGraph with the same reachability.
+
+    Graphs with cycles have no unique transitive reduction. Here, edges within
+    a cycle are always kept. An edge between two cycles is only removed if it
+    is redundant in the graph where each cycle has been collapsed into a
+    single node.
+    """
+    components = strongly_connected_components(graph)
+    # components come in reverse topological order, so rank them the other
+    # way around: edges always go from lower to higher rank
+    rank = array("l", [0]) * graph.module_count
+    for idx, component in enumerate(components):
+        for member in component:
+            rank[member] = len(components) - 1 - idx
+
+    component_successors = [set() for _ in components]
+    for src_id in range(graph.module_count):
+        for dst_id in graph.successor_ids(src_id):
+            if rank[src_id] != rank[dst_id]:
+                component_successors[rank[src_id]].add(rank[dst_id])
+
+    visited = array("l", [-1]) * len(components)
+    redundant = set()
+    for component, successors in enumerate(component_successors):
+        if len(successors) < 2:
+            continue
+        # anything reachable from a successor's successors is redundant as a
+        # direct successor. nothing ranked above the highest direct successor
+        # can reach one, so those nodes need not be visited
+        max_rank = max(successors)
+        stack = []
+        for succ in successors:
+            for next_succ in component_successors[succ]:
+                if next_succ <= max_rank and visited[next_succ] != component:
+                    visited[next_succ] = component
+                    stack.append(next_succ)
+        while stack:
+            node = stack.pop()
+            if node in successors:
+                redundant.add((component, node))
+            for succ in component_successors[node]:
+                if succ <= max_rank and visited[succ] != component:
+                    visited[succ] = component
+                    stack.append(succ)
+
+    builder = ImportGraphBuilder()
+    for module in graph.modules:
+        builder.add_module(module)
+    for src_id, src in enumerate(graph.modules):
+        for dst_id in graph.successor_ids(src_id):
+            if (rank[src_id], rank[dst_id]) not in redundant:
+                builder.add_edge(src, graph.modules[dst_id])
+    return builder.build()
+
+
+def match_modules(graph, patterns):
+    """
+    Find the ids of modules matching any of patterns, which match the same way
+    highlights do: as plain prefixes, or as globs. Module names are sorted, so
+    only the range of modules starting with the part of a pattern before any
+    glob characters needs to be looked at.
+    """
+    modules = graph.modules
+    ids = set()
+    for pattern in patterns:
+        prefix = re.split(r"[*?[]", pattern, maxsplit=1)[0]
+        matcher = ModuleMatcher([pattern], allow_fnmatch=True, dotted=False)
+        for idx in range(bisect_left(modules, prefix), len(modules)):
+            module = modules[idx]
+            if not module.startswith(prefix):
+                break
+            if matcher.matches(module):
+                ids.add(idx)
+    return sorted(ids)
+
+
+def reachable(graph, module_ids, max_depth=None, reverse=False):
+    """
+    Find the modules that can be reached from any of module_ids by following
+    imports, or imports in reverse if reverse is true. Returns a dict of module
+    id to the length of the shortest path to it. The starting modules are only
+    included if there is a path to them, through a cycle for example.
+
+    Only visited modules and their edges are looked at, so this takes time
+    proportional to the size of the result rather than the graph.
+    """
+    neighbours = graph.predecessor_ids if reverse else graph.successor_ids
+    distances = {}
+    frontier = list(module_ids)
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_frontier = []
+        for module_id in frontier:
+            for neighbour in neighbours(module_id):
+                if neighbour not in distances:
+                    distances[neighbour] = depth
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+    return distances
+
+
+def split_by_package(graph):
+    """
+    Split a graph into one graph per top-level package, holding the imports
+    done by the modules of that package. Returns a dict of package to
+    ImportGraph.
+    """
+    builders = {}
+    for src_module, target_module in graph:
+        package = src_module.split(".", 1)[0]
+        builder = builders.get(package)
+        if builder is None:
+            builder = builders[package] = ImportGraphBuilder()
+        builder.add_edge(src_module, target_module)
+    return {package: builder.build() for package, builder in builders.items()}
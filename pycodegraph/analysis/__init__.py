@@ -1,6 +1,8 @@
 import os.path
 import logging
 
+from .discovery import walk_python_files
+
 log = logging.getLogger(__name__)
 
 
@@ -54,43 +56,48 @@ def find_root_module_path(path, root_module):
     return os.path.dirname(path)
 
 
-def find_module_files(root_path, exclude=None, filter=None, root_module=None):
+def find_module_files(
+    root_path,
+    exclude=None,
+    filter=None,
+    root_module=None,
+    ignore_files=True,
+    threads=1,
+    source=None,
+):
     """
     Given a path, find all python files in that path and guess their module
     names. Generates tuples of (module, path).
-    """
-    exclude = set(exclude or [])
-    filter = set(filter) if filter else None
 
+    If source is given, files are looked up using its find_python_files method
+    instead of on the filesystem.
+    """
     if root_module is None:
         root_module = find_root_module(root_path)
         log.debug("resolved path %r to root_module %r", root_path, root_module)
 
-    def dir_excluded(path):
-        if path.startswith("."):
-            return True
-        if path in exclude:
-            return True
-        if filter is not None:
-            return path not in filter
-        return False
-
-    for root, dirs, files in os.walk(root_path):
-        # prevents os.walk from recursing excluded directories
-        dirs[:] = [d for d in dirs if not dir_excluded(d)]
-        for file in files:
-            path = os.path.join(root, file)
-            relpath = os.path.relpath(path, root_path)
-            if file.endswith(".py"):
-                module = relpath.replace(".py", "").replace("/", ".")
-                module = module.replace(".__init__", "")
-                if module == "__init__":
-                    if root_module:
-                        module = root_module
-                    else:
-                        log.warning("could not guess module of %r", relpath)
-                        continue
-                elif root_module:
-                    module = "%s.%s" % (root_module, module)
-                log.debug("resolved %r to %r", relpath, module)
-                yield module, path
+    if source is not None:
+        files = source.find_python_files(root_path, exclude=exclude, filter=filter)
+    else:
+        files = walk_python_files(
+            root_path,
+            exclude=exclude,
+            filter=filter,
+            ignore_files=ignore_files,
+            threads=threads,
+        )
+    for relpath, path in files:
+        module = relpath[:-3].replace("/", ".")
+        if module == "__init__":
+            if root_module:
+                module = root_module
+            else:
+                log.warning("could not guess module of %r", relpath)
+                continue
+        else:
+            if module.endswith(".__init__"):
+                module = module[: -len(".__init__")]
+            if root_module:
+                module = "%s.%s" % (root_module, module)
+        log.debug("resolved %r to %r", relpath, module)
+        yield module, path
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import logging
+import os
+import os.path
+import shutil
+import time
+
+from pycodegraph.analysis.imports import scan_code
+from pycodegraph.analysis.reading import open_source
+from pycodegraph.analysis.writing import atomic_write_json
+
+log = logging.getLogger(__name__)
+
+# bump this whenever the format of entries, or the output of
+# find_imports_in_code, changes. entries of other versions are never read
+CACHE_VERSION = 1
+
+# entries that have not been used for this many seconds get evicted
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+
+# how often (in seconds) to scan the cache directory for stale entries
+PRUNE_INTERVAL = 24 * 60 * 60
+
+# stored as the symbols of files the ast scanner could not parse, to tell them
+# apart from entries without symbols
+NO_SYMBOLS = False
+
+
+def default_cache_dir():
+    """
+    Get the directory the cache is kept in unless another one is given:
+    pycodegraph in the user's cache directory, like ~/.cache/pycodegraph.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pycodegraph")
+
+
+def hash_code(code):
+    if isinstance(code, str):
+        code = code.encode("utf-8", "surrogatepass")
+    return hashlib.sha1(code).hexdigest()
+
+
+class ParseCache:
+    """
+    On-disk cache of the raw imports found in files, keyed by the file's path,
+    mtime, size and content hash. Files whose mtime and size are unchanged are
+    not read at all, files which have been touched but not changed are read and
+    hashed but not parsed.
+
+    Entries are written to a temporary file and then renamed into place, so
+    several processes can safely share the same cache directory.
+    """
+
+    def __init__(self, path=None, max_age=DEFAULT_MAX_AGE):
+        self.base_path = path if path is not None else default_cache_dir()
+        self.path = os.path.join(self.base_path, "v%d" % CACHE_VERSION)
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+
+    def _entry_path(self, path, root_path):
+        key = "%s\0%s" % (os.path.abspath(path), root_path)
+        digest = hashlib.sha1(key.encode("utf-8", "surrogatepass")).hexdigest()
+        return os.path.join(self.path, digest[:2], digest[2:] + ".json")
+
+    def _read_entry(self, entry_path):
+        try:
+            with open(entry_path) as filehandle:
+                entry = json.load(filehandle)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+            return None
+        return entry
+
+    def _write_entry(self, entry_path, entry):
+        try:
+            atomic_write_json(entry_path, entry)
+        except OSError:
+            log.warning("could not write cache entry %r", entry_path, exc_info=True)
+
+    def find_imports_in_file(
+        self,
+        path,
+        root_path=None,
+        scanner="ast",
+        resolve_relative=None,
+        symbols=False,
+        stat=None,
+    ):
+        """
+        Like find_imports_in_file, but returns a list, and only parses the file
+        if there is no valid cache entry for it. If symbols is true, returns a
+        tuple of (imports, symbols) like imports.scan_code. stat is the result
+        of os.stat for the file, if the caller already has it.
+        """
+        if stat is None:
+            stat = os.stat(path)
+        entry_path = self._entry_path(path, root_path)
+        entry = self._read_entry(entry_path)
+        if entry and symbols and scanner == "ast" and entry.get("symbols") is None:
+            # cached before symbols were needed, or by a scanner that does not
+            # find them
+            entry = None
+
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            self.hits += 1
+            self._touch(entry_path)
+            return self._result(entry, symbols)
+
+        with open_source(path, size=stat.st_size) as code:
+            self.bytes_read += len(code)
+            code_hash = hash_code(code)
+
+            if entry and entry["hash"] == code_hash:
+                self.hits += 1
+                result = self._result(entry, symbols)
+            else:
+                self.misses += 1
+                result = scan_code(
+                    code,
+                    scanner,
+                    symbols,
+                    path=path,
+                    root_path=root_path,
+                    resolve_relative=resolve_relative,
+                )
+
+        new_entry = {
+            "version": CACHE_VERSION,
+            "path": os.path.abspath(path),
+            "root_path": root_path,
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "hash": code_hash,
+        }
+        if symbols:
+            new_entry["imports"], new_entry["symbols"] = result
+            if new_entry["symbols"] is None and scanner == "ast":
+                new_entry["symbols"] = NO_SYMBOLS
+        else:
+            new_entry["imports"] = result
+            if entry and "symbols" in entry:
+                new_entry["symbols"] = entry["symbols"]
+        self._write_entry(entry_path, new_entry)
+        return result
+
+    @staticmethod
+    def _result(entry, symbols):
+        if symbols:
+            if entry["symbols"] is NO_SYMBOLS:
+                return entry["imports"], None
+            return entry["imports"], entry["symbols"]
+        return entry["imports"]
+
+    def pop_stats(self):
+        """
+        Return the statistics gathered so far as a dict of counters, and reset
+        them.
+        """
+        stats = {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "bytes_read": self.bytes_read,
+        }
+        self.hits = self.misses = self.bytes_read = 0
+        return stats
+
+    def _touch(self, entry_path):
+        # the entry's mtime is used as "last used" time when evicting entries.
+        # only bother updating it once an hour to save on syscalls
+        try:
+            if os.path.getmtime(entry_path) < time.time() - 60 * 60:
+                os.utime(entry_path)
+        except OSError:
+            pass
+
+    def maybe_prune(self):
+        """
+        Prune the cache, unless that has already been done recently.
+        """
+        marker = os.path.join(self.base_path, ".last_prune")
+        try:
+            if os.path.getmtime(marker) > time.time() - PRUNE_INTERVAL:
+                return
+        except OSError:
+            pass
+        self.prune()
+        try:
+            os.makedirs(self.base_path, exist_ok=True)
+            with open(marker, "w"):
+                pass
+        except OSError:
+            log.warning("could not write %r", marker, exc_info=True)
+
+    def prune(self):
+        """
+        Remove cache entries belonging to other cache versions, entries that
+        have not been used in max_age seconds and entries whose source file no
+        longer exists.
+        """
+        if not os.path.isdir(self.base_path):
+            return
+
+        current_version = os.path.basename(self.path)
+        for name in os.listdir(self.base_path):
+            version_path = os.path.join(self.base_path, name)
+            if name.startswith("v") and name != current_version:
+                log.info("removing cache directory of old version: %r", version_path)
+                shutil.rmtree(version_path, ignore_errors=True)
+
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for root, _dirs, files in os.walk(self.path):
+            for file in files:
+                entry_path = os.path.join(root, file)
+                try:
+                    if os.path.getmtime(entry_path) >= cutoff:
+                        # probably being written by another process right now
+                        if file.endswith(".tmp"):
+                            continue
+                        entry = self._read_entry(entry_path)
+                        if entry and os.path.exists(entry["path"]):
+                            continue
+                    os.unlink(entry_path)
+                    removed += 1
+                except OSError:
+                    pass
+        log.info("removed %d stale cache entries", removed)
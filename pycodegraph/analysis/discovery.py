@@ -0,0 +1,328 @@
+"""
+Finding python files on the filesystem. Directories are listed with
+os.scandir, so file types come from the directory listing instead of a stat
+call per file, and ignored or excluded directories are never entered.
+"""
+
+import fnmatch
+import logging
+import os
+import os.path
+import re
+
+log = logging.getLogger(__name__)
+
+IGNORE_FILES = (".gitignore", ".ignore")
+
+
+def _translate_ignore_pattern(pattern):
+    """
+    Translate a gitignore glob into a regular expression. "*" and "?" do not
+    match slashes, "**" does.
+    """
+    parts = []
+    idx = 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        if pattern.startswith("**/", idx):
+            parts.append("(?:.*/)?")
+            idx += 3
+            continue
+        if pattern.startswith("**", idx):
+            parts.append(".*")
+            idx += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", idx + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                chars = pattern[idx + 1 : end].replace("\\", "\\\\")
+                if chars[0] == "!":
+                    chars = "^" + chars[1:]
+                elif chars[0] == "^":
+                    chars = "\\" + chars
+                parts.append("[%s]" % chars)
+                idx = end
+        elif char == "\\" and idx + 1 < len(pattern):
+            idx += 1
+            parts.append(re.escape(pattern[idx]))
+        else:
+            parts.append(re.escape(char))
+        idx += 1
+    return re.compile("".join(parts) + r"\Z")
+
+
+class IgnoreRule:
+    __slots__ = ("regex", "negate", "dir_only", "anchored")
+
+    def __init__(self, regex, negate=False, dir_only=False, anchored=False):
+        self.regex = regex
+        self.negate = negate
+        self.dir_only = dir_only
+        self.anchored = anchored
+
+
+def parse_ignore_file(lines):
+    """
+    Parse the lines of a .gitignore style file into a list of IgnoreRules.
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.endswith("\\ "):
+            line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        # a slash anywhere but at the end makes the pattern relative to the
+        # directory of the ignore file, otherwise it matches names at any depth
+        anchored = "/" in line
+        line = line.lstrip("/")
+        rules.append(
+            IgnoreRule(_translate_ignore_pattern(line), negate, dir_only, anchored)
+        )
+    return rules
+
+
+def _read_ignore_file(path):
+    try:
+        with open(path, errors="replace") as filehandle:
+            return parse_ignore_file(filehandle)
+    except OSError:
+        return []
+
+
+class IgnoreRules:
+    """
+    The ignore rules in effect for one directory: the rules of its own ignore
+    files, linked to the rules in effect for its parent directory.
+
+    Anchored rules are matched against paths relative to the directory of the
+    ignore file they came from. Paths are given relative to the directory being
+    walked, so base is stripped from them and prefix prepended to them.
+    """
+
+    __slots__ = ("parent", "rules", "base", "prefix")
+
+    def __init__(self, parent=None, rules=(), base="", prefix=""):
+        self.parent = parent
+        self.rules = list(rules)
+        self.base = base
+        self.prefix = prefix
+
+    def child(self, dir_path, relpath):
+        """
+        Get the rules in effect for a subdirectory, reading its ignore files.
+        """
+        rules = []
+        for name in IGNORE_FILES:
+            rules.extend(_read_ignore_file(os.path.join(dir_path, name)))
+        if not rules:
+            return self
+        return IgnoreRules(self, rules, base=relpath + "/" if relpath else "")
+
+    def is_ignored(self, relpath, name, is_dir):
+        """
+        The last matching rule of an ignore file wins, and ignore files in
+        subdirectories take precedence over those of their parents.
+        """
+        rules = self
+        while rules is not None:
+            for rule in reversed(rules.rules):
+                if rule.dir_only and not is_dir:
+                    continue
+                if rule.anchored:
+                    if not relpath.startswith(rules.base):
+                        continue
+                    target = rules.prefix + relpath[len(rules.base) :]
+                else:
+                    target = name
+                if rule.regex.match(target):
+                    return not rule.negate
+            rules = rules.parent
+        return False
+
+
+def find_ignore_rules(root_path):
+    """
+    Get the ignore rules in effect for root_path. If it is inside a git
+    repository, this includes the ignore files of every parent directory up to
+    the root of the repository, and the repository's info/exclude file.
+    """
+    root_path = os.path.abspath(root_path)
+    parents = []
+    path = root_path
+    while not os.path.isdir(os.path.join(path, ".git")):
+        parent = os.path.dirname(path)
+        if parent == path:
+            # not in a git repository, only root_path's own ignore files apply
+            return IgnoreRules().child(root_path, "")
+        parents.append(parent)
+        path = parent
+
+    def prefix(parent):
+        relpath = os.path.relpath(root_path, parent)
+        return "" if relpath == "." else relpath.replace(os.sep, "/") + "/"
+
+    rules = IgnoreRules(
+        rules=_read_ignore_file(os.path.join(path, ".git", "info", "exclude")),
+        prefix=prefix(path),
+    )
+    for parent in reversed(parents):
+        child = rules.child(parent, "")
+        if child is not rules:
+            child.prefix = prefix(parent)
+        rules = child
+    return rules.child(root_path, "")
+
+
+def is_glob(pattern):
+    return any(char in pattern for char in "*?[")
+
+
+class _NameMatcher:
+    # a class rather than a closure, so that analyses holding one can be
+    # pickled for worker processes
+    def __init__(self, names, regex):
+        self.names = names
+        self.regex = regex
+
+    def __call__(self, name):
+        return name in self.names or self.regex.match(name) is not None
+
+
+def compile_name_matcher(patterns):
+    """
+    Compile exact names and fnmatch style globs into a single function that
+    checks if a name matches any of them.
+    """
+    names = set()
+    globs = []
+    for pattern in patterns:
+        if is_glob(pattern):
+            globs.append(fnmatch.translate(pattern))
+        else:
+            names.add(pattern)
+    if not globs:
+        return names.__contains__
+    return _NameMatcher(names, re.compile("|".join(globs)))
+
+
+def compile_dir_filter(exclude=None, filter=None):
+    """
+    Get a function that checks if a directory name should be skipped: names
+    starting with a dot, matching a name or glob in exclude, or not in filter
+    (if given).
+    """
+    is_excluded = compile_name_matcher(exclude or ())
+    filter = set(filter) if filter else None
+
+    def skip_dir(name):
+        if name.startswith(".") or is_excluded(name):
+            return True
+        return filter is not None and name not in filter
+
+    return skip_dir
+
+
+class _Walker:
+    def __init__(self, skip_dir, use_ignore_files, extra_files=()):
+        self.skip_dir = skip_dir
+        self.use_ignore_files = use_ignore_files
+        self.extra_files = frozenset(extra_files)
+
+    def scan_dir(self, dir_path, relpath, rules):
+        """
+        List a single directory. Returns a list of (relpath, path) of python
+        files, and a list of (path, relpath, rules) of subdirectories to walk.
+        """
+        if self.use_ignore_files and relpath:
+            rules = rules.child(dir_path, relpath)
+        try:
+            with os.scandir(dir_path) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError as exc:
+            log.warning("could not list directory %r: %s", dir_path, exc)
+            return [], []
+
+        files = []
+        subdirs = []
+        prefix = relpath + "/" if relpath else ""
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                # like os.walk, don't follow symlinks to directories
+                if self.skip_dir(name) or entry.is_symlink():
+                    continue
+                entry_relpath = prefix + name
+                if rules is not None and rules.is_ignored(entry_relpath, name, True):
+                    log.debug("skipping ignored directory %r", entry_relpath)
+                    continue
+                subdirs.append((entry.path, entry_relpath, rules))
+            elif name.endswith(".py") or name in self.extra_files:
+                entry_relpath = prefix + name
+                if rules is not None and rules.is_ignored(entry_relpath, name, False):
+                    continue
+                files.append((entry_relpath, entry.path))
+        return files, subdirs
+
+    def walk(self, dir_path, relpath, rules):
+        stack = [(dir_path, relpath, rules)]
+        while stack:
+            files, subdirs = self.scan_dir(*stack.pop())
+            yield from files
+            stack.extend(reversed(subdirs))
+
+    def walk_list(self, dir_path, relpath, rules):
+        return list(self.walk(dir_path, relpath, rules))
+
+
+def walk_python_files(
+    root_path, exclude=None, filter=None, ignore_files=True, threads=1, extra_files=()
+):
+    """
+    Find python files in root_path. Generates tuples of (relpath, path), where
+    relpath is relative to root_path and always uses forward slashes.
+
+    Directories starting with a dot, directories matching any name or glob in
+    exclude, directories not in filter (if given) and paths ignored by
+    .gitignore or .ignore files (if ignore_files is true) are skipped.
+
+    If threads is greater than 1, the subdirectories of root_path are walked in
+    parallel threads. Listing directories releases the GIL, so this helps on
+    slow or network filesystems.
+
+    Files with any of the names in extra_files are generated as well, so that
+    other files can be found in the same pass.
+    """
+    rules = find_ignore_rules(root_path) if ignore_files else None
+    walker = _Walker(compile_dir_filter(exclude, filter), ignore_files, extra_files)
+    if threads <= 1:
+        yield from walker.walk(root_path, "", rules)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    files, subdirs = walker.scan_dir(root_path, "", rules)
+    yield from files
+    with ThreadPoolExecutor(threads) as executor:
+        futures = [executor.submit(walker.walk_list, *subdir) for subdir in subdirs]
+        for future in futures:
+            yield from future.result()
@@ -0,0 +1,244 @@
+"""
+Index of the modules importable from outside the analyzed code, like the
+standard library and installed packages, and the distributions they belong to.
+"""
+
+import hashlib
+import importlib.machinery
+import json
+import logging
+import os
+import os.path
+import sys
+
+from .writing import atomic_write_json
+
+log = logging.getLogger(__name__)
+
+# bump this whenever the format of the persisted index changes
+INDEX_VERSION = 1
+
+MODULE_SUFFIXES = tuple(
+    importlib.machinery.SOURCE_SUFFIXES + importlib.machinery.EXTENSION_SUFFIXES
+)
+
+
+def _module_name(filename):
+    for suffix in MODULE_SUFFIXES:
+        if filename.endswith(suffix):
+            name = filename[: -len(suffix)]
+            return name if name.isidentifier() else None
+    return None
+
+
+def _scan_package(dir_path, package, modules):
+    """
+    Add the modules below a package directory to modules, returning whether
+    any were found.
+    """
+    found = False
+    try:
+        entries = list(os.scandir(dir_path))
+    except OSError:
+        return False
+    for entry in entries:
+        if entry.is_dir():
+            if entry.name.isidentifier() and entry.name != "__pycache__":
+                found |= _scan_dir(entry.path, "%s.%s" % (package, entry.name), modules)
+            continue
+        name = _module_name(entry.name)
+        if name is not None and name != "__init__":
+            modules.setdefault("%s.%s" % (package, name), False)
+            found = True
+    return found
+
+
+def _scan_dir(dir_path, module, modules):
+    """
+    Add a package directory, regular or namespace, to modules if it contains
+    any modules.
+    """
+    is_package = os.path.isfile(os.path.join(dir_path, "__init__.py"))
+    if _scan_package(dir_path, module, modules) or is_package:
+        modules.setdefault(module, True)
+        return True
+    return False
+
+
+def _distribution_name(info_path, dirname):
+    try:
+        with open(os.path.join(info_path, "METADATA")) as filehandle:
+            for line in filehandle:
+                if line.startswith("Name:"):
+                    return line[5:].strip()
+                if not line.strip():
+                    break
+    except (OSError, UnicodeDecodeError):
+        pass
+    return dirname.split("-", 1)[0]
+
+
+def _distribution_modules(info_path):
+    """
+    Find the top-level modules installed by a distribution, from its
+    top_level.txt or, failing that, its RECORD.
+    """
+    try:
+        with open(os.path.join(info_path, "top_level.txt")) as filehandle:
+            return [line.strip() for line in filehandle if line.strip()]
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    names = []
+    try:
+        with open(os.path.join(info_path, "RECORD")) as filehandle:
+            for line in filehandle:
+                path = line.split(",", 1)[0]
+                top, sep, _ = path.partition("/")
+                name = top if sep else _module_name(top)
+                if name and name.isidentifier() and name != "__pycache__":
+                    names.append(name)
+    except (OSError, UnicodeDecodeError):
+        pass
+    return names
+
+
+class ExternalIndex:
+    """
+    In-memory index of the modules found in a list of import paths, normally
+    sys.path, built by scanning each of them once. Like the import system,
+    the first path that has a top-level module wins.
+    """
+
+    def __init__(self, modules=None, distributions=None):
+        # module name -> whether the module is a package
+        self.modules = modules if modules is not None else {}
+        # top-level module name -> name of the distribution that installed it
+        self.distributions = distributions if distributions is not None else {}
+
+    @classmethod
+    def scan(cls, paths):
+        index = cls()
+        for module in sys.builtin_module_names:
+            index.modules[module] = False
+        for path in paths:
+            index.scan_path(path)
+        log.info(
+            "indexed %d external modules from %d distributions",
+            len(index.modules),
+            len(set(index.distributions.values())),
+        )
+        return index
+
+    def scan_path(self, path):
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return
+        modules = {}
+        for entry in entries:
+            if entry.is_dir():
+                if entry.name.endswith((".dist-info", ".egg-info")):
+                    self._add_distribution(entry.path, entry.name)
+                elif entry.name.isidentifier() and entry.name != "__pycache__":
+                    _scan_dir(entry.path, entry.name, modules)
+                continue
+            name = _module_name(entry.name)
+            if name is not None:
+                modules.setdefault(name, False)
+
+        shadowed = set(module for module in modules if module in self.modules)
+        for module, is_package in modules.items():
+            if module.split(".", 1)[0] not in shadowed:
+                self.modules[module] = is_package
+
+    def _add_distribution(self, info_path, dirname):
+        distribution = _distribution_name(info_path, dirname)
+        for module in _distribution_modules(info_path):
+            self.distributions.setdefault(module, distribution)
+
+    def __len__(self):
+        return len(self.modules)
+
+    def __contains__(self, module):
+        return module in self.modules
+
+    def find_module(self, module):
+        """
+        Find the longest prefix of module that is an actual module, which
+        turns names of functions or classes imported from a module into the
+        module. Returns None if no prefix is a known module.
+        """
+        while module:
+            if module in self.modules:
+                return module
+            module = module.rpartition(".")[0]
+        return None
+
+    def distribution(self, module):
+        """
+        Get the name of the distribution that installed a module, or None.
+        """
+        return self.distributions.get(module.split(".", 1)[0])
+
+    def to_dict(self):
+        return {"modules": self.modules, "distributions": self.distributions}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["modules"], data["distributions"])
+
+
+def default_paths():
+    """
+    The directories on sys.path. The current directory is left out, as that
+    is usually the code being analyzed.
+    """
+    return [os.path.abspath(path) for path in sys.path if path and os.path.isdir(path)]
+
+
+def _fingerprint(paths):
+    # installing, upgrading or removing anything changes the mtime of the
+    # directory it lives in
+    fingerprint = [sys.version]
+    for path in paths:
+        try:
+            fingerprint.append([path, os.stat(path).st_mtime])
+        except OSError:
+            fingerprint.append([path, None])
+    return fingerprint
+
+
+def load_external_index(paths, cache_dir=None):
+    """
+    Get the ExternalIndex of a list of paths. If cache_dir is given, the index
+    is stored there and reused until anything in the paths changes.
+    """
+    paths = list(paths)
+    if cache_dir is None:
+        return ExternalIndex.scan(paths)
+
+    key = hashlib.sha1(
+        json.dumps([sys.executable] + paths).encode("utf-8", "surrogatepass")
+    ).hexdigest()
+    index_path = os.path.join(
+        cache_dir, "external", "v%d-%s.json" % (INDEX_VERSION, key[:16])
+    )
+    fingerprint = _fingerprint(paths)
+    try:
+        with open(index_path) as filehandle:
+            data = json.load(filehandle)
+        if data["fingerprint"] == fingerprint:
+            log.debug("using external module index %r", index_path)
+            return ExternalIndex.from_dict(data)
+        log.info("environment changed, rebuilding external module index")
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    index = ExternalIndex.scan(paths)
+    data = dict(index.to_dict(), fingerprint=fingerprint)
+    try:
+        atomic_write_json(index_path, data)
+    except OSError:
+        log.warning("could not write %r", index_path, exc_info=True)
+    return index
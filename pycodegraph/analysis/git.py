@@ -0,0 +1,134 @@
+"""
+Reading python files straight out of a git repository's object store, so that
+any revision can be analyzed without checking it out.
+"""
+
+import logging
+import os.path
+import subprocess
+
+from .discovery import compile_dir_filter
+
+log = logging.getLogger(__name__)
+
+
+class GitError(ValueError):
+    pass
+
+
+class GitRevision:
+    """
+    The files of a single commit in the git repository containing path.
+
+    Files are identified by the path they would have if the commit was checked
+    out in the working tree, so the rest of the analysis can treat them like
+    files on disk. The file listing is read once with `git ls-tree`, and blobs
+    are read through a single long-lived `git cat-file --batch` process.
+    """
+
+    def __init__(self, path, rev):
+        self.path = os.path.abspath(path)
+        self.rev = rev
+        workdir = self.path if os.path.isdir(self.path) else os.path.dirname(self.path)
+        self.toplevel = self._git(workdir, "rev-parse", "--show-toplevel").strip()
+        self.commit = self._git(
+            workdir, "rev-parse", "--verify", "--quiet", "%s^{commit}" % rev
+        ).strip()
+        log.info("resolved revision %r to commit %s", rev, self.commit)
+        # path -> blob sha, filled by find_python_files
+        self.blobs = {}
+        self._process = None
+
+    def __getstate__(self):
+        # the cat-file process can't be shared with worker processes, each of
+        # them starts its own
+        state = self.__dict__.copy()
+        state["_process"] = None
+        return state
+
+    @staticmethod
+    def _git(cwd, *args):
+        try:
+            return subprocess.check_output(
+                ("git",) + args, cwd=cwd, stderr=subprocess.PIPE
+            ).decode("utf-8")
+        except OSError as exc:
+            raise GitError("could not run git: %s" % exc)
+        except subprocess.CalledProcessError as exc:
+            msg = exc.stderr.decode("utf-8", "replace").strip()
+            if not msg and "--verify" in args:
+                msg = "unknown revision %r" % args[-1].rsplit("^", 1)[0]
+            raise GitError("git %s failed: %s" % (args[0], msg))
+
+    def find_python_files(self, root_path, exclude=None, filter=None):
+        """
+        Like discovery.walk_python_files, but for the files in the commit.
+        Generates tuples of (relpath, path).
+        """
+        root_path = os.path.abspath(root_path)
+        prefix = os.path.relpath(
+            os.path.realpath(root_path), os.path.realpath(self.toplevel)
+        )
+        if prefix == "." or prefix.startswith(".."):
+            prefix = ""
+        else:
+            prefix = prefix.replace(os.sep, "/") + "/"
+
+        args = ["ls-tree", "-r", "-z", "--full-tree", self.commit]
+        if prefix:
+            args += ["--", prefix]
+        listing = self._git(self.toplevel, *args)
+
+        skip_dir = compile_dir_filter(exclude, filter)
+        skipped = {}
+        for entry in listing.split("\0"):
+            if not entry:
+                continue
+            info, path = entry.split("\t", 1)
+            mode, kind, sha = info.split(" ")
+            # skip submodules and symlinks
+            if kind != "blob" or mode == "120000" or not path.endswith(".py"):
+                continue
+            relpath = path[len(prefix) :]
+            dirname = relpath.rpartition("/")[0]
+            if dirname not in skipped:
+                parts = dirname.split("/") if dirname else ()
+                skipped[dirname] = any(skip_dir(part) for part in parts)
+            if skipped[dirname]:
+                continue
+            file_path = os.path.join(root_path, relpath)
+            self.blobs[file_path] = sha
+            yield relpath, file_path
+
+    def read(self, path):
+        """
+        Read the contents of a file found by find_python_files, as bytes.
+        """
+        try:
+            sha = self.blobs[path]
+        except KeyError:
+            raise GitError("%r is not in commit %s" % (path, self.commit))
+
+        if self._process is None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.toplevel,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        process = self._process
+        process.stdin.write(sha.encode("ascii") + b"\n")
+        process.stdin.flush()
+        header = process.stdout.readline().split()
+        if len(header) != 3:
+            raise GitError("could not read blob %s of %r" % (sha, path))
+        data = process.stdout.read(int(header[2]))
+        process.stdout.read(1)
+        return data
+
+    def close(self):
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
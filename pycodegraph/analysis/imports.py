@@ -1,20 +1,34 @@
 from fnmatch import fnmatch
 import ast
+import codecs
+import collections
+import copy
 import logging
 import os
 import os.path
+import re
+import time
 
+from pycodegraph.graph import ImportGraph, ImportGraphBuilder
 from . import find_root_module, find_root_module_path, find_module_files, shorten_module
+from .discovery import compile_name_matcher, is_glob
+from .index import ModuleIndex
+from .matcher import ModuleMatcher
+from .profile import Profile
+from .reading import is_ascii_compatible, open_source, source_encoding
+from .resolver import ModuleResolver
+from .symbols import SymbolIndex
 
 log = logging.getLogger(__name__)
 
 
-def find_imports_in_file(path, root_path=None):
+def find_imports_in_file(path, root_path=None, scanner="ast"):
     """
-    Parse a python file, finding all imports.
+    Parse a python file, finding all imports. scanner is one of the keys of
+    SCANNERS. Returns a list.
     """
-    with open(path) as filehandle:
-        return find_imports_in_code(filehandle.read(), path=path, root_path=root_path)
+    with open_source(path) as code:
+        return list(SCANNERS[scanner](code, path=path, root_path=root_path))
 
 
 def resolve_relative_module(path, module, root_path, level=None):
@@ -39,42 +53,354 @@ def resolve_relative_module(path, module, root_path, level=None):
     return "{}.{}".format(base, module) if module else base
 
 
-def find_imports_in_code(code, path=None, root_path=None):
-    """
-    Parse some Python code, finding all imports.
-    """
+def _parse(code, path=None):
+    if not isinstance(code, (str, bytes)):
+        # like an mmap from open_source
+        code = bytes(code)
     try:
-        tree = ast.parse(code)
+        return ast.parse(code)
     except SyntaxError:
         log.exception("SyntaxError in %r", (path or "code"))
-        return
+        return None
+
+
+def find_imports_in_code(code, path=None, root_path=None, resolve_relative=None):
+    """
+    Parse some Python code, finding all imports. resolve_relative can be a
+    function (path, module, level) to use instead of resolve_relative_module.
+
+    code can be a str, or bytes in the encoding declared by the code itself.
+    """
+    tree = _parse(code, path)
+    if tree is not None:
+        yield from _imports_in_tree(tree, path, root_path, resolve_relative)
 
+
+def find_imports_and_symbols_in_code(
+    code, path=None, root_path=None, resolve_relative=None
+):
+    """
+    Like find_imports_in_code, but also finds the symbols of the code: the
+    names it defines and imports at its top level. Returns a tuple of (list of
+    imports, symbols), where symbols is a dict for symbols.SymbolIndex, or None
+    if the code could not be parsed.
+    """
+    tree = _parse(code, path)
+    if tree is None:
+        return [], None
+    imports = list(_imports_in_tree(tree, path, root_path, resolve_relative))
+    return imports, _symbols_in_tree(tree, path, root_path, resolve_relative)
+
+
+def _imports_in_tree(tree, path, root_path, resolve_relative):
     for node in ast.walk(tree):
         # note that there's no way for us to know if from x import y imports a
         # variable or submodule from x, so that will need to be figured out
         # later on in this script
         if isinstance(node, ast.ImportFrom):
-            module = node.module
-
-            # relative imports
-            if node.level > 0:
-                if path and root_path:
-                    module = resolve_relative_module(
-                        path=path, module=module, root_path=root_path, level=node.level
-                    )
-                else:
-                    module = ("." * node.level) + (module if module else "")
-
-            for name in node.names:
-                if name.name == "*":
-                    yield module
-                else:
-                    yield "%s.%s" % (module, name.name)
+            names = [name.name for name in node.names]
+            for module in _import_from_modules(
+                node.module, node.level, names, path, root_path, resolve_relative
+            ):
+                yield module
         elif isinstance(node, ast.Import):
             for name in node.names:
                 yield name.name
 
 
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def _top_level_statements(body):
+    """
+    Generate the statements of a module body, including those nested in
+    blocks like if and try, but not those in functions or classes.
+    """
+    for node in body:
+        yield node
+        if not isinstance(node, _DEFINITIONS):
+            for field in ("body", "orelse", "handlers", "finalbody"):
+                yield from _top_level_statements(getattr(node, field, ()))
+
+
+def _assigned_names(target):
+    if isinstance(target, ast.Name):
+        yield target.id
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        for elt in target.elts:
+            yield from _assigned_names(elt)
+    elif isinstance(target, ast.Starred):
+        yield from _assigned_names(target.value)
+
+
+def _symbols_in_tree(tree, path, root_path, resolve_relative):
+    defined = set()
+    imported = {}
+    star = []
+    for node in _top_level_statements(tree.body):
+        if isinstance(node, _DEFINITIONS):
+            defined.add(node.name)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                defined.update(_assigned_names(target))
+        elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+            defined.update(_assigned_names(node.target))
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    imported[alias.asname] = alias.name
+                else:
+                    # import a.b binds a
+                    name = alias.name.split(".", 1)[0]
+                    imported[name] = name
+        elif isinstance(node, ast.ImportFrom):
+            names = [alias.name for alias in node.names]
+            modules = _import_from_modules(
+                node.module, node.level, names, path, root_path, resolve_relative
+            )
+            for alias, module in zip(node.names, modules):
+                if alias.name == "*":
+                    star.append(module)
+                else:
+                    imported[alias.asname or alias.name] = module
+    return {"defined": sorted(defined), "imported": imported, "star": star}
+
+
+def _import_from_modules(
+    module, level, names, path=None, root_path=None, resolve_relative=None
+):
+    # relative imports
+    if level > 0:
+        if path and resolve_relative is not None:
+            module = resolve_relative(path, module, level)
+        elif path and root_path:
+            module = resolve_relative_module(
+                path=path, module=module, root_path=root_path, level=level
+            )
+        else:
+            module = ("." * level) + (module if module else "")
+
+    for name in names:
+        if name == "*":
+            yield module
+        else:
+            yield "%s.%s" % (module, name)
+
+
+# whitespace within a statement, and within parentheses
+_WS = r"(?:[ \t\f]|\\\r?\n)"
+_PWS = r"(?:\s|\\\r?\n|\#[^\n]*)"
+_NAME = r"[^\W\d]\w*"
+
+
+def _aliases_re(ws):
+    dotted = r"{name}(?:{ws}*\.{ws}*{name})*".format(name=_NAME, ws=ws)
+    alias = r"{dotted}(?:{ws}+as{ws}+{name})?".format(dotted=dotted, name=_NAME, ws=ws)
+    return r"{alias}(?:{ws}*,{ws}*{alias})*".format(alias=alias, ws=ws)
+
+
+class _Regexes:
+    """
+    The regexes used by scan_imports_in_code. Compiling them takes a few
+    milliseconds, which is a noticeable part of startup time when they are not
+    used, so each one is compiled the first time it is used.
+    """
+
+    def __init__(self, for_bytes=False):
+        self.for_bytes = for_bytes
+
+    def __getattr__(self, name):
+        try:
+            pattern, flags = _PATTERNS[name]
+        except KeyError:
+            raise AttributeError(name)
+        if self.for_bytes:
+            # names are matched as ASCII only. other names make the statement
+            # look invalid, so that the code is parsed instead
+            pattern = pattern.encode("ascii")
+        regex = re.compile(pattern, flags)
+        setattr(self, name, regex)
+        return regex
+
+
+# name -> (pattern, flags)
+_PATTERNS = {}
+
+# finds the start of import statements, skipping over strings and comments so
+# that anything looking like an import inside them is ignored
+_PATTERNS["scan"] = (
+    r"""
+    # quickly skip over characters that can't start any of the alternatives
+    (?=[rRbBuUfFi'"\#;:\s])
+    (?:(?P<string>
+        [rRbBuUfF]{0,2}
+        (?:'\'\'(?:\\.|[^\\])*?'\'\'
+          |\"\"\"(?:\\.|[^\\])*?\"\"\"
+          |'(?:\\.|[^\\'\n])*'
+          |"(?:\\.|[^\\"\n])*")
+    )
+    |(?P<comment>\#[^\n]*)
+    |(?:^[ \t]*|[;:][ \t]*)(?P<keyword>import|from)\b)
+    """,
+    re.M | re.S | re.X,
+)
+_PATTERNS["plain_import"] = (
+    r"import{ws}+(?P<names>{aliases})".format(ws=_WS, aliases=_aliases_re(_WS)),
+    0,
+)
+_PATTERNS["from_import"] = (
+    r"""
+    from(?P<dots>(?:{ws}*\.)*){ws}*(?P<module>{name}(?:{ws}*\.{ws}*{name})*)?
+    {ws}*import
+    (?:{ws}*\({pws}*(?P<parens>{paliases}){pws}*(?:,{pws}*)?\)
+      |{ws}*(?P<star>\*)
+      |{ws}+(?P<names>{aliases}))
+    """.format(
+        ws=_WS,
+        pws=_PWS,
+        name=_NAME,
+        aliases=_aliases_re(_WS),
+        paliases=_aliases_re(_PWS),
+    ),
+    re.X,
+)
+_PATTERNS["alias"] = (
+    r"(?P<name>{name}(?:{ws}*\.{ws}*{name})*)(?:{ws}+as{ws}+{name})?".format(
+        name=_NAME, ws=_PWS
+    ),
+    0,
+)
+_PATTERNS["statement_end"] = (r"{ws}*(?:[;#\r\n]|$)".format(ws=_WS), 0)
+_PATTERNS["strip"] = (_PWS + "|" + r"\\", 0)
+_PATTERNS["comment"] = (r"\#[^\n]*", 0)
+
+_regexes = _Regexes()
+_bytes_regexes = _Regexes(for_bytes=True)
+
+
+class _ScanError(ValueError):
+    pass
+
+
+def _scan_names(names, regexes, decode):
+    names = regexes.comment.sub(names[:0], names)
+    return [
+        decode(regexes.strip.sub(names[:0], match.group("name")))
+        for match in regexes.alias.finditer(names)
+    ]
+
+
+def _decode_ascii(value):
+    return value.decode("ascii")
+
+
+def _scan_import_statements(code):
+    """
+    Generates (module, level, names) for every import statement in some code.
+    For plain imports, module is None. code can be a str, or bytes in an
+    ASCII compatible encoding.
+    """
+    if isinstance(code, str):
+        regexes, decode = _regexes, str
+    else:
+        regexes, decode = _bytes_regexes, _decode_ascii
+    empty = code[:0]
+    pos = 0
+    while True:
+        match = regexes.scan.search(code, pos)
+        if not match:
+            return
+        pos = match.end()
+        keyword = match.group("keyword")
+        if not keyword:
+            continue
+        keyword = decode(keyword)
+
+        start = match.start("keyword")
+        if keyword == "import":
+            stmt = regexes.plain_import.match(code, start)
+        else:
+            stmt = regexes.from_import.match(code, start)
+        if not stmt or not regexes.statement_end.match(code, stmt.end()):
+            line = code[:start].count("\n" if isinstance(code, str) else b"\n") + 1
+            raise _ScanError("unrecognized statement on line %d" % line)
+        pos = stmt.end()
+
+        if keyword == "import":
+            yield None, 0, _scan_names(stmt.group("names"), regexes, decode)
+            continue
+
+        if stmt.group("star"):
+            names = ["*"]
+        elif stmt.group("parens") is not None:
+            names = _scan_names(stmt.group("parens"), regexes, decode)
+        else:
+            names = _scan_names(stmt.group("names"), regexes, decode)
+        module = stmt.group("module")
+        if module:
+            module = decode(regexes.strip.sub(empty, module))
+        level = decode(regexes.strip.sub(empty, stmt.group("dots"))).count(".")
+        yield module, level, names
+
+
+def scan_imports_in_code(code, path=None, root_path=None, resolve_relative=None):
+    """
+    Scan some Python code for imports without parsing it into an AST, which is
+    a lot faster on large files. Generates the same imports as
+    find_imports_in_code, though not in the same order.
+
+    Falls back to find_imports_in_code for code that the scanner doesn't
+    understand. Unlike find_imports_in_code, this does not detect syntax errors
+    in code outside of import statements.
+
+    code can be a str, or bytes in the encoding declared by the code itself.
+    Code in ASCII compatible encodings, which is nearly all code, is scanned
+    without decoding it.
+    """
+    if not isinstance(code, str):
+        encoding = source_encoding(code)
+        if not is_ascii_compatible(encoding):
+            code = bytes(code).decode(encoding)
+        elif code[:3] == codecs.BOM_UTF8:
+            code = code[3:]
+    if code[:1] == "\ufeff":
+        code = code[1:]
+    imports = []
+    try:
+        for module, level, names in _scan_import_statements(code):
+            if module is None and level == 0:
+                imports.extend(names)
+            else:
+                imports.extend(
+                    _import_from_modules(
+                        module, level, names, path, root_path, resolve_relative
+                    )
+                )
+    except _ScanError as exc:
+        log.debug("falling back to ast for %r: %s", (path or "code"), exc)
+        return find_imports_in_code(
+            code, path=path, root_path=root_path, resolve_relative=resolve_relative
+        )
+    return iter(imports)
+
+
+SCANNERS = {"ast": find_imports_in_code, "fast": scan_imports_in_code}
+
+
+def scan_code(code, scanner="ast", symbols=False, **kwargs):
+    """
+    Find the imports in some code with one of SCANNERS, returning a list. If
+    symbols is true, returns a tuple of (imports, symbols) instead, like
+    find_imports_and_symbols_in_code. Only the ast scanner finds symbols, with
+    other scanners they are None.
+    """
+    if symbols:
+        if scanner == "ast":
+            return find_imports_and_symbols_in_code(code, **kwargs)
+        return list(SCANNERS[scanner](code, **kwargs)), None
+    return list(SCANNERS[scanner](code, **kwargs))
+
+
 def module_matches(module, searches, allow_fnmatch=False):
     """
     Check if a module matches some search terms.
@@ -100,9 +426,64 @@ def module_exists_on_filesystem(module, path):
     )
 
 
+def _chunks(items, size):
+    for idx in range(0, len(items), size):
+        yield items[idx : idx + size]
+
+
+# set in each worker process by _init_worker, so that the analysis only has to
+# be pickled once per worker rather than once per chunk
+_worker_analysis = None
+
+
+def _init_worker(analysis):
+    global _worker_analysis  # pylint: disable=global-statement
+    _worker_analysis = analysis
+
+
+def _find_imports_in_chunk(chunk):
+    results = [
+        _worker_analysis.find_imports_in_file(module, module_path)
+        for module, module_path in chunk
+    ]
+    return results, _worker_analysis.pop_profile()
+
+
+def _find_raw_imports_in_chunk(chunk):
+    results = [
+        (module,)
+        + _worker_analysis.find_raw_imports_and_symbols_in_file(module, module_path)
+        for module, module_path in chunk
+    ]
+    return results, _worker_analysis.pop_profile()
+
+
 class ImportAnalysis:
+    # how many files each worker process gets sent at a time when jobs > 1
+    chunk_size = 64
+    # how many chunks per worker process may be in flight at a time
+    chunks_per_job = 2
+
     def __init__(
-        self, path, depth=0, include=None, exclude=None, filter=None, highlights=None
+        self,
+        path,
+        depth=0,
+        include=None,
+        exclude=None,
+        filter=None,
+        highlights=None,
+        jobs=1,
+        cache=None,
+        scanner="ast",
+        profile=None,
+        ignore_files=True,
+        discovery_threads=1,
+        source=None,
+        external_index=None,
+        group_by_distribution=False,
+        max_file_size=None,
+        large_files="fast",
+        symbols=False,
     ):
         self.path = path
         self.depth = depth
@@ -110,40 +491,146 @@ class ImportAnalysis:
         self.exclude = exclude
         self.filter = filter
         self.highlights = highlights
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache = cache
+        self.scanner = scanner
+        self.profile = profile if profile is not None else Profile()
+        self.ignore_files = ignore_files
+        self.discovery_threads = discovery_threads
+        # reads files from somewhere other than the filesystem, like a
+        # git.GitRevision. the parse cache is keyed by file stats, so it is
+        # not used for them
+        self.source = source
+        # an external.ExternalIndex to shorten imports of included external
+        # modules to actual modules, or their distribution
+        self.external_index = external_index
+        self.group_by_distribution = group_by_distribution
+        # files larger than this many bytes, like generated modules, are
+        # scanned with the fast scanner, or skipped if large_files is "skip"
+        self.max_file_size = max_file_size
+        self.large_files = large_files
+        # records the symbols of every module while parsing, to resolve
+        # imports of names from packages to the modules they come from. every
+        # file has to be parsed before any imports can be resolved then
+        self.symbol_index = SymbolIndex() if symbols else None
+        # (files analyzed, total files) if the last analysis ran out of time
+        self.partial = None
 
-        self.root_module = find_root_module(path)
+        self.root_module, self.root_path = self.find_root()
         if self.root_module:
-            log.info("guessed root module to be %r", self.root_module)
-            self.root_path = find_root_module_path(path, self.root_module)
-            log.info("guessed root path to be %r", self.root_path)
-
-            self.depth += self.root_module.count(".") + 1
+            # depth is relative to the root module
+            self.root_depth = self.root_module.count(".") + 1
+            self.depth += self.root_depth
             log.debug("depth=%d after finding root module", self.depth)
         else:
+            self.root_depth = 0
+
+        self.module_index = None
+        self.resolver = None
+        with self.profile.phase("discovery"):
+            self.set_module_files(self.discover_module_files())
+        log.info(
+            "imports to search for: %r + %r", sorted(self.search), sorted(self.include)
+        )
+
+        self.include_matcher = ModuleMatcher(self.include, allow_fnmatch=True)
+        self.highlight_matcher = ModuleMatcher(
+            self.highlights, allow_fnmatch=True, dotted=False
+        )
+        self._exclude_set = set(self.exclude or ())
+        exclude_globs = [pattern for pattern in self._exclude_set if is_glob(pattern)]
+        self._exclude_glob = (
+            compile_name_matcher(exclude_globs) if exclude_globs else None
+        )
+        self._filter_set = set(self.filter) if self.filter is not None else None
+
+    def find_root(self):
+        """
+        Guess the root module of self.path, and the path it is importable
+        from. Returns (None, self.path) if there is no root module.
+        """
+        root_module = find_root_module(self.path)
+        if not root_module:
             log.info("no root module found, analyzing all modules in PWD")
-            self.root_path = path
+            return None, self.path
+        log.info("guessed root module to be %r", root_module)
+        root_path = find_root_module_path(self.path, root_module)
+        log.info("guessed root path to be %r", root_path)
+        return root_module, root_path
 
-        self.module_files = list(
+    def discover_module_files(self):
+        return list(
             find_module_files(
                 self.path,
                 exclude=self.exclude,
                 filter=self.filter,
                 root_module=self.root_module,
+                ignore_files=self.ignore_files,
+                threads=self.discovery_threads,
+                source=self.source,
             )
         )
+
+    def set_module_files(self, module_files):
+        """
+        Set the list of (module, path) tuples to analyze, and rebuild
+        everything that is derived from it.
+        """
+        if self.module_index is not None:
+            self.profile.update(self.module_index.pop_stats())
+        self.module_files = module_files
         log.info("found %d module files", len(self.module_files))
+        self.module_index = ModuleIndex(self.module_files)
+        self._setup_resolution()
 
+    def _setup_resolution(self):
+        """
+        Rebuild everything that depends on both the module files and depth.
+        """
+        if self.resolver is not None:
+            self.profile.update(self.resolver.pop_stats())
+        self.resolver = self._create_resolver()
         self.search = set(
-            shorten_module(module, self.depth) for module, path in self.module_files
-        )
-        log.info(
-            "imports to search for: %r + %r", sorted(self.search), sorted(self.include)
+            self.resolver.shorten(module) for module, _ in self.module_files
         )
+        self.search_matcher = ModuleMatcher(self.search)
+
+    def _create_resolver(self):
+        return ModuleResolver(self.root_path, self.depth, self._find_module)
+
+    def source_root(self, module_path):
+        """
+        Get the path that a module file is importable from.
+        """
+        return self.root_path
+
+    def at_depth(self, depth):
+        """
+        Get a copy of the analysis that resolves imports at another depth. The
+        copy shares its module files, module index, cache and profile with this
+        analysis.
+        """
+        analysis = copy.copy(self)
+        analysis.depth = depth + self.root_depth
+        analysis.resolver = None
+        analysis._setup_resolution()
+        return analysis
 
     def module_exists(self, module):
-        return module_exists_on_filesystem(module, self.root_path)
+        return self.module_index.module_exists(module)
 
     def find_module(self, module):
+        """
+        Find the module an imported name belongs to, or False if there is none.
+        """
+        return self.resolver.find_module(module)
+
+    def _find_module(self, module):
+        if self.symbol_index is not None:
+            found = self.symbol_index.resolve(module, self.module_index)
+            if found:
+                return found
+
         if self.module_exists(module):
             return module
 
@@ -157,54 +644,162 @@ class ImportAnalysis:
         return False
 
     def _is_module_excluded(self, module, path=None):
-        if not self.exclude:
+        if not self._exclude_set:
             return False
 
-        if module in self.exclude:
+        if module in self._exclude_set:
             return True
 
-        if any(e in module.split(".") for e in self.exclude):
+        module_parts = module.split(".")
+        if not self._exclude_set.isdisjoint(module_parts):
             return True
 
-        if path and any(e in path.split("/") for e in self.exclude):
+        path_parts = path.split("/") if path else ()
+        if not self._exclude_set.isdisjoint(path_parts):
             return True
 
-        if self.filter is not None:
-            return not (
-                any(e in path.split("/") for e in self.filter)
-                and any(e in module.split(".") for e in self.filter)
-            )
+        if self._exclude_glob is not None:
+            if any(map(self._exclude_glob, module_parts)):
+                return True
+            if any(map(self._exclude_glob, path_parts)):
+                return True
+
+        if self._filter_set is not None:
+            in_filter = not self._filter_set.isdisjoint(path_parts)
+            return not in_filter or self._filter_set.isdisjoint(module_parts)
 
         return False
 
     def matches_highlight(self, module, import_module):
-        if not self.highlights:
+        if not self.highlight_matcher:
             return True
 
-        for highlight in self.highlights:
-            if (
-                module.startswith(highlight)
-                or fnmatch(module, highlight)
-                or import_module.startswith(highlight)
-                or fnmatch(import_module, highlight)
-            ):
-                return True
+        matches = self.highlight_matcher.matches
+        return matches(module) or matches(import_module)
 
     def find_imports_in_file(self, module, module_path):
         """
-        Scan a file for imports and add the relevant ones to the "imports" set.
+        Scan a file for imports, returning the set of edges to include in the
+        graph.
+        """
+        module_imports = self.find_raw_imports_in_file(module, module_path)
+        if module_imports is None:
+            return set()
+        return self._resolve_imports_timed(module, module_imports)
+
+    def find_raw_imports_in_file(self, module, module_path):
+        """
+        Scan a file for imports without resolving them, returning a list of
+        imported names. Returns None if the file is excluded.
+        """
+        return self.find_raw_imports_and_symbols_in_file(module, module_path)[0]
+
+    def find_raw_imports_and_symbols_in_file(self, module, module_path):
+        """
+        Like find_raw_imports_in_file, but returns a tuple of (imports,
+        symbols). symbols is None unless the analysis records symbols.
         """
         if self._is_module_excluded(module, module_path):
             log.debug(
                 "skipping module because it is in exclude: %r (%s)", module_path, module
             )
-            return []
+            self.profile.count("files_excluded")
+            return None, None
 
-        short_module = shorten_module(module, self.depth)
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
 
-        module_imports = list(find_imports_in_file(module_path, self.root_path))
+        if self.symbol_index is not None:
+            module_imports, symbols = self._find_raw_imports(module_path, symbols=True)
+        else:
+            module_imports = self._find_raw_imports(module_path)
+            symbols = None
         log.debug("found %d imports in %r", len(module_imports), module_path)
 
+        wall = time.perf_counter() - start_wall
+        profile = self.profile
+        profile.add_time("parsing", wall, time.process_time() - start_cpu)
+        profile.add_file(module_path, wall)
+        profile.count("files_scanned")
+        profile.count("imports_seen", len(module_imports))
+        return module_imports, symbols
+
+    def _resolve_imports_timed(self, module, module_imports):
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        imports = self._resolve_imports(module, module_imports)
+        self.profile.add_time(
+            "resolution",
+            time.perf_counter() - start_wall,
+            time.process_time() - start_cpu,
+        )
+        self.profile.count("imports_kept", len(imports))
+        return imports
+
+    def _find_raw_imports(self, module_path, symbols=False):
+        """
+        Find the imports of a file, returning a list. If symbols is true,
+        returns a tuple of (imports, symbols) instead.
+        """
+        scanner = self.scanner
+        if self.source is not None:
+            code = self.source.read(module_path)
+            scanner = self._scanner_for_size(module_path, len(code))
+            if scanner is None:
+                return ([], None) if symbols else []
+            return self._scan(code, module_path, scanner, symbols)
+
+        stat = os.stat(module_path)
+        self.profile.count("stat_calls")
+        scanner = self._scanner_for_size(module_path, stat.st_size)
+        if scanner is None:
+            return ([], None) if symbols else []
+        if self.cache is not None:
+            return self.cache.find_imports_in_file(
+                module_path,
+                self.source_root(module_path),
+                scanner=scanner,
+                resolve_relative=self.resolver.resolve_relative,
+                symbols=symbols,
+                stat=stat,
+            )
+        with open_source(module_path, size=stat.st_size) as code:
+            return self._scan(code, module_path, scanner, symbols)
+
+    def _scanner_for_size(self, module_path, size):
+        """
+        Files larger than max_file_size are skipped, or scanned with the fast
+        scanner. Returns the name of the scanner to use, or None to skip.
+        """
+        if self.max_file_size is None or size <= self.max_file_size:
+            return self.scanner
+        self.profile.count("files_too_large")
+        if self.large_files == "skip":
+            log.info("skipping %r, it is %d bytes", module_path, size)
+            return None
+        log.debug(
+            "scanning %r with the fast scanner, it is %d bytes", module_path, size
+        )
+        return "fast"
+
+    def _scan(self, code, module_path, scanner, symbols=False):
+        self.profile.count("bytes_read", len(code))
+        return scan_code(
+            code,
+            scanner,
+            symbols,
+            path=module_path,
+            root_path=self.source_root(module_path),
+            resolve_relative=self.resolver.resolve_relative,
+        )
+
+    def _resolve_imports(self, module, module_imports):
+        """
+        Turn the raw imports found in a module into a set of edges to include
+        in the graph.
+        """
+        shorten = self.resolver.shorten
+        short_module = shorten(module)
         imports = set()
 
         for module_import in module_imports:
@@ -215,16 +810,14 @@ class ImportAnalysis:
                 )
                 continue
 
-            short_import = shorten_module(module_import, self.depth)
+            short_import = shorten(module_import)
 
             if short_module == short_import:
                 log.debug("skipping self-import %r -> %r", module, module_import)
                 continue
 
-            is_in_include = module_matches(
-                module_import, self.include, allow_fnmatch=True
-            )
-            is_in_search = module_matches(module_import, self.search)
+            is_in_include = self.include_matcher.matches(module_import)
+            is_in_search = self.search_matcher.matches(module_import)
 
             if not is_in_include and not is_in_search:
                 log.debug(
@@ -233,7 +826,18 @@ class ImportAnalysis:
                 continue
 
             if not is_in_include:
-                short_import = self.find_module(short_import)
+                if self.symbol_index is not None:
+                    # resolve the whole name, as what it refers to can be
+                    # deeper than the depth if it is imported from a package
+                    found = self.find_module(module_import)
+                    if found:
+                        short_import = shorten(found)
+                        if short_import == short_module:
+                            continue
+                    else:
+                        short_import = self.find_module(short_import)
+                else:
+                    short_import = self.find_module(short_import)
                 if not short_import:
                     log.debug(
                         "skipping import %r -> %r, could not find it on the filesystem",
@@ -241,6 +845,8 @@ class ImportAnalysis:
                         module_import,
                     )
                     continue
+            elif self.external_index is not None and not is_in_search:
+                short_import = self._find_external_module(short_import)
 
             if not self.matches_highlight(short_module, short_import):
                 log.debug("skipping import %r, not defined as highlight")
@@ -250,13 +856,226 @@ class ImportAnalysis:
 
         return imports
 
-    def find_imports(self):
-        imports = set()
+    def _find_external_module(self, module):
+        index = self.external_index
+        if self.group_by_distribution:
+            distribution = index.distribution(module)
+            if distribution:
+                return distribution
+        # keep imports of modules that are not installed as they are
+        return index.find_module(module) or module
 
-        for module, module_path in self.module_files:
-            imports.update(self.find_imports_in_file(module, module_path))
+    def _collect_stats(self):
+        self.profile.update(self.module_index.pop_stats())
+        self.profile.update(self.resolver.pop_stats())
+        if self.symbol_index is not None:
+            self.profile.update(self.symbol_index.pop_stats())
+        if self.cache is not None:
+            self.profile.update(self.cache.pop_stats())
 
-        return imports
+    def pop_profile(self):
+        """
+        Return the profile gathered so far and start a new one. Used to move
+        profiles out of worker processes.
+        """
+        self._collect_stats()
+        profile = self.profile
+        self.profile = Profile(slowest=profile.slowest)
+        return profile
+
+    def find_imports(self, deadline=None, progress=None):
+        """
+        Find imports in all module files, returning an ImportGraph. deadline
+        and progress are as for iter_imports.
+        """
+        imports = ImportGraphBuilder()
+        imports.update(self.iter_imports(deadline=deadline, progress=progress))
+        with self.profile.phase("graph"):
+            return imports.build()
+
+    def iter_imports(self, deadline=None, progress=None):
+        """
+        Generate (module, imported_module) tuples, file by file as they are
+        analyzed, skipping duplicates.
+
+        Files are read, parsed and resolved one at a time (or a bounded number
+        of chunks at a time when jobs > 1), and their source code and syntax
+        trees are released before the next one is read. Apart from the list of
+        module files, only the edges generated so far are kept in memory.
+
+        If deadline (a time.monotonic() value) passes, the remaining files
+        are not analyzed, and self.partial is set to a tuple of (files
+        analyzed, total files). progress is called with the number of files
+        analyzed and the total number of files after each file.
+        """
+        seen = set()
+        for file_imports in self._iter_file_imports(deadline, progress):
+            for edge in file_imports:
+                if edge not in seen:
+                    seen.add(edge)
+                    yield edge
+        self._finish()
+
+    def _iter_file_imports(self, deadline, progress):
+        if self.symbol_index is not None:
+            for module, module_imports in self._iter_raw_imports(deadline, progress):
+                yield self._resolve_imports_timed(module, module_imports)
+            return
+        if self._use_processes():
+            results = self._find_imports_parallel(_find_imports_in_chunk)
+        else:
+            results = (
+                self.find_imports_in_file(module, module_path)
+                for module, module_path in self.module_files
+            )
+        yield from self._track(results, deadline, progress)
+
+    def _track(self, results, deadline=None, progress=None):
+        """
+        Generate results, one for each module file, until deadline passes.
+        """
+        self.partial = None
+        total = len(self.module_files)
+        done = 0
+        try:
+            for result in results:
+                yield result
+                done += 1
+                if progress is not None:
+                    progress(done, total)
+                if deadline is not None and done < total:
+                    if time.monotonic() >= deadline:
+                        log.info(
+                            "ran out of time after analyzing %d of %d files",
+                            done,
+                            total,
+                        )
+                        self.partial = (done, total)
+                        return
+        finally:
+            # stops worker processes right away when stopping early
+            close = getattr(results, "close", None)
+            if close is not None:
+                close()
+
+    def _use_processes(self):
+        return self.jobs > 1 and len(self.module_files) > self.chunk_size
+
+    def find_imports_at_depths(self, depths, deadline=None, progress=None):
+        """
+        Parse every file once, and build an ImportGraph for each of depths
+        from the same imports. Returns a dict of depth to ImportGraph.
+        deadline and progress are as for iter_imports.
+        """
+        analyses = [(depth, self.at_depth(depth), set()) for depth in depths]
+        for module, module_imports in self._iter_raw_imports(deadline, progress):
+            for _, analysis, edges in analyses:
+                edges.update(analysis._resolve_imports_timed(module, module_imports))
+
+        for _, analysis, _ in analyses:
+            self.profile.update(analysis.resolver.pop_stats())
+        self._finish()
+
+        with self.profile.phase("graph"):
+            return {
+                depth: ImportGraph.from_edges(edges) for depth, _, edges in analyses
+            }
+
+    def _iter_raw_imports(self, deadline=None, progress=None):
+        """
+        Generate (module, raw imports) for every file that is not excluded.
+        When recording symbols, every file is parsed and its symbols added to
+        the index before anything is generated.
+        """
+        if self._use_processes():
+            results = self._find_imports_parallel(_find_raw_imports_in_chunk)
+        else:
+            results = (
+                (module,) + self.find_raw_imports_and_symbols_in_file(module, path)
+                for module, path in self.module_files
+            )
+        results = self._track(results, deadline, progress)
+        if self.symbol_index is None:
+            return (
+                (module, module_imports)
+                for module, module_imports, _ in results
+                if module_imports is not None
+            )
+
+        raw_imports = []
+        for module, module_imports, symbols in results:
+            if module_imports is None:
+                continue
+            if symbols is not None:
+                self.symbol_index.add(module, symbols)
+            raw_imports.append((module, module_imports))
+        log.info("found symbols of %d modules", len(self.symbol_index))
+        return raw_imports
+
+    def _finish(self):
+        self._collect_stats()
+        if self.source is not None:
+            self.source.close()
+
+        counters = self.profile.counters
+        log.info(
+            "module index: %d lookups, %d hits, %d misses",
+            counters["module_lookups"],
+            counters["module_lookup_hits"],
+            counters["module_lookups"] - counters["module_lookup_hits"],
+        )
+        for name in ModuleResolver.caches:
+            hits = counters["%s_cache_hits" % name]
+            misses = counters["%s_cache_misses" % name]
+            log.debug(
+                "%s cache: %d hits, %d misses, %.1f%% hit rate",
+                name,
+                hits,
+                misses,
+                100.0 * hits / (hits + misses) if hits + misses else 0.0,
+            )
+        if self.cache is not None:
+            if counters["cache_hits"] or counters["cache_misses"]:
+                log.info(
+                    "parse cache: %d hits, %d misses",
+                    counters["cache_hits"],
+                    counters["cache_misses"],
+                )
+            self.cache.maybe_prune()
+
+    def _find_imports_parallel(self, chunk_func):
+        """
+        Spread chunk_func over a pool of worker processes, calling it with
+        chunks of self.module_files. Results are generated in the same order as
+        self.module_files.
+
+        At most chunks_per_job chunks per process are handed to the pool at a
+        time, so that results of fast workers don't pile up in memory while
+        waiting for a slow one.
+        """
+        # imported here, as it is slow to import and rarely used
+        import multiprocessing
+
+        log.info("analyzing files using %d processes", self.jobs)
+        pool = multiprocessing.Pool(
+            self.jobs, initializer=_init_worker, initargs=(self,)
+        )
+        pending = collections.deque()
+        try:
+            for chunk in _chunks(self.module_files, self.chunk_size):
+                if len(pending) >= self.jobs * self.chunks_per_job:
+                    yield from self._chunk_result(pending.popleft())
+                pending.append(pool.apply_async(chunk_func, (chunk,)))
+            while pending:
+                yield from self._chunk_result(pending.popleft())
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _chunk_result(self, async_result):
+        chunk_imports, profile = async_result.get()
+        self.profile.merge(profile)
+        return chunk_imports
 
 
 def find_imports(*args, **kwargs):
@@ -0,0 +1,50 @@
+import os.path
+
+
+class ModuleIndex:
+    """
+    In-memory index of local modules, built from the output of
+    find_module_files, so that checking whether a module exists does not need
+    to touch the filesystem.
+    """
+
+    def __init__(self, module_files=()):
+        # module name -> whether the module is a package
+        self.modules = {}
+        self.lookups = 0
+        self.hits = 0
+        for module, path in module_files:
+            self.add(module, path)
+
+    @property
+    def misses(self):
+        return self.lookups - self.hits
+
+    def add(self, module, path):
+        is_package = os.path.basename(path) == "__init__.py"
+        self.modules[module] = is_package or self.modules.get(module, False)
+
+    def __len__(self):
+        return len(self.modules)
+
+    def __contains__(self, module):
+        return module in self.modules
+
+    def module_exists(self, module):
+        self.lookups += 1
+        if module in self.modules:
+            self.hits += 1
+            return True
+        return False
+
+    def is_package(self, module):
+        return self.modules.get(module, False)
+
+    def pop_stats(self):
+        """
+        Return the lookup statistics gathered so far as a dict of counters, and
+        reset them.
+        """
+        stats = {"module_lookups": self.lookups, "module_lookup_hits": self.hits}
+        self.lookups = self.hits = 0
+        return stats
@@ -0,0 +1,80 @@
+import fnmatch
+import os.path
+import re
+
+# marks the end of a pattern in the prefix trie. not a string, so it can't
+# clash with a name part, and unlike object() it is still the same after the
+# matcher is pickled for a worker process
+_END = None
+
+_GLOB_CHARS = re.compile(r"[*?[]")
+
+
+class ModuleMatcher:
+    """
+    Compiled set of module patterns. Equivalent to calling module_matches with
+    the same patterns, but the cost of a match does not grow with the number of
+    patterns.
+
+    Exact and dotted-prefix matches ("foo" matches "foo" and "foo.bar", but not
+    "foobar") are looked up in a trie of module name parts. If allow_fnmatch is
+    true, patterns containing glob characters are also combined into a single
+    regular expression.
+
+    If dotted is false, patterns match as plain string prefixes instead ("foo"
+    also matches "foobar"), which is how highlights behave.
+    """
+
+    def __init__(self, patterns, allow_fnmatch=False, dotted=True):
+        patterns = list(patterns or ())
+        self.dotted = dotted
+        self._trie = {}
+        self._prefixes = set()
+        self._prefix_lengths = ()
+        self._regex = None
+
+        if dotted:
+            for pattern in patterns:
+                node = self._trie
+                for part in pattern.split("."):
+                    node = node.setdefault(part, {})
+                node[_END] = True
+        else:
+            self._prefixes = set(patterns)
+            self._prefix_lengths = sorted(set(len(p) for p in patterns))
+
+        globs = [p for p in patterns if _GLOB_CHARS.search(p)]
+        if allow_fnmatch and globs:
+            self._regex = re.compile(
+                "|".join(
+                    "(?:%s)" % fnmatch.translate(os.path.normcase(glob))
+                    for glob in globs
+                )
+            )
+
+    def __bool__(self):
+        return bool(self._trie or self._prefixes)
+
+    def _matches_prefix(self, module):
+        if not self.dotted:
+            return any(
+                module[:length] in self._prefixes for length in self._prefix_lengths
+            )
+
+        node = self._trie
+        for part in module.split("."):
+            node = node.get(part)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+    def matches(self, module):
+        if self._matches_prefix(module):
+            return True
+        if self._regex is not None and self._regex.match(os.path.normcase(module)):
+            return True
+        return False
+
+    __call__ = matches
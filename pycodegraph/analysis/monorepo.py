@@ -0,0 +1,137 @@
+"""
+Analysis of many packages at once, like in a monorepo where each project has
+its own setup.py, setup.cfg or pyproject.toml.
+"""
+
+import logging
+import os
+import os.path
+
+from .discovery import walk_python_files
+from .imports import ImportAnalysis
+from .resolver import ModuleResolver
+
+log = logging.getLogger(__name__)
+
+# files marking the directory of a project
+PROJECT_FILES = ("setup.py", "setup.cfg", "pyproject.toml")
+
+
+def _parent(relpath):
+    return relpath.rpartition("/")[0]
+
+
+def find_project_module_files(
+    root_path, exclude=None, filter=None, ignore_files=True, threads=1
+):
+    """
+    Find the python files of every project below root_path in one pass, and
+    name their modules relative to the project they belong to. Modules of a
+    project are importable from its src directory if it has one, and from the
+    project directory otherwise. Files outside of any project are importable
+    from root_path.
+
+    Generates tuples of (module, path, source_root), where source_root is the
+    path the module is importable from.
+    """
+    files = list(
+        walk_python_files(
+            root_path,
+            exclude=exclude,
+            filter=filter,
+            ignore_files=ignore_files,
+            threads=threads,
+            extra_files=PROJECT_FILES,
+        )
+    )
+    projects = set()
+    for relpath, _ in files:
+        dirname, _, filename = relpath.rpartition("/")
+        if filename in PROJECT_FILES:
+            projects.add(dirname)
+    log.info("found %d projects in %r", len(projects), root_path)
+
+    # directory relpath -> relpath of the source root its files belong to
+    source_roots = {}
+
+    def find_source_root(dirname):
+        source_root = source_roots.get(dirname)
+        if source_root is not None:
+            return source_root
+        if dirname in projects:
+            source_root = dirname
+        elif dirname.rpartition("/")[2] == "src" and _parent(dirname) in projects:
+            source_root = dirname
+        elif not dirname:
+            source_root = ""
+        else:
+            source_root = find_source_root(_parent(dirname))
+        source_roots[dirname] = source_root
+        return source_root
+
+    for relpath, path in files:
+        dirname, _, filename = relpath.rpartition("/")
+        if not filename.endswith(".py") or filename in PROJECT_FILES:
+            continue
+        source_root = find_source_root(dirname)
+        module_relpath = relpath[len(source_root) + 1 :] if source_root else relpath
+        module = module_relpath[:-3].replace("/", ".")
+        if module.endswith(".__init__"):
+            module = module[: -len(".__init__")]
+        elif module == "__init__":
+            log.warning("could not guess module of %r", relpath)
+            continue
+        if source_root:
+            yield module, path, os.path.join(root_path, source_root)
+        else:
+            yield module, path, root_path
+
+
+class MonorepoAnalysis(ImportAnalysis):
+    """
+    Analyzes every project below a path in one pass, sharing the file scan,
+    parse cache and module index between them. There is no root module, so
+    depth 0 shows the imports between top-level packages.
+    """
+
+    def find_root(self):
+        return None, os.path.abspath(self.path)
+
+    def discover_module_files(self):
+        if self.source is not None:
+            raise ValueError("monorepos can only be analyzed on the filesystem")
+        module_files = []
+        # directory -> (source root, package) of the module files in it
+        self._dirs = {}
+        for module, path, source_root in find_project_module_files(
+            self.root_path,
+            exclude=self.exclude,
+            filter=self.filter,
+            ignore_files=self.ignore_files,
+            threads=self.discovery_threads,
+        ):
+            module_files.append((module, path))
+            if os.path.basename(path) == "__init__.py":
+                package = module
+            else:
+                package = module.rpartition(".")[0]
+            self._dirs[os.path.dirname(path)] = (source_root, package)
+        self.packages = sorted(
+            set(module.split(".", 1)[0] for module, _ in module_files)
+        )
+        log.info("found %d top-level packages", len(self.packages))
+        return module_files
+
+    def _create_resolver(self):
+        return ModuleResolver(
+            self.root_path,
+            self.depth,
+            self._find_module,
+            package_of_dir=self._package_of_dir,
+        )
+
+    def _package_of_dir(self, src_dir):
+        return self._dirs[os.path.abspath(src_dir)][1]
+
+    def source_root(self, module_path):
+        return self._dirs[os.path.dirname(module_path)][0]
@@ -0,0 +1,86 @@
+from collections import Counter
+import contextlib
+import heapq
+import time
+
+
+class Profile:
+    """
+    Collects wall and CPU time per phase, counters and the slowest files of an
+    analysis. Profiles from worker processes can be merged into the main one.
+    """
+
+    def __init__(self, slowest=10):
+        # phase -> [wall seconds, cpu seconds]
+        self.phases = {}
+        self.counters = Counter()
+        self.slowest = slowest
+        # min-heap of (seconds, path), so the fastest file is easy to drop
+        self._slowest_files = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def add_time(self, name, wall, cpu):
+        times = self.phases.setdefault(name, [0.0, 0.0])
+        times[0] += wall
+        times[1] += cpu
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def update(self, counters):
+        self.counters.update(counters)
+
+    def add_file(self, path, seconds):
+        item = (seconds, path)
+        if len(self._slowest_files) < self.slowest:
+            heapq.heappush(self._slowest_files, item)
+        elif item > self._slowest_files[0]:
+            heapq.heapreplace(self._slowest_files, item)
+
+    @property
+    def slowest_files(self):
+        return sorted(self._slowest_files, reverse=True)
+
+    def merge(self, other):
+        for name, (wall, cpu) in other.phases.items():
+            self.add_time(name, wall, cpu)
+        self.counters.update(other.counters)
+        for seconds, path in other._slowest_files:
+            self.add_file(path, seconds)
+
+    def to_dict(self):
+        return {
+            "phases": {
+                name: {"wall": wall, "cpu": cpu}
+                for name, (wall, cpu) in self.phases.items()
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "slowest_files": [
+                {"path": path, "seconds": seconds}
+                for seconds, path in self.slowest_files
+            ],
+        }
+
+    def format(self):
+        lines = ["%-12s %10s %10s" % ("phase", "wall", "cpu")]
+        for name, (wall, cpu) in self.phases.items():
+            lines.append("%-12s %9.3fs %9.3fs" % (name, wall, cpu))
+        if self.counters:
+            lines.append("")
+            width = max(len(name) for name in self.counters)
+            for name, value in sorted(self.counters.items()):
+                lines.append("%-*s %12d" % (width, name, value))
+        if self._slowest_files:
+            lines.append("")
+            lines.append("slowest files:")
+            for seconds, path in self.slowest_files:
+                lines.append("%9.3fs  %s" % (seconds, path))
+        return "\n".join(lines)
@@ -0,0 +1,69 @@
+"""
+Reading source files as bytes, leaving decoding to the parser.
+"""
+
+import codecs
+import contextlib
+import mmap
+import os
+import re
+
+# files of at least this many bytes are memory-mapped instead of read
+MMAP_THRESHOLD = 1024 * 1024
+
+_COOKIE_RE = re.compile(rb"^[ \t\f]*#.*?coding[:=][ \t]*([-\w.]+)")
+# only this much of each line is looked at for coding comments, as generated
+# files can have very long lines
+_MAX_LINE = 1024
+
+# prefixes of the names of encodings where bytes below 128 always are ASCII
+# characters, so that import statements can be found without decoding
+_ASCII_COMPATIBLE = ("utf-8", "ascii", "latin", "iso8859", "cp125", "koi8", "mac-")
+
+
+@contextlib.contextmanager
+def open_source(path, mmap_threshold=MMAP_THRESHOLD, size=None):
+    """
+    Open a file for reading its source code, as a context manager giving its
+    contents as bytes, or as an mmap for large files. Both support the buffer
+    protocol and regexes with bytes patterns. Passing the size of the file, if
+    it is already known, saves a stat call.
+    """
+    with open(path, "rb") as filehandle:
+        if size is None:
+            size = os.fstat(filehandle.fileno()).st_size
+        if size < mmap_threshold or size == 0:
+            yield filehandle.read()
+            return
+        with mmap.mmap(filehandle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def source_encoding(data):
+    """
+    Find the encoding of some source code per PEP 263: a UTF-8 byte order mark,
+    or a coding comment on the first or second line. Defaults to utf-8.
+    Returns the normalized name of the encoding.
+    """
+    if data[:3] == codecs.BOM_UTF8:
+        return "utf-8"
+    start = 0
+    for _ in range(2):
+        end = data.find(b"\n", start, start + _MAX_LINE)
+        line = data[start : start + _MAX_LINE] if end == -1 else data[start:end]
+        match = _COOKIE_RE.match(line)
+        if match:
+            try:
+                return codecs.lookup(match.group(1).decode("ascii")).name
+            except LookupError:
+                # let the parser complain about it
+                return "utf-8"
+        stripped = line.strip()
+        if end == -1 or (stripped and not stripped.startswith(b"#")):
+            break
+        start = end + 1
+    return "utf-8"
+
+
+def is_ascii_compatible(encoding):
+    return encoding.startswith(_ASCII_COMPATIBLE)
@@ -0,0 +1,91 @@
+import functools
+import os.path
+
+from . import shorten_module
+
+DEFAULT_CACHE_SIZE = 65536
+
+
+class ModuleResolver:
+    """
+    Memoizes the module name computations done for every import of an
+    analysis: shortening names to the analysis depth, finding the closest
+    existing module, and turning directories into package names for relative
+    imports. Files in the same directory import many of the same modules, so
+    most of these are repeats.
+
+    A resolver is only valid for one set of module files, as find_module
+    depends on them. Each cache keeps at most cache_size entries, evicting the
+    least recently used ones.
+    """
+
+    # names of the memoized methods
+    caches = ("shorten", "find_module", "package_of_dir")
+
+    def __init__(
+        self,
+        root_path,
+        depth,
+        find_module,
+        cache_size=DEFAULT_CACHE_SIZE,
+        package_of_dir=None,
+    ):
+        self.root_path = root_path
+        self.depth = depth
+        self._find_module = find_module
+        self.cache_size = cache_size
+        # replaces guessing the package of a directory from its path relative
+        # to root_path, for when there is more than one root
+        self._find_package_of_dir = package_of_dir
+        self._setup_caches()
+
+    def _setup_caches(self):
+        cache = functools.lru_cache(maxsize=self.cache_size)
+        self.shorten = cache(self._shorten)
+        self.find_module = cache(self._find_module)
+        self.package_of_dir = cache(self._find_package_of_dir or self._package_of_dir)
+        # cache_info at the time of the last pop_stats
+        self._reported = {name: (0, 0) for name in self.caches}
+
+    def __getstate__(self):
+        # lru_cache wrappers can't be pickled, so worker processes start with
+        # empty caches of their own
+        state = self.__dict__.copy()
+        for name in self.caches:
+            del state[name]
+        del state["_reported"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._setup_caches()
+
+    def _shorten(self, module):
+        return shorten_module(module, self.depth)
+
+    def _package_of_dir(self, src_dir):
+        src_path = os.path.relpath(os.path.abspath(src_dir), self.root_path)
+        return src_path.replace(".py", "").replace("/", ".")
+
+    def resolve_relative(self, path, module, level):
+        """
+        Same as imports.resolve_relative_module, for a path below root_path.
+        """
+        bits = self.package_of_dir(os.path.dirname(path)).rsplit(".", level - 1)
+        if len(bits) < level:
+            raise ValueError("attempted relative import beyond top-level package")
+        base = bits[0]
+        return "%s.%s" % (base, module) if module else base
+
+    def pop_stats(self):
+        """
+        Return hits and misses of each cache since the last call.
+        """
+        stats = {}
+        for name in self.caches:
+            info = getattr(self, name).cache_info()
+            hits, misses = self._reported[name]
+            stats["%s_cache_hits" % name] = info.hits - hits
+            stats["%s_cache_misses" % name] = info.misses - misses
+            self._reported[name] = (info.hits, info.misses)
+        return stats
@@ -0,0 +1,103 @@
+"""
+Index of the names modules define and import at their top level, for telling
+attributes from submodules in imports like `from package import name`.
+"""
+
+
+class SymbolIndex:
+    """
+    In-memory index of the symbols of every module, recorded while parsing:
+    the names a module defines at its top level, the names it imports and what
+    they were imported from, and the modules it star-imports.
+
+    With `from a import b`, b can be a submodule of a, or an attribute of a.
+    If a is a package, the attribute is often defined in a submodule of a, and
+    re-exported by a/__init__.py. The index is used to find which module b
+    actually comes from, without guessing.
+    """
+
+    def __init__(self):
+        # module -> (defined names, {name: imported name}, star-imported modules)
+        self.modules = {}
+        self.followed = 0
+
+    def add(self, module, symbols):
+        """
+        Add the symbols of a module, a dict like the ones made by
+        imports.find_imports_and_symbols_in_code.
+        """
+        self.modules[module] = (
+            frozenset(symbols["defined"]),
+            dict(symbols["imported"]),
+            tuple(symbols["star"]),
+        )
+
+    def remove(self, module):
+        self.modules.pop(module, None)
+
+    def get(self, module):
+        return self.modules.get(module)
+
+    def __len__(self):
+        return len(self.modules)
+
+    def __contains__(self, module):
+        return module in self.modules
+
+    def resolve(self, name, module_index):
+        """
+        Find the module an imported name belongs to: the name itself if it is a
+        module, or the module it is defined in. Names imported from packages
+        are followed to where the package imported them from. Returns None if
+        neither the name nor its parent is in module_index.
+        """
+        found = None
+        seen = set()
+        while name not in seen:
+            seen.add(name)
+            if module_index.module_exists(name):
+                return name
+            parent, _, attr = name.rpartition(".")
+            if not parent or not module_index.module_exists(parent):
+                break
+            found = parent
+            if not module_index.is_package(parent):
+                break
+            name = self._find_symbol(parent, attr)
+            if name is None:
+                break
+            self.followed += 1
+        return found
+
+    def _find_symbol(self, package, attr):
+        """
+        Find the full name of what a package imported as attr, or None if the
+        package defines attr itself, or it is not known where attr came from.
+        """
+        symbols = self.modules.get(package)
+        if symbols is None:
+            return None
+        defined, imported, star = symbols
+        if attr in imported:
+            return imported[attr]
+        if attr in defined:
+            return None
+        for module in star:
+            if self._exports(module, attr):
+                return "%s.%s" % (module, attr)
+        return None
+
+    def _exports(self, module, attr):
+        if attr.startswith("_"):
+            return False
+        symbols = self.modules.get(module)
+        return symbols is not None and (attr in symbols[0] or attr in symbols[1])
+
+    def pop_stats(self):
+        """
+        Return the statistics gathered so far as a dict of counters, and reset
+        them.
+        """
+        stats = {"symbols_followed": self.followed}
+        self.followed = 0
+        return stats
@@ -0,0 +1,172 @@
+import logging
+import os
+import time
+
+from pycodegraph.graph import ImportGraphBuilder
+from .matcher import ModuleMatcher
+
+log = logging.getLogger(__name__)
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _FileState:
+    __slots__ = ("module", "stat", "raw_imports", "imports")
+
+    def __init__(self, module, stat, raw_imports, imports):
+        self.module = module
+        self.stat = stat
+        self.raw_imports = raw_imports
+        self.imports = imports
+
+
+class IncrementalAnalysis:
+    """
+    Keeps the raw imports and edges of every file of an ImportAnalysis in
+    memory, so that when files change, only those files need to be parsed
+    again.
+
+    When modules are added or removed, imports of those modules are resolved
+    again from the raw imports kept in memory, without parsing the importing
+    files. So is every import when the symbols of a module change, if the
+    analysis records symbols.
+    """
+
+    def __init__(self, analysis):
+        self.analysis = analysis
+        self.files = {}
+        for module, path in analysis.module_files:
+            self.files[path] = self._scan_file(module, path)[0]
+        # all files are scanned before resolving any imports, as resolving
+        # them can need the symbols of any module
+        for state in self.files.values():
+            self._resolve(state)
+
+    def _scan_file(self, module, path):
+        """
+        Scan a file for raw imports, leaving them to be resolved by _resolve.
+        Returns a _FileState, and whether the symbols of the module changed.
+        """
+        analysis = self.analysis
+        stat = _stat(path)
+        if analysis._is_module_excluded(module, path):
+            return _FileState(module, stat, [], set()), False
+        symbols = None
+        try:
+            if analysis.symbol_index is None:
+                raw_imports = analysis._find_raw_imports(path)
+            else:
+                raw_imports, symbols = analysis._find_raw_imports(path, symbols=True)
+        except OSError as exc:
+            # removed since it was found, like during a checkout or an atomic
+            # save. it is scanned again if it comes back, and dropped by the
+            # next refresh otherwise
+            log.info("could not read %r: %s", path, exc)
+            stat = None
+            raw_imports = []
+        if analysis.symbol_index is None:
+            return _FileState(module, stat, raw_imports, None), False
+        old_symbols = analysis.symbol_index.get(module)
+        if symbols is None:
+            analysis.symbol_index.remove(module)
+        else:
+            analysis.symbol_index.add(module, symbols)
+        changed = analysis.symbol_index.get(module) != old_symbols
+        return _FileState(module, stat, raw_imports, None), changed
+
+    def _resolve(self, state):
+        state.imports = self.analysis._resolve_imports(state.module, state.raw_imports)
+
+    def graph(self):
+        builder = ImportGraphBuilder()
+        for state in self.files.values():
+            builder.update(state.imports)
+        return builder.build()
+
+    def refresh(self):
+        """
+        Check for added, changed and removed files, and update the edges of the
+        files affected by them. Returns True if any edges may have changed.
+        """
+        analysis = self.analysis
+        module_files = analysis.discover_module_files()
+        new_paths = {path: module for module, path in module_files}
+
+        removed = [path for path in self.files if path not in new_paths]
+        added = []
+        changed = []
+        for module, path in module_files:
+            state = self.files.get(path)
+            if state is None or state.module != module:
+                added.append(path)
+            elif _stat(path) != state.stat:
+                changed.append(path)
+
+        if not (removed or added or changed):
+            return False
+
+        symbol_index = analysis.symbol_index
+        symbols_changed = False
+        matcher = None
+        if removed or added:
+            old_modules = set(analysis.module_index.modules)
+            old_search = analysis.search
+            analysis.set_module_files(module_files)
+            affected = old_modules.symmetric_difference(analysis.module_index.modules)
+            affected.update(old_search.symmetric_difference(analysis.search))
+            matcher = ModuleMatcher(affected)
+
+            for path in removed + added:
+                state = self.files.pop(path, None)
+                if state is not None and symbol_index is not None:
+                    symbols_changed = symbols_changed or state.module in symbol_index
+                    symbol_index.remove(state.module)
+
+        rescan = set(added).union(changed)
+        for path in added + changed:
+            self.files[path], changed_symbols = self._scan_file(new_paths[path], path)
+            symbols_changed = symbols_changed or changed_symbols
+
+        if symbols_changed:
+            # find_module is memoized, and depends on the symbols
+            analysis._setup_resolution()
+
+        reresolved = 0
+        for path, state in self.files.items():
+            if path in rescan:
+                self._resolve(state)
+            elif symbols_changed or (
+                matcher is not None
+                and any(matcher.matches(imp) for imp in state.raw_imports)
+            ):
+                self._resolve(state)
+                reresolved += 1
+
+        log.info(
+            "%d files added, %d changed, %d removed, %d resolved again",
+            len(added),
+            len(changed),
+            len(removed),
+            reresolved,
+        )
+        return True
+
+    def watch(self, callback, interval=1.0):
+        """
+        Call callback with the graph, and then again every time it may have
+        changed. Polls for changes every interval seconds, forever.
+        """
+        callback(self.graph())
+        while True:
+            time.sleep(interval)
+            start = time.perf_counter()
+            if self.refresh():
+                graph = self.graph()
+                log.info("updated graph in %.3fs", time.perf_counter() - start)
+                callback(graph)
@@ -0,0 +1,27 @@
+"""
+Writing files that other processes may be reading at the same time.
+"""
+
+import json
+import os
+import os.path
+import tempfile
+
+
+def atomic_write_json(path, data):
+    """
+    Write data to path as JSON, creating its directory if needed. The data is
+    written to a temporary file which is then renamed into place, so readers
+    either see the old file or the complete new one. Raises OSError if the file
+    can not be written.
+    """
+    dirname = os.path.dirname(path)
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as filehandle:
+            json.dump(data, filehandle)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
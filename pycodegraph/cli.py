@@ -2,37 +2,156 @@
 
 from __future__ import print_function
 import argparse
-import importlib
 import logging
 import os
+import sys
+import time
 
-import allib.logging
+# startup time matters, as the command is often run many times in a row from
+# scripts and hooks. modules not needed by every command are imported where
+# they are used
 
 log = logging.getLogger(__name__)
 
 
+class DepthsAction(argparse.Action):
+    """
+    Parse a depth, or a comma separated list of depths. The lowest depth is
+    stored as depth, and all of them as depths.
+    """
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        try:
+            depths = sorted(set(int(depth) for depth in values.split(",")))
+        except ValueError:
+            parser.error("invalid depth: %r" % values)
+        namespace.depth = depths[0]
+        namespace.depths = depths
+
+
+def package_output_path(value):
+    if "{package}" not in value:
+        raise argparse.ArgumentTypeError("must contain {package}")
+    return value
+
+
+class ProgressMeter(object):
+    """
+    Show how many files have been analyzed on a single line of a stream,
+    updated at most every interval seconds.
+    """
+
+    def __init__(self, stream, interval=0.1):
+        self.stream = stream
+        self.interval = interval
+        self.last = None
+
+    def __call__(self, done, total):
+        now = time.monotonic()
+        if done < total and self.last is not None and now - self.last < self.interval:
+            return
+        self.last = now
+        self.stream.write(
+            "\ranalyzed %d of %d files (%d%%)" % (done, total, 100 * done // total)
+        )
+        self.stream.flush()
+
+    def close(self):
+        if self.last is not None:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
 class Entrypoint(object):
+    # whether the command takes the path to the code as an argument
+    takes_path = True
+
     def __init__(self, parser=None):
         self.parser = parser or argparse.ArgumentParser()
         self.add_argument = self.parser.add_argument
         self.parse_args = self.parser.parse_args
-        self.add_argument(
-            "path",
-            type=str,
-            nargs="?",
-            default=os.getcwd(),
-            help="path to your Python code. defaults to pwd",
-        )
+        if self.takes_path:
+            self.add_argument(
+                "path",
+                type=str,
+                nargs="?",
+                default=os.getcwd(),
+                help="path to your Python code. defaults to pwd",
+            )
         self.add_argument("-v", "--verbose", action="store_true")
         self.add_argument("-vv", "--very-verbose", action="store_true")
 
     def run(self, args):
         raise NotImplementedError("Entrypoint must implement run method")
 
+    def write_output(self, args, write):
+        """
+        Call write with a file object for either --output or stdout.
+        """
+        if args.output:
+            with open(args.output, "w") as stream:
+                write(stream)
+        else:
+            write(sys.stdout)
+
+    def load_snapshot(self, path):
+        from pycodegraph.snapshot import load_snapshot, SnapshotError
+
+        try:
+            return load_snapshot(path)
+        except SnapshotError as exc:
+            return self.parser.error(str(exc))
+
 
 class ImportsEntrypoint(Entrypoint):
+    """
+    Draw a graph of the imports between modules.
+    """
+
+    # whether the command renders a graph, and so takes --format
+    renders_graph = True
+    # whether the command can keep running to update its output when files
+    # change, and so takes --watch
+    watches = True
+    # whether the command can write imports as soon as they are found, and so
+    # takes --stream
+    streams = True
+    # whether the command analyzes the code once and writes the result, and so
+    # takes --output, --progress and --time-budget
+    writes_result = True
+    # (files analyzed, total files) if the analysis ran out of time
+    partial = None
+    deadline = None
+    progress = None
+
     def __init__(self, parser=None):
         super(ImportsEntrypoint, self).__init__(parser=parser)
+        if self.renders_graph:
+            from pycodegraph.renderers import DEFAULT_FORMAT, RENDERERS
+
+            self.add_argument(
+                "-f",
+                "--format",
+                choices=sorted(RENDERERS),
+                default=DEFAULT_FORMAT,
+                help="output format. defaults to %s" % DEFAULT_FORMAT,
+            )
+            if self.streams:
+                self.add_argument(
+                    "--stream",
+                    action="store_true",
+                    help="write imports as soon as they are found, in the order "
+                    "they are found instead of sorted. only supported by the "
+                    "lines and jsonl formats",
+                )
+            self.add_argument(
+                "--package-output",
+                type=package_output_path,
+                metavar="PATH",
+                help="also write the imports of each top-level package to PATH, "
+                "where {package} is replaced by the name of the package. "
+                "useful with --monorepo",
+            )
         self.add_argument(
             "-c",
             "--clusters",
@@ -42,10 +161,13 @@ class ImportsEntrypoint(Entrypoint):
         self.add_argument(
             "-d",
             "--depth",
-            type=int,
+            action=DepthsAction,
             default=0,
-            help="inspect submodules as well as top-level modules",
+            help="inspect submodules as well as top-level modules. the imports "
+            "command takes a comma separated list of depths to render a graph "
+            "for each of them from one analysis",
         )
+        self.parser.set_defaults(depths=[0])
         self.add_argument(
             "--highlight",
             type=str,
@@ -68,39 +190,792 @@ class ImportsEntrypoint(Entrypoint):
             help="patterns of directories/submodules that should not be graphed. "
             "useful for tests, for example",
         )
+        self.add_argument(
+            "--monorepo",
+            action="store_true",
+            help="analyze every project below path, each in a directory with "
+            "its own setup.py, setup.cfg or pyproject.toml, as one graph",
+        )
+        self.add_argument(
+            "--external-index",
+            action="store_true",
+            help="shorten imports of included external modules to the actual "
+            "modules instead of whatever name was imported, using an index of "
+            "the modules on sys.path",
+        )
+        self.add_argument(
+            "--group-by-distribution",
+            action="store_true",
+            help="show included external modules as the distribution that "
+            "installed them, like PyYAML for yaml. implies --external-index",
+        )
+        self.add_argument(
+            "--no-ignore-files",
+            action="store_true",
+            help="do not skip files and directories ignored by .gitignore or "
+            ".ignore files",
+        )
+        self.add_argument(
+            "--discovery-threads",
+            type=int,
+            default=1,
+            help="number of threads to use for finding python files. can help "
+            "on network filesystems. defaults to 1",
+        )
+        if self.writes_result:
+            self.add_argument(
+                "-o",
+                "--output",
+                type=str,
+                help="file to write the graph to. defaults to stdout",
+            )
+        self.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            help="number of processes to use for parsing files. 0 means one per "
+            "CPU. defaults to 1",
+        )
+        self.add_argument(
+            "--scanner",
+            choices=("ast", "fast"),
+            default="ast",
+            help="how to find imports in files. fast only looks for import "
+            "statements instead of parsing the whole file. defaults to ast",
+        )
+        self.add_argument(
+            "--resolve-symbols",
+            action="store_true",
+            help="record the names each module defines and imports, so that "
+            "names imported from a package resolve to the module they come "
+            "from, following re-exports in __init__.py. only the ast scanner "
+            "records them",
+        )
+        self.add_argument(
+            "--max-file-size",
+            type=int,
+            metavar="BYTES",
+            help="files larger than this, like huge generated modules, are "
+            "handled as set by --large-files",
+        )
+        self.add_argument(
+            "--large-files",
+            choices=("fast", "skip"),
+            default="fast",
+            help="whether to scan files larger than --max-file-size with the "
+            "fast scanner, or to skip them. defaults to fast",
+        )
+        self.add_argument(
+            "--cache-dir",
+            type=str,
+            help="directory to cache parsed imports in. defaults to "
+            "pycodegraph in the user's cache directory, like ~/.cache/pycodegraph",
+        )
+        self.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="do not read or write the parse cache",
+        )
+        if self.watches:
+            self.add_argument(
+                "--watch",
+                action="store_true",
+                help="keep running, and render the graph again whenever files "
+                "change",
+            )
+            self.add_argument(
+                "--watch-interval",
+                type=float,
+                default=1.0,
+                help="how often to check for changed files in watch mode, in "
+                "seconds",
+            )
+        if self.writes_result:
+            self.add_argument(
+                "--progress",
+                action="store_true",
+                help="show how many files have been analyzed on stderr",
+            )
+            self.add_argument(
+                "--time-budget",
+                type=float,
+                metavar="SECONDS",
+                help="stop analyzing files after this many seconds, and output "
+                "what was found so far, marked as partial",
+            )
+        else:
+            self.parser.set_defaults(time_budget=None)
+        self.add_argument(
+            "--profile",
+            action="store_true",
+            help="print time spent per phase, counters and the slowest files to "
+            "stderr",
+        )
+        self.add_argument(
+            "--stats-json",
+            type=str,
+            metavar="PATH",
+            help="write the same information as --profile to a JSON file",
+        )
+        self.add_argument(
+            "--rev",
+            type=str,
+            help="analyze a git revision (commit, branch or tag) instead of the "
+            "files on disk, without checking it out",
+        )
+        self.add_argument(
+            "--save",
+            type=str,
+            metavar="PATH",
+            help="save the analyzed graph to a snapshot file, which can be "
+            "used with --load or the diff command",
+        )
+        self.add_argument(
+            "--load",
+            type=str,
+            metavar="PATH",
+            help="use the graph from a snapshot file instead of analyzing the "
+            "code. options that affect the analysis are ignored",
+        )
 
     def run(self, args):
-        from pycodegraph.analysis.imports import find_imports
+        from pycodegraph.renderers import get_renderer
+
+        renderer = get_renderer(args.format)
+        if args.stream:
+            if not hasattr(renderer, "stream_to"):
+                self.parser.error("--stream is not supported by %s" % args.format)
+            if args.load or args.watch or len(args.depths) > 1:
+                self.parser.error(
+                    "--stream can not be combined with --load, --watch or "
+                    "multiple depths"
+                )
+        if len(args.depths) > 1:
+            return self.run_depths(args)
+        if args.watch:
+            if args.load or args.rev or args.jobs != 1:
+                self.parser.error(
+                    "--load, --rev and --jobs can not be combined with --watch"
+                )
+            if args.progress or args.time_budget:
+                self.parser.error(
+                    "--progress and --time-budget can not be combined with --watch"
+                )
+            return self.watch(args)
+
+        if args.stream:
+            imports = self.analyze_streaming(args, renderer)
+            with self.profile.phase("rendering"):
+                if args.package_output:
+                    self.render_packages(args, imports)
+        else:
+            imports = self.analyze(args)
+            with self.profile.phase("rendering"):
+                self.render(args, imports)
+                if args.package_output:
+                    self.render_packages(args, imports)
+        self.report_profile(args)
+        return 0
+
+    def analyze_streaming(self, args, renderer):
+        """
+        Analyze the code, writing each import to the output as soon as it is
+        found. Returns the graph of all the imports once they are written.
+        """
+        from pycodegraph.graph import ImportGraphBuilder
+
+        analysis = self.create_analysis(args)
+        builder = ImportGraphBuilder()
+
+        def edges():
+            for src_module, target_module in analysis.iter_imports(**self.limits(args)):
+                builder.add_edge(src_module, target_module)
+                yield src_module, target_module
+
+        self.write_output(
+            args,
+            lambda stream: renderer.stream_to(
+                stream, edges(), partial=lambda: analysis.partial
+            ),
+        )
+        with self.profile.phase("graph"):
+            imports = builder.build()
+        self.analyzed(args, analysis, imports)
+        return imports
+
+    def render_packages(self, args, imports):
+        """
+        Render the imports of each top-level package to its own file.
+        """
+        from pycodegraph.algorithms import split_by_package
+
+        for package, graph in sorted(split_by_package(imports).items()):
+            package_args = argparse.Namespace(**vars(args))
+            package_args.output = args.package_output.replace("{package}", package)
+            self.render(package_args, graph)
+
+    def run_depths(self, args):
+        """
+        Analyze the code once, and render a graph for each of args.depths.
+        """
+        if args.load or args.watch or args.package_output:
+            self.parser.error(
+                "--load, --watch and --package-output can not be used with "
+                "multiple depths"
+            )
+        if not args.output or "{depth}" not in args.output:
+            self.parser.error(
+                "--output must contain {depth} when using multiple depths"
+            )
+        if args.save and "{depth}" not in args.save:
+            self.parser.error("--save must contain {depth} when using multiple depths")
+
+        analysis = self.create_analysis(args)
+        graphs = analysis.find_imports_at_depths(args.depths, **self.limits(args))
+        self.stop_progress(analysis)
+        for depth in args.depths:
+            imports = graphs[depth]
+            log.info("found total of %d imports at depth %d", len(imports), depth)
+            depth_args = argparse.Namespace(**vars(args))
+            depth_args.depth = depth
+            depth_args.output = args.output.replace("{depth}", str(depth))
+            if args.save:
+                depth_args.save = args.save.replace("{depth}", str(depth))
+                self.save(depth_args, analysis, imports)
+            with self.profile.phase("rendering"):
+                self.render(depth_args, imports)
+        self.report_profile(args)
+        return 0
+
+    def check_single_depth(self, args):
+        if len(args.depths) > 1:
+            self.parser.error("multiple depths are only supported by imports")
+
+    def watch(self, args):
+        from pycodegraph.analysis.watch import IncrementalAnalysis
 
+        def render(imports):
+            self.render(args, imports)
+            sys.stdout.flush()
+
+        incremental = IncrementalAnalysis(self.create_analysis(args))
+        try:
+            incremental.watch(render, interval=args.watch_interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    def create_analysis(self, args):
+        from pycodegraph.analysis.imports import ImportAnalysis
+
+        self.deadline = None
+        if args.time_budget is not None:
+            self.deadline = time.monotonic() + args.time_budget
         include = args.include or []
         exclude = args.exclude or []
+        cache = cache_dir = None
+        if not args.no_cache:
+            from pycodegraph.analysis.cache import ParseCache, default_cache_dir
+
+            cache_dir = args.cache_dir or default_cache_dir()
+            cache = ParseCache(cache_dir)
+        source = None
+        if args.rev:
+            if args.monorepo:
+                self.parser.error("--monorepo can not be combined with --rev")
+            from pycodegraph.analysis.git import GitRevision, GitError
+
+            try:
+                source = GitRevision(args.path, args.rev)
+            except GitError as exc:
+                self.parser.error(str(exc))
+        external_index = None
+        if args.external_index or args.group_by_distribution:
+            from pycodegraph.analysis.external import (
+                default_paths,
+                load_external_index,
+            )
+
+            external_index = load_external_index(default_paths(), cache_dir=cache_dir)
 
-        imports = find_imports(
+        if args.monorepo:
+            from pycodegraph.analysis.monorepo import MonorepoAnalysis
+
+            analysis_cls = MonorepoAnalysis
+        else:
+            analysis_cls = ImportAnalysis
+        analysis = analysis_cls(
             args.path,
             depth=args.depth,
             include=include,
             exclude=exclude,
             highlights=args.highlight,
+            jobs=args.jobs,
+            cache=cache,
+            scanner=args.scanner,
+            ignore_files=not args.no_ignore_files,
+            discovery_threads=args.discovery_threads,
+            source=source,
+            external_index=external_index,
+            group_by_distribution=args.group_by_distribution,
+            max_file_size=args.max_file_size,
+            large_files=args.large_files,
+            symbols=args.resolve_symbols,
         )
+        self.profile = analysis.profile
+        self.analysis = analysis
+        return analysis
+
+    def analyze(self, args):
+        self.check_single_depth(args)
+        if args.load:
+            if args.save:
+                self.parser.error("--load and --save can not be combined")
+            return self.load(args)
+
+        analysis = self.create_analysis(args)
+        imports = analysis.find_imports(**self.limits(args))
+        self.analyzed(args, analysis, imports)
+        return imports
+
+    def limits(self, args):
+        """
+        Get the deadline and progress arguments for finding imports. The time
+        budget starts counting when the analysis is created.
+        """
+        if args.progress:
+            self.progress = ProgressMeter(sys.stderr)
+        return {"deadline": self.deadline, "progress": self.progress}
+
+    def stop_progress(self, analysis):
+        if self.progress is not None:
+            self.progress.close()
+        self.partial = analysis.partial
+        if self.partial:
+            log.warning("ran out of time, only analyzed %d of %d files", *self.partial)
+
+    def analyzed(self, args, analysis, imports):
+        self.stop_progress(analysis)
         log.info("found total of %d imports in %r", len(imports), args.path)
         if not imports:
             log.warning("found no imports - try increasing depth!")
+        if args.save:
+            self.save(args, analysis, imports)
 
-        # this can be changed to an arg later on, when we support multiple renderers
-        renderer = "graphviz"
+    def load(self, args):
+        from pycodegraph.analysis.profile import Profile
 
-        renderer_module = importlib.import_module("pycodegraph.renderers.%s" % renderer)
-        print(renderer_module.render(imports, highlights=args.highlight))
+        self.profile = Profile()
+        self.analysis = None
+        with self.profile.phase("loading"):
+            snapshot = self.load_snapshot(args.load)
+        log.info(
+            "loaded %d imports from %r, analyzed with %r",
+            len(snapshot.graph),
+            args.load,
+            snapshot.params,
+        )
+        if snapshot.params.get("partial"):
+            self.partial = tuple(snapshot.params["partial"])
+        return snapshot.graph
 
+    def save(self, args, analysis, imports):
+        from pycodegraph.snapshot import save_snapshot
+
+        params = {
+            "path": os.path.abspath(args.path),
+            "root_module": analysis.root_module,
+            "depth": args.depth,
+            "include": analysis.include,
+            "exclude": analysis.exclude,
+            "highlights": args.highlight,
+            "scanner": args.scanner,
+            "symbols": args.resolve_symbols,
+            "partial": analysis.partial,
+            "rev": analysis.source.commit if args.rev else None,
+        }
+        with self.profile.phase("saving"):
+            save_snapshot(args.save, imports, params)
+        log.info("saved %d imports to %r", len(imports), args.save)
+
+    def report_profile(self, args):
+        if args.profile:
+            print(self.profile.format(), file=sys.stderr)
+        if args.stats_json:
+            import json
+
+            with open(args.stats_json, "w") as filehandle:
+                json.dump(self.profile.to_dict(), filehandle, indent=2)
+
+    def render(self, args, imports):
+        from pycodegraph.renderers import get_renderer
+
+        renderer = get_renderer(args.format)
+        self.write_output(
+            args,
+            lambda stream: renderer.render_to(
+                stream, imports, highlights=args.highlight, partial=self.partial
+            ),
+        )
 
-def main():
+
+class ReduceEntrypoint(ImportsEntrypoint):
+    """
+    Like imports, but removes edges that are implied by other edges before
+    rendering.
+    """
+
+    watches = False
+    streams = False
+
+    def run(self, args):
+        from pycodegraph.algorithms import transitive_reduction
+
+        imports = self.analyze(args)
+        with self.profile.phase("reduction"):
+            reduced = transitive_reduction(imports)
+        log.info("reduced %d imports to %d", len(imports), len(reduced))
+        with self.profile.phase("rendering"):
+            self.render(args, reduced)
+            if args.package_output:
+                self.render_packages(args, reduced)
+        self.report_profile(args)
+        return 0
+
+
+class CyclesEntrypoint(ImportsEntrypoint):
+    """
+    Report import cycles. Exits with status 1 if there are any.
+    """
+
+    renders_graph = False
+    watches = False
+
+    def run(self, args):
+        from pycodegraph.algorithms import find_cycles
+
+        imports = self.analyze(args)
+        with self.profile.phase("cycles"):
+            cycles = find_cycles(imports)
+        if cycles:
+            log.warning("found %d import cycles", len(cycles))
+
+        def write(stream):
+            for modules, cycle in cycles:
+                stream.write("%d modules: %s\n" % (len(modules), ", ".join(modules)))
+                stream.write("    %s\n" % " -> ".join(cycle))
+
+        self.write_output(args, write)
+        self.report_profile(args)
+        return 1 if cycles else 0
+
+
+class WhoImportsEntrypoint(ImportsEntrypoint):
+    """
+    List the modules importing any module matching the given patterns, which
+    match like highlights do: as prefixes or globs. Paths to python files can
+    be given as well, and are turned into the module they belong to.
+    """
+
+    takes_path = False
+    renders_graph = False
+    watches = False
+    # how many levels of importers to follow unless --max-depth is given
+    default_max_depth = 1
+    # whether the matching modules themselves are part of the result
+    include_targets = False
+
+    def __init__(self, parser=None):
+        super(WhoImportsEntrypoint, self).__init__(parser=parser)
+        self.add_argument(
+            "targets", type=str, nargs="+", metavar="MODULE", help="module patterns"
+        )
+        self.add_argument(
+            "-p",
+            "--path",
+            type=str,
+            default=os.getcwd(),
+            help="path to your Python code. defaults to pwd",
+        )
+        self.add_argument(
+            "--max-depth",
+            type=int,
+            default=self.default_max_depth,
+            help="how many levels of importers to follow. 0 means no limit. "
+            "defaults to %d" % self.default_max_depth,
+        )
+        self.add_argument(
+            "--with-depth",
+            action="store_true",
+            help="print how many levels away each module is",
+        )
+
+    def module_pattern(self, target):
+        if not target.endswith(".py") or not os.path.isfile(target):
+            return target
+        if self.analysis is None:
+            self.parser.error("file paths can not be used with --load")
+        target_path = os.path.abspath(target)
+        for module, path in self.analysis.module_files:
+            if os.path.abspath(path) == target_path:
+                return self.analysis.resolver.shorten(module)
+        self.parser.error("%r is not part of the analyzed code" % target)
+        return None
+
+    def run(self, args):
+        from pycodegraph.algorithms import match_modules, reachable
+
+        graph = self.analyze(args)
+        patterns = [self.module_pattern(target) for target in args.targets]
+        with self.profile.phase("query"):
+            module_ids = match_modules(graph, patterns)
+            if not module_ids:
+                log.warning("no modules match %s", ", ".join(patterns))
+            distances = reachable(
+                graph, module_ids, max_depth=args.max_depth or None, reverse=True
+            )
+            if self.include_targets:
+                distances.update((module_id, 0) for module_id in module_ids)
+
+        def write(stream):
+            for module_id in sorted(distances):
+                if args.with_depth:
+                    stream.write("%d " % distances[module_id])
+                stream.write(graph.modules[module_id] + "\n")
+
+        self.write_output(args, write)
+        self.report_profile(args)
+        return 0
+
+
+class ImpactEntrypoint(WhoImportsEntrypoint):
+    """
+    List the modules that could be affected by changes to any module matching
+    the given patterns: those modules themselves, and everything importing
+    them directly or indirectly.
+    """
+
+    default_max_depth = 0
+    include_targets = True
+
+
+class ServeEntrypoint(ImportsEntrypoint):
+    """
+    Keep analyses in memory and answer queries from the query command over a
+    Unix domain socket. Takes the same analysis options as imports, which
+    apply to every root that is queried.
+    """
+
+    renders_graph = False
+    watches = False
+    writes_result = False
+
+    def __init__(self, parser=None):
+        super(ServeEntrypoint, self).__init__(parser=parser)
+        self.add_argument(
+            "--socket",
+            type=str,
+            default=".pycodegraph.sock",
+            help="path of the socket to listen on. defaults to .pycodegraph.sock",
+        )
+
+    def run(self, args):
+        from pycodegraph.server import AnalysisServer, ServerError
+
+        if args.load or args.rev or args.jobs != 1:
+            self.parser.error("--load, --rev and --jobs can not be used with serve")
+        self.check_single_depth(args)
+
+        def create_analysis(root, depth):
+            root_args = argparse.Namespace(**vars(args))
+            root_args.path = root
+            root_args.depth = depth
+            return self.create_analysis(root_args)
+
+        server = AnalysisServer(create_analysis)
+        # analyze the given path up front, so that the first query is fast too
+        server.graph(args.path, args.depth)
+        try:
+            server.serve(args.socket)
+        except ServerError as exc:
+            log.error("%s", exc)
+            return 1
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+
+class QueryEntrypoint(Entrypoint):
+    """
+    Query a running serve command.
+    """
+
+    takes_path = False
+
+    def __init__(self, parser=None):
+        super(QueryEntrypoint, self).__init__(parser=parser)
+        self.add_argument(
+            "query",
+            choices=("render", "imports", "imported-by", "status", "stop"),
+            help="render the graph, list the imports of a module or the modules "
+            "importing it, show the state of the server or stop it",
+        )
+        self.add_argument(
+            "module", type=str, nargs="?", help="module for imports and imported-by"
+        )
+        self.add_argument(
+            "-r",
+            "--root",
+            type=str,
+            default=os.getcwd(),
+            help="path to your Python code. defaults to pwd",
+        )
+        self.add_argument("-d", "--depth", type=int, default=0)
+        self.add_argument("-c", "--clusters", action="store_true")
+        self.add_argument("--highlight", type=str, nargs="*")
+        self.add_argument(
+            "-f",
+            "--format",
+            type=str,
+            default="dot",
+            help="output format of render. defaults to dot",
+        )
+        self.add_argument(
+            "--socket",
+            type=str,
+            default=".pycodegraph.sock",
+            help="path of the socket the server listens on. defaults to "
+            ".pycodegraph.sock",
+        )
+        self.add_argument(
+            "-o",
+            "--output",
+            type=str,
+            help="file to write the result to. defaults to stdout",
+        )
+
+    def run(self, args):
+        from pycodegraph.server import send_request, ServerError
+
+        request = {
+            "command": args.query.replace("-", "_"),
+            "root": os.path.abspath(args.root),
+            "depth": args.depth,
+            "module": args.module,
+            "clusters": args.clusters,
+            "highlights": args.highlight,
+            "format": args.format,
+        }
+        try:
+            result = send_request(args.socket, request)
+        except ServerError as exc:
+            log.error("%s", exc)
+            return 1
+
+        def write(stream):
+            if isinstance(result, list):
+                for module in result:
+                    stream.write(module + "\n")
+            elif isinstance(result, dict):
+                import json
+
+                json.dump(result, stream, indent=2)
+                stream.write("\n")
+            else:
+                stream.write(result + "\n")
+
+        self.write_output(args, write)
+        return 0
+
+
+class DiffEntrypoint(Entrypoint):
+    """
+    Compare two snapshots saved with --save, listing added and removed modules
+    and imports. Exits with status 1 if there are any differences.
+    """
+
+    takes_path = False
+    # parameters that change what ends up in the graph
+    compared_params = (
+        "root_module",
+        "depth",
+        "include",
+        "exclude",
+        "highlights",
+        "symbols",
+    )
+
+    def __init__(self, parser=None):
+        super(DiffEntrypoint, self).__init__(parser=parser)
+        self.add_argument("old", type=str, help="path to the old snapshot")
+        self.add_argument("new", type=str, help="path to the new snapshot")
+        self.add_argument(
+            "-o",
+            "--output",
+            type=str,
+            help="file to write the differences to. defaults to stdout",
+        )
+
+    def run(self, args):
+        from pycodegraph.snapshot import diff_graphs
+
+        old = self.load_snapshot(args.old)
+        new = self.load_snapshot(args.new)
+        for param in self.compared_params:
+            if old.params.get(param) != new.params.get(param):
+                log.warning(
+                    "snapshots were analyzed with different %s: %r vs %r",
+                    param,
+                    old.params.get(param),
+                    new.params.get(param),
+                )
+
+        diff = diff_graphs(old.graph, new.graph)
+
+        def write(stream):
+            for line in diff.lines():
+                stream.write(line + "\n")
+
+        self.write_output(args, write)
+        return 1 if diff else 0
+
+
+# command name -> Entrypoint class
+COMMANDS = {
+    "imports": ImportsEntrypoint,
+    "cycles": CyclesEntrypoint,
+    "reduce": ReduceEntrypoint,
+    "diff": DiffEntrypoint,
+    "who-imports": WhoImportsEntrypoint,
+    "impact": ImpactEntrypoint,
+    "serve": ServeEntrypoint,
+    "query": QueryEntrypoint,
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
     parser = argparse.ArgumentParser()
     subparsers = parser.add_subparsers(dest="command")
-    commands = {"imports": ImportsEntrypoint}
-    for command in commands:
-        subparser = subparsers.add_parser(command)
-        commands[command] = commands[command](parser=subparser)
-    args = parser.parse_args()
+    # setting up the arguments of every command takes a noticeable part of the
+    # startup time, so only do it for the one being run. the main parser has no
+    # options of its own other than --help, so that is the first positional
+    command = next((arg for arg in argv if not arg.startswith("-")), None)
+    entrypoint = None
+    for name, entrypoint_cls in COMMANDS.items():
+        description = " ".join((entrypoint_cls.__doc__ or "").split())
+        subparser = subparsers.add_parser(
+            name, help=description.split(". ")[0].rstrip(".")
+        )
+        if name == command:
+            entrypoint = entrypoint_cls(parser=subparser)
+    args = parser.parse_args(argv)
+    if entrypoint is None:
+        parser.print_help()
+        return None
+
+    import allib.logging
 
     level = logging.WARNING
     if args.very_verbose:
@@ -109,7 +984,10 @@ def main():
         level = logging.INFO
     allib.logging.setup_logging(log_level=level, colors=True)
 
-    if args.command:
-        commands[args.command].run(args)
-    else:
-        parser.print_help()
+    try:
+        return entrypoint.run(args)
+    except BrokenPipeError:
+        # whatever was reading the output, like head, stopped. point stdout
+        # at devnull, so that flushing it at exit doesn't fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
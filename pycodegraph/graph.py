@@ -0,0 +1,197 @@
+from array import array
+import sys
+
+_ID_BITS = 32
+_ID_MASK = (1 << _ID_BITS) - 1
+
+
+class ModuleNode:
+    """
+    Lightweight view of a single module in an ImportGraph.
+    """
+
+    __slots__ = ("graph", "id", "name")
+
+    def __init__(self, graph, id, name):  # pylint: disable=redefined-builtin
+        self.graph = graph
+        self.id = id
+        self.name = name
+
+    @property
+    def imports(self):
+        return [self.graph.modules[i] for i in self.graph.successor_ids(self.id)]
+
+    @property
+    def imported_by(self):
+        return [self.graph.modules[i] for i in self.graph.predecessor_ids(self.id)]
+
+    def __repr__(self):
+        return "<ModuleNode %r>" % self.name
+
+
+class ImportGraph:
+    """
+    Immutable directed graph of imports between modules.
+
+    Module names are interned and numbered in sorted order, and edges are
+    stored as compressed sparse rows in arrays: for the module with id i, the
+    ids of the modules it imports are targets[offsets[i]:offsets[i + 1]], and
+    the same goes for reverse edges. This takes a fraction of the memory of a
+    set of (str, str) tuples.
+
+    Iterating over the graph generates (module, imported_module) tuples in
+    sorted order, so it can be used anywhere a set of import tuples was used.
+    """
+
+    def __init__(self, modules, out_offsets, out_targets, in_offsets, in_sources):
+        self.modules = modules
+        self._ids = {name: idx for idx, name in enumerate(modules)}
+        self._out_offsets = out_offsets
+        self._out_targets = out_targets
+        self._in_offsets = in_offsets
+        self._in_sources = in_sources
+
+    @classmethod
+    def from_edges(cls, edges, modules=()):
+        builder = ImportGraphBuilder()
+        for module in modules:
+            builder.add_module(module)
+        builder.update(edges)
+        return builder.build()
+
+    @property
+    def module_count(self):
+        return len(self.modules)
+
+    @property
+    def edge_count(self):
+        return len(self._out_targets)
+
+    def __len__(self):
+        return len(self._out_targets)
+
+    def __iter__(self):
+        modules = self.modules
+        offsets = self._out_offsets
+        targets = self._out_targets
+        for src_id, src in enumerate(modules):
+            for idx in range(offsets[src_id], offsets[src_id + 1]):
+                yield src, modules[targets[idx]]
+
+    def __contains__(self, edge):
+        src, dst = edge
+        src_id = self._ids.get(src)
+        dst_id = self._ids.get(dst)
+        if src_id is None or dst_id is None:
+            return False
+        return dst_id in self.successor_ids(src_id)
+
+    def __eq__(self, other):
+        if not isinstance(other, ImportGraph):
+            return NotImplemented
+        return (
+            self.modules == other.modules
+            and self._out_offsets == other._out_offsets
+            and self._out_targets == other._out_targets
+        )
+
+    def __repr__(self):
+        return "<ImportGraph modules=%d edges=%d>" % (self.module_count, len(self))
+
+    def id_of(self, module):
+        return self._ids[module]
+
+    def __getitem__(self, module):
+        return ModuleNode(self, self._ids[module], module)
+
+    def nodes(self):
+        for idx, name in enumerate(self.modules):
+            yield ModuleNode(self, idx, name)
+
+    def successor_ids(self, module_id):
+        offsets = self._out_offsets
+        return self._out_targets[offsets[module_id] : offsets[module_id + 1]]
+
+    def predecessor_ids(self, module_id):
+        offsets = self._in_offsets
+        return self._in_sources[offsets[module_id] : offsets[module_id + 1]]
+
+    def imports_of(self, module):
+        """
+        Modules which a module imports.
+        """
+        return self[module].imports
+
+    def imported_by(self, module):
+        """
+        Modules which import a module.
+        """
+        return self[module].imported_by
+
+
+def _csr(keys, module_count):
+    """
+    Given sorted edges encoded as (src << 32 | dst), build offset and target
+    arrays.
+    """
+    offsets = array("I", bytes(4 * (module_count + 1)))
+    targets = array("I", (key & _ID_MASK for key in keys))
+    for key in keys:
+        offsets[(key >> _ID_BITS) + 1] += 1
+    for idx in range(module_count):
+        offsets[idx + 1] += offsets[idx]
+    return offsets, targets
+
+
+class ImportGraphBuilder:
+    """
+    Collects import edges, and builds an ImportGraph out of them. Duplicate
+    edges are ignored.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        # edges encoded as (src_id << 32 | dst_id), using the ids assigned by
+        # _intern. may contain duplicates until build is called
+        self._edges = array("Q")
+
+    def _intern(self, module):
+        module_id = self._ids.get(module)
+        if module_id is None:
+            module_id = self._ids[module] = len(self._names)
+            self._names.append(sys.intern(module))
+        return module_id
+
+    def add_module(self, module):
+        self._intern(module)
+
+    def add_edge(self, src, dst):
+        self._edges.append((self._intern(src) << _ID_BITS) | self._intern(dst))
+
+    def update(self, edges):
+        for src, dst in edges:
+            self.add_edge(src, dst)
+
+    def __len__(self):
+        return len(self._edges)
+
+    def build(self):
+        modules = sorted(self._names)
+        new_ids = {name: idx for idx, name in enumerate(modules)}
+        remap = array("I", (new_ids[name] for name in self._names))
+
+        keys = sorted(
+            set(
+                (remap[key >> _ID_BITS] << _ID_BITS) | remap[key & _ID_MASK]
+                for key in self._edges
+            )
+        )
+        out_offsets, out_targets = _csr(keys, len(modules))
+
+        keys = sorted(
+            ((key & _ID_MASK) << _ID_BITS) | (key >> _ID_BITS) for key in keys
+        )
+        in_offsets, in_sources = _csr(keys, len(modules))
+
+        return ImportGraph(modules, out_offsets, out_targets, in_offsets, in_sources)
@@ -0,0 +1,38 @@
+"""
+Renderers turn an import graph into an output format. Each one is a module with
+render(imports, highlights=None, **options) and render_to(stream, imports,
+highlights=None, **options) functions, and is only imported once it is used.
+The partial option is a tuple of (files analyzed, total files) when the
+analysis ran out of time, and is noted in the output.
+
+Line oriented formats also have stream_to(stream, edges, partial=None,
+**options), which writes imports as they are found. There, partial is a
+function returning the partial option, called once edges runs out.
+"""
+
+import importlib
+
+# format name -> module implementing it
+RENDERERS = {
+    "dot": "pycodegraph.renderers.graphviz",
+    "json": "pycodegraph.renderers.jsongraph",
+    "jsonl": "pycodegraph.renderers.jsonlines",
+    "lines": "pycodegraph.renderers.lines",
+}
+
+DEFAULT_FORMAT = "dot"
+
+
+def get_renderer(name):
+    """
+    Import and return the renderer module for a format. Raises ValueError for
+    unknown formats.
+    """
+    try:
+        module = RENDERERS[name]
+    except KeyError:
+        raise ValueError(
+            "unknown format %r, must be one of: %s"
+            % (name, ", ".join(sorted(RENDERERS)))
+        )
+    return importlib.import_module(module)
@@ -1,10 +1,13 @@
 from collections import defaultdict
-from fnmatch import fnmatch
 
 from pycodegraph.analysis import shorten_module
+from pycodegraph.analysis.matcher import ModuleMatcher
+from pycodegraph.graph import ImportGraph
 
 
 def get_all_modules(imports):
+    if isinstance(imports, ImportGraph):
+        return set(imports.modules)
     all_modules = set()
     for src_module, target_module in imports:
         all_modules.add(src_module)
@@ -26,22 +29,15 @@ def render_attrs(attrs):
     return " [" + ", ".join("%s=%s" % (k, v) for k, v in attrs.items()) + "]"
 
 
-def node_matches_highlights(node, highlights):
-    if not highlights:
-        return False
-    for hl in highlights:
-        if node.startswith(hl) or fnmatch(node, hl):
-            return True
-
-
 def render_nodes(nodes, indent=4, shape=None, highlights=None):
     attrs = {}
     if shape:
         attrs["shape"] = shape
+    matcher = ModuleMatcher(highlights, allow_fnmatch=True, dotted=False)
     lines = []
     for node in nodes:
         node_attrs = attrs.copy()
-        if node_matches_highlights(node, highlights):
+        if matcher.matches(node):
             node_attrs.update(style="filled", fillcolor="lightblue")
         line = " " * indent + '"%s"%s;' % (node, render_attrs(node_attrs))
         lines.append(line)
@@ -55,10 +51,18 @@ def render_subgraph(name, nodes, indent=4, highlights=None):
     return lines
 
 
-def render(imports, font=None, rankdir=None, clusters=False, highlights=None):
-    lines = ["digraph {"]
+def render_lines(
+    imports, font=None, rankdir=None, clusters=False, highlights=None, partial=None
+):
+    """
+    Generate the lines of a dot graph one at a time, without newlines.
+    """
+    yield "digraph {"
+    if partial:
+        yield "    // partial: analyzed %d of %d files" % partial
+    header = []
     if font:
-        lines.extend(
+        header.extend(
             [
                 '    graph [fontname = "%s"];' % font,
                 '    node [fontname = "%s"];' % font,
@@ -66,24 +70,55 @@ def render(imports, font=None, rankdir=None, clusters=False, highlights=None):
             ]
         )
     if rankdir:
-        lines.append("    rankdir=%s;" % rankdir)
-    if len(lines) > 1:
-        lines.append("")
+        header.append("    rankdir=%s;" % rankdir)
+    if header:
+        header.append("")
+    for line in header:
+        yield line
 
     if clusters:
-        for cluster, nodes in locate_clusters(imports):
+        for cluster, nodes in sorted(locate_clusters(imports)):
             if len(nodes) > 2:
-                lines.extend(
-                    render_subgraph(cluster, nodes, indent=4, highlights=highlights)
-                )
+                lines = render_subgraph(cluster, nodes, indent=4, highlights=highlights)
             else:
-                lines.extend(render_nodes(nodes, indent=4, highlights=highlights))
+                lines = render_nodes(nodes, indent=4, highlights=highlights)
+            for line in lines:
+                yield line
     else:
         all_modules = get_all_modules(imports)
-        lines.extend(render_nodes(all_modules, indent=4, highlights=highlights))
-
-    for src_module, target_module in sorted(imports):
-        lines.append('    "%s" -> "%s";' % (src_module, target_module))
+        for line in render_nodes(all_modules, indent=4, highlights=highlights):
+            yield line
 
-    lines.append("}")
-    return "\n".join(lines)
+    # an ImportGraph is already sorted
+    if not isinstance(imports, ImportGraph):
+        imports = sorted(imports)
+    for src_module, target_module in imports:
+        yield '    "%s" -> "%s";' % (src_module, target_module)
+
+    yield "}"
+
+
+def render_to(stream, imports, **kwargs):
+    """
+    Write a dot graph to a file object line by line, instead of building the
+    whole graph as a string first. Takes the same keyword arguments as render.
+    """
+    write = stream.write
+    for line in render_lines(imports, **kwargs):
+        write(line)
+        write("\n")
+
+
+def render(
+    imports, font=None, rankdir=None, clusters=False, highlights=None, partial=None
+):
+    return "\n".join(
+        render_lines(
+            imports,
+            font=font,
+            rankdir=rankdir,
+            clusters=clusters,
+            highlights=highlights,
+            partial=partial,
+        )
+    )
@@ -0,0 +1,39 @@
+import json
+
+from pycodegraph.analysis.matcher import ModuleMatcher
+from pycodegraph.graph import ImportGraph
+
+
+def graph_dict(imports, highlights=None, partial=None):
+    if not isinstance(imports, ImportGraph):
+        imports = ImportGraph.from_edges(imports)
+    data = {
+        "modules": list(imports.modules),
+        "imports": [
+            [src_module, target_module] for src_module, target_module in imports
+        ],
+    }
+    if highlights:
+        matcher = ModuleMatcher(highlights, allow_fnmatch=True, dotted=False)
+        data["highlights"] = [
+            module for module in imports.modules if matcher.matches(module)
+        ]
+    if partial:
+        data["partial"] = True
+        data["files_analyzed"], data["files_total"] = partial
+    return data
+
+
+def render_to(stream, imports, highlights=None, partial=None, **options):
+    """
+    Write the graph as a JSON object of modules, imports and highlighted
+    modules. Options like clusters only apply to drawn graphs, and are ignored.
+    """
+    data = graph_dict(imports, highlights=highlights, partial=partial)
+    json.dump(data, stream, indent=2)
+    stream.write("\n")
+
+
+def render(imports, highlights=None, partial=None, **options):
+    data = graph_dict(imports, highlights=highlights, partial=partial)
+    return json.dumps(data, indent=2)
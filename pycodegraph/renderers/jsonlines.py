@@ -0,0 +1,58 @@
+"""
+JSON lines, with one object per import like {"source": "a", "target": "b"}.
+Imports can be streamed, written as soon as they are found.
+"""
+
+import json
+
+from .lines import _flushes, _sorted
+
+
+def _import_line(src_module, target_module):
+    return json.dumps({"source": src_module, "target": target_module})
+
+
+def _partial_line(partial):
+    files_analyzed, files_total = partial
+    return json.dumps(
+        {"partial": True, "files_analyzed": files_analyzed, "files_total": files_total}
+    )
+
+
+def render_lines(imports, partial=None):
+    for src_module, target_module in _sorted(imports):
+        yield _import_line(src_module, target_module)
+    if partial:
+        yield _partial_line(partial)
+
+
+def render_to(stream, imports, partial=None, **options):
+    """
+    Write one object per import. If partial is a tuple of (files analyzed,
+    total files), an object with those counts and "partial" set to true is
+    written last. Other options are ignored.
+    """
+    for line in render_lines(imports, partial=partial):
+        stream.write(line)
+        stream.write("\n")
+
+
+def render(imports, partial=None, **options):
+    return "\n".join(render_lines(imports, partial=partial))
+
+
+def stream_to(stream, edges, partial=None, **options):
+    """
+    Write imports as they are generated, unsorted. Unless stream is a file,
+    it is flushed after each one so that they can be read right away. partial
+    is called once edges runs out, and the result is written as for
+    render_to.
+    """
+    flush = _flushes(stream)
+    for src_module, target_module in edges:
+        stream.write(_import_line(src_module, target_module) + "\n")
+        if flush:
+            stream.flush()
+    result = partial() if partial is not None else None
+    if result:
+        stream.write(_partial_line(result) + "\n")
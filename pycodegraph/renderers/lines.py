@@ -0,0 +1,64 @@
+"""
+Plain text with one import per line, like `a -> b`, for processing with line
+oriented tools. Imports can be streamed, written as soon as they are found.
+"""
+
+from pycodegraph.graph import ImportGraph
+
+
+def _sorted(imports):
+    # an ImportGraph is already sorted
+    if isinstance(imports, ImportGraph):
+        return imports
+    return sorted(imports)
+
+
+def _flushes(stream):
+    # when streaming to a terminal or pipe, someone is waiting for each line.
+    # files are not read until they are complete
+    try:
+        return not stream.seekable()
+    except (AttributeError, ValueError):
+        return True
+
+
+def partial_comment(partial):
+    return "# partial: analyzed %d of %d files" % partial
+
+
+def render_lines(imports, partial=None):
+    for src_module, target_module in _sorted(imports):
+        yield "%s -> %s" % (src_module, target_module)
+    if partial:
+        yield partial_comment(partial)
+
+
+def render_to(stream, imports, partial=None, **options):
+    """
+    Write one import per line. If partial is a tuple of (files analyzed, total
+    files), a comment saying so is written last. Other options are ignored.
+    """
+    for line in render_lines(imports, partial=partial):
+        stream.write(line)
+        stream.write("\n")
+
+
+def render(imports, partial=None, **options):
+    return "\n".join(render_lines(imports, partial=partial))
+
+
+def stream_to(stream, edges, partial=None, **options):
+    """
+    Write imports as they are generated, unsorted. Unless stream is a file,
+    it is flushed after each one so that they can be read right away. partial
+    is called once edges runs out, and the result is written as for
+    render_to.
+    """
+    flush = _flushes(stream)
+    for src_module, target_module in edges:
+        stream.write("%s -> %s\n" % (src_module, target_module))
+        if flush:
+            stream.flush()
+    result = partial() if partial is not None else None
+    if result:
+        stream.write(partial_comment(result) + "\n")
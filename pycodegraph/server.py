@@ -0,0 +1,200 @@
+"""
+A long-running process keeping analyses in memory, answering queries about
+them over a Unix domain socket.
+
+The protocol is one JSON object per line in each direction. Requests have a
+"command" key and command specific arguments, responses have an "ok" key and
+either a "result" or an "error" key.
+"""
+
+import json
+import logging
+import os
+import os.path
+import socket
+import socketserver
+import time
+
+from pycodegraph.analysis.watch import IncrementalAnalysis
+from pycodegraph.renderers import get_renderer
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = ".pycodegraph.sock"
+
+
+class ServerError(Exception):
+    pass
+
+
+class _RootState:
+    __slots__ = ("incremental", "graph")
+
+    def __init__(self, incremental):
+        self.incremental = incremental
+        self.graph = incremental.graph()
+
+
+class AnalysisServer:
+    """
+    Answers queries about the import graphs of any number of roots, at any
+    depth. create_analysis is called with a path and depth to create the
+    ImportAnalysis for them the first time they are queried. On later queries,
+    only files that changed since are analyzed again.
+    """
+
+    def __init__(self, create_analysis):
+        self.create_analysis = create_analysis
+        # (root path, depth) -> _RootState
+        self.states = {}
+        self.started = time.time()
+        self.running = False
+        self._server = None
+
+    def graph(self, root, depth=0):
+        key = (os.path.abspath(root), depth)
+        state = self.states.get(key)
+        if state is None:
+            log.info("analyzing %r at depth %d", root, depth)
+            analysis = self.create_analysis(key[0], depth)
+            state = self.states[key] = _RootState(IncrementalAnalysis(analysis))
+        elif state.incremental.refresh():
+            state.graph = state.incremental.graph()
+        return state.graph
+
+    def _module_node(self, request):
+        module = request.get("module")
+        if not module:
+            raise ServerError("no module given")
+        graph = self.graph(request["root"], request.get("depth", 0))
+        try:
+            return graph[module]
+        except KeyError:
+            raise ServerError("module %r is not in the graph" % module)
+
+    def command_render(self, request):
+        try:
+            renderer = get_renderer(request.get("format", "dot"))
+        except ValueError as exc:
+            raise ServerError(str(exc))
+        graph = self.graph(request["root"], request.get("depth", 0))
+        return renderer.render(
+            graph,
+            clusters=request.get("clusters", False),
+            highlights=request.get("highlights"),
+        )
+
+    def command_imports(self, request):
+        return self._module_node(request).imports
+
+    def command_imported_by(self, request):
+        return self._module_node(request).imported_by
+
+    def command_status(self, request):
+        return {
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started,
+            "analyses": [
+                {
+                    "root": root,
+                    "depth": depth,
+                    "files": len(state.incremental.files),
+                    "modules": state.graph.module_count,
+                    "imports": state.graph.edge_count,
+                }
+                for (root, depth), state in sorted(self.states.items())
+            ],
+        }
+
+    def command_stop(self, request):
+        self.running = False
+        return "stopping"
+
+    def handle(self, request):
+        """
+        Answer a single request, returning the response.
+        """
+        start = time.perf_counter()
+        try:
+            if not isinstance(request, dict):
+                raise ServerError("request must be a JSON object")
+            command = request.get("command")
+            method = getattr(self, "command_%s" % command, None)
+            if method is None:
+                raise ServerError("unknown command %r" % command)
+            if "root" not in request and command not in ("status", "stop"):
+                raise ServerError("no root given")
+            response = {"ok": True, "result": method(request)}
+        except ServerError as exc:
+            response = {"ok": False, "error": str(exc)}
+        except Exception as exc:  # pylint: disable=broad-except
+            log.exception("error handling request %r", request)
+            response = {"ok": False, "error": "%s: %s" % (type(exc).__name__, exc)}
+        elapsed = time.perf_counter() - start
+        log.info("handled %r in %.1fms", request, elapsed * 1000)
+        response["elapsed"] = elapsed
+        return response
+
+    def serve(self, socket_path=DEFAULT_SOCKET):
+        """
+        Listen on a Unix domain socket until a stop command is received.
+        Requests are handled one at a time.
+        """
+        _remove_stale_socket(socket_path)
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line.decode("utf-8"))
+                    except ValueError as exc:
+                        response = {"ok": False, "error": "invalid JSON: %s" % exc}
+                    else:
+                        response = server.handle(request)
+                    self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                    if not server.running:
+                        break
+
+        self.running = True
+        with socketserver.UnixStreamServer(socket_path, Handler) as unix_server:
+            log.info("listening on %r", socket_path)
+            try:
+                while self.running:
+                    unix_server.handle_request()
+            finally:
+                os.unlink(socket_path)
+
+
+def _remove_stale_socket(socket_path):
+    if not os.path.exists(socket_path):
+        return
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+    except OSError:
+        log.info("removing stale socket %r", socket_path)
+        os.unlink(socket_path)
+    else:
+        raise ServerError("a server is already listening on %r" % socket_path)
+
+
+def send_request(socket_path, request):
+    """
+    Send a request to a running server, returning the result. Raises
+    ServerError if the server could not be reached or returned an error.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError as exc:
+        raise ServerError("could not connect to %r: %s" % (socket_path, exc))
+    if not line:
+        raise ServerError("server closed the connection")
+    response = json.loads(line.decode("utf-8"))
+    if not response["ok"]:
+        raise ServerError(response["error"])
+    return response["result"]
@@ -0,0 +1,128 @@
+"""
+Saving analyzed import graphs to files, so they can be rendered or compared
+later without analyzing the source code again.
+
+Snapshots are gzipped JSON containing the parameters of the analysis, the
+sorted list of modules, and the edges as a flat list of pairs of indexes into
+the list of modules.
+"""
+
+import gzip
+import json
+import time
+
+from pycodegraph.graph import ImportGraphBuilder
+
+SNAPSHOT_FORMAT = "pycodegraph-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+class Snapshot:
+    def __init__(self, graph, params=None, created=None):
+        self.graph = graph
+        self.params = params or {}
+        self.created = created
+
+    def __repr__(self):
+        return "<Snapshot %r %r>" % (self.graph, self.params)
+
+
+def save_snapshot(path, graph, params=None):
+    """
+    Write graph and the parameters of the analysis that produced it to path.
+    """
+    edges = []
+    for src_id in range(graph.module_count):
+        for dst_id in graph.successor_ids(src_id):
+            edges.append(src_id)
+            edges.append(dst_id)
+    data = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created": time.time(),
+        "params": params or {},
+        "modules": graph.modules,
+        "edges": edges,
+    }
+    with gzip.open(path, "wt", encoding="utf-8") as filehandle:
+        json.dump(data, filehandle, separators=(",", ":"))
+
+
+def load_snapshot(path):
+    """
+    Read a snapshot written by save_snapshot. Raises SnapshotError if the file
+    is not a snapshot, or one written by an incompatible version.
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as filehandle:
+            data = json.load(filehandle)
+    except (OSError, EOFError, ValueError) as exc:
+        raise SnapshotError("could not read snapshot %r: %s" % (path, exc))
+
+    if not isinstance(data, dict) or data.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError("%r is not a pycodegraph snapshot" % path)
+    if data.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(
+            "snapshot %r has version %r, only version %d is supported"
+            % (path, data.get("version"), SNAPSHOT_VERSION)
+        )
+
+    modules = data["modules"]
+    edges = data["edges"]
+    builder = ImportGraphBuilder()
+    for module in modules:
+        builder.add_module(module)
+    try:
+        for idx in range(0, len(edges), 2):
+            builder.add_edge(modules[edges[idx]], modules[edges[idx + 1]])
+    except (IndexError, TypeError):
+        raise SnapshotError("snapshot %r has invalid edges" % path)
+    return Snapshot(builder.build(), data.get("params"), data.get("created"))
+
+
+class GraphDiff:
+    """
+    Modules and edges that were added or removed between two graphs, each as
+    a sorted list.
+    """
+
+    def __init__(self, added_modules, removed_modules, added_edges, removed_edges):
+        self.added_modules = added_modules
+        self.removed_modules = removed_modules
+        self.added_edges = added_edges
+        self.removed_edges = removed_edges
+
+    def __bool__(self):
+        return bool(
+            self.added_modules
+            or self.removed_modules
+            or self.added_edges
+            or self.removed_edges
+        )
+
+    def lines(self):
+        for module in self.removed_modules:
+            yield "- %s" % module
+        for module in self.added_modules:
+            yield "+ %s" % module
+        for src, dst in self.removed_edges:
+            yield "- %s -> %s" % (src, dst)
+        for src, dst in self.added_edges:
+            yield "+ %s -> %s" % (src, dst)
+
+
+def diff_graphs(old, new):
+    old_modules = set(old.modules)
+    new_modules = set(new.modules)
+    old_edges = set(old)
+    new_edges = set(new)
+    return GraphDiff(
+        sorted(new_modules - old_modules),
+        sorted(old_modules - new_modules),
+        sorted(new_edges - old_edges),
+        sorted(old_edges - new_edges),
+    )
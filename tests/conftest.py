@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+
+def _write(path, code="", mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(code)
+    if mtime is not None:
+        os.utime(str(path), (mtime, mtime))
+
+
+@pytest.fixture
+def write():
+    """
+    Write code to a file, creating its directory if needed, and optionally
+    set its mtime.
+    """
+    return _write
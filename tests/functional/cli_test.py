@@ -3,18 +3,173 @@ import subprocess
 
 test_cli_expected = """
 digraph {
+    "benchmarks.discovery";
+    "benchmarks.generate";
+    "benchmarks.matcher";
+    "benchmarks.run";
+    "pycodegraph.algorithms";
     "pycodegraph.analysis";
     "pycodegraph.cli";
+    "pycodegraph.graph";
     "pycodegraph.renderers";
+    "pycodegraph.server";
+    "pycodegraph.snapshot";
     "tests.unit";
+    "benchmarks.discovery" -> "benchmarks.generate";
+    "benchmarks.discovery" -> "pycodegraph.analysis";
+    "benchmarks.matcher" -> "pycodegraph.analysis";
+    "benchmarks.run" -> "benchmarks.generate";
+    "benchmarks.run" -> "pycodegraph.analysis";
+    "benchmarks.run" -> "pycodegraph.renderers";
+    "pycodegraph.algorithms" -> "pycodegraph.analysis";
+    "pycodegraph.algorithms" -> "pycodegraph.graph";
+    "pycodegraph.analysis" -> "pycodegraph.graph";
+    "pycodegraph.cli" -> "pycodegraph.algorithms";
     "pycodegraph.cli" -> "pycodegraph.analysis";
+    "pycodegraph.cli" -> "pycodegraph.graph";
+    "pycodegraph.cli" -> "pycodegraph.renderers";
+    "pycodegraph.cli" -> "pycodegraph.server";
+    "pycodegraph.cli" -> "pycodegraph.snapshot";
     "pycodegraph.renderers" -> "pycodegraph.analysis";
+    "pycodegraph.renderers" -> "pycodegraph.graph";
+    "pycodegraph.server" -> "pycodegraph.analysis";
+    "pycodegraph.server" -> "pycodegraph.renderers";
+    "pycodegraph.snapshot" -> "pycodegraph.graph";
+    "tests.unit" -> "pycodegraph.algorithms";
     "tests.unit" -> "pycodegraph.analysis";
+    "tests.unit" -> "pycodegraph.graph";
     "tests.unit" -> "pycodegraph.renderers";
+    "tests.unit" -> "pycodegraph.server";
+    "tests.unit" -> "pycodegraph.snapshot";
 }
 """
 
 
 def test_cli():
-    out = subprocess.check_output(["pycodegraph", "imports", "--depth=1"])
+    out = subprocess.check_output(["pycodegraph", "imports", "--depth=1", "--no-cache"])
     assert out.decode().strip() == test_cli_expected.strip()
+
+
+def test_cli_cycles():
+    out = subprocess.check_output(["pycodegraph", "cycles", "--depth=1", "--no-cache"])
+    assert out.decode() == ""
+
+
+def test_cli_snapshots(tmp_path):
+    snapshot = str(tmp_path / "graph.snapshot")
+    output = str(tmp_path / "graph.dot")
+    subprocess.check_call(
+        [
+            "pycodegraph",
+            "imports",
+            "--depth=1",
+            "--no-cache",
+            "--save",
+            snapshot,
+            "-o",
+            output,
+        ]
+    )
+    out = subprocess.check_output(["pycodegraph", "imports", "--load", snapshot])
+    assert out.decode().strip() == test_cli_expected.strip()
+
+    out = subprocess.check_output(["pycodegraph", "diff", snapshot, snapshot])
+    assert out.decode() == ""
+
+    subprocess.check_call(
+        [
+            "pycodegraph",
+            "imports",
+            "--no-cache",
+            "--time-budget=0",
+            "--save",
+            snapshot,
+            "-o",
+            output,
+        ],
+        stderr=subprocess.DEVNULL,
+    )
+    out = subprocess.check_output(["pycodegraph", "imports", "--load", snapshot])
+    assert "// partial: analyzed 1 of " in out.decode()
+
+
+def test_cli_who_imports():
+    out = subprocess.check_output(
+        [
+            "pycodegraph",
+            "who-imports",
+            "--depth=1",
+            "--no-cache",
+            "pycodegraph/snapshot.py",
+        ]
+    )
+    assert out.decode() == "pycodegraph.cli\ntests.unit\n"
+
+    out = subprocess.check_output(
+        [
+            "pycodegraph",
+            "impact",
+            "--depth=1",
+            "--no-cache",
+            "--with-depth",
+            "pycodegraph.snap*",
+        ]
+    )
+    expected = "1 pycodegraph.cli\n0 pycodegraph.snapshot\n1 tests.unit\n"
+    assert out.decode() == expected
+
+
+def test_cli_multiple_depths(tmp_path):
+    output = str(tmp_path / "graph-{depth}.dot")
+    subprocess.check_call(
+        ["pycodegraph", "imports", "--depth=0,1", "--no-cache", "-o", output]
+    )
+    with open(output.replace("{depth}", "1")) as filehandle:
+        assert filehandle.read().strip() == test_cli_expected.strip()
+    out = subprocess.check_output(["pycodegraph", "imports", "--no-cache"])
+    with open(output.replace("{depth}", "0")) as filehandle:
+        assert filehandle.read() == out.decode()
+
+    returncode = subprocess.call(
+        ["pycodegraph", "imports", "--depth=0,1"], stderr=subprocess.DEVNULL
+    )
+    assert returncode == 2
+
+
+def test_cli_unsupported_options():
+    for command in (
+        ["cycles", "--watch"],
+        ["serve", "--progress"],
+        ["imports", "--watch", "--jobs=2"],
+        ["serve", "--jobs=2"],
+        ["imports", "--load", "old.snapshot", "--save", "new.snapshot"],
+        ["imports", "--stream"],
+        ["reduce", "-f", "lines", "--stream"],
+    ):
+        returncode = subprocess.call(
+            ["pycodegraph"] + command, stderr=subprocess.DEVNULL
+        )
+        assert returncode == 2
+
+
+def test_cli_lines():
+    out = subprocess.check_output(
+        ["pycodegraph", "imports", "--depth=1", "--no-cache", "-f", "lines"]
+    )
+    expected = [
+        line.strip().replace('"', "").rstrip(";")
+        for line in test_cli_expected.splitlines()
+        if " -> " in line
+    ]
+    assert out.decode().splitlines() == expected
+
+    out = subprocess.check_output(
+        ["pycodegraph", "imports", "--depth=1", "--no-cache", "-f", "lines", "--stream"]
+    )
+    assert sorted(out.decode().splitlines()) == expected
+
+    out = subprocess.check_output(
+        ["pycodegraph", "imports", "--no-cache", "-f", "lines", "--time-budget=0"],
+        stderr=subprocess.DEVNULL,
+    )
+    assert out.decode().splitlines()[-1].startswith("# partial: analyzed 1 of ")
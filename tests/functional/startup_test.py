@@ -0,0 +1,64 @@
+import subprocess
+import sys
+
+# generous ceilings on the total time spent importing modules, in microseconds.
+# they include compiling modules when there is no bytecode cache, and should
+# only be hit if something slow starts being imported up front
+HELP_IMPORT_CEILING = 150000
+RUN_IMPORT_CEILING = 300000
+
+RUN_CLI = "import sys; from pycodegraph.cli import main; sys.exit(main(sys.argv[1:]))"
+
+
+def top_level_imports(code, args=(), cwd=None):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code] + list(args),
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    imports = {}
+    for line in result.stderr.decode().splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        # modules imported by other modules are indented
+        name = fields[2][1:]
+        if not name.startswith(" "):
+            imports[name] = int(fields[1])
+    return imports
+
+
+def import_times(*args, cwd=None):
+    """
+    Run the command line tool with python -X importtime, returning a dict of
+    the modules it imported directly to their cumulative import times.
+    """
+    startup = top_level_imports("pass", cwd=cwd)
+    imports = top_level_imports(RUN_CLI, args, cwd=cwd)
+    return {name: us for name, us in imports.items() if name not in startup}
+
+
+def test_help_import_time():
+    imports = import_times("--help")
+    assert "allib.logging" not in imports
+    assert not any(name.startswith("pycodegraph.analysis") for name in imports)
+    assert sum(imports.values()) < HELP_IMPORT_CEILING, imports
+
+
+def test_run_import_time(tmp_path):
+    (tmp_path / "setup.py").write_text("")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("import os\n")
+    imports = import_times("imports", "--no-cache", "pkg", cwd=str(tmp_path))
+    for name in (
+        "multiprocessing",
+        "concurrent.futures",
+        "pycodegraph.analysis.cache",
+        "pycodegraph.server",
+        "pycodegraph.snapshot",
+        "pycodegraph.algorithms",
+    ):
+        assert name not in imports
+    assert sum(imports.values()) < RUN_IMPORT_CEILING, imports
@@ -0,0 +1,128 @@
+from pycodegraph.algorithms import (
+    find_cycles,
+    match_modules,
+    reachable,
+    split_by_package,
+    strongly_connected_components,
+    transitive_reduction,
+)
+from pycodegraph.graph import ImportGraph
+
+
+def components(graph):
+    return sorted(
+        sorted(graph.modules[i] for i in component)
+        for component in strongly_connected_components(graph)
+    )
+
+
+def test_strongly_connected_components():
+    graph = ImportGraph.from_edges(
+        [("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("d", "e"), ("e", "d")]
+    )
+    assert components(graph) == [["a", "b", "c"], ["d", "e"]]
+
+
+def test_strongly_connected_components_are_reverse_topologically_sorted():
+    graph = ImportGraph.from_edges([("a", "b"), ("b", "c"), ("x", "a")])
+    order = [graph.modules[c[0]] for c in strongly_connected_components(graph)]
+    assert order == ["c", "b", "a", "x"]
+
+
+def test_find_cycles():
+    graph = ImportGraph.from_edges(
+        [("a", "b"), ("b", "c"), ("c", "a"), ("b", "a"), ("c", "d"), ("d", "e")]
+    )
+    assert find_cycles(graph) == [(["a", "b", "c"], ["a", "b", "a"])]
+
+
+def test_find_cycles_without_cycles():
+    graph = ImportGraph.from_edges([("a", "b"), ("b", "c"), ("a", "c")])
+    assert find_cycles(graph) == []
+
+
+def test_algorithms_do_not_recurse():
+    count = 100000
+    edges = [("m%06d" % i, "m%06d" % (i + 1)) for i in range(count)]
+    edges.append(("m%06d" % count, "m000000"))
+    graph = ImportGraph.from_edges(edges)
+    assert len(strongly_connected_components(graph)) == 1
+    assert len(find_cycles(graph)[0][1]) == count + 2
+    assert len(transitive_reduction(graph)) == len(graph)
+
+
+def test_transitive_reduction():
+    graph = ImportGraph.from_edges(
+        [("a", "b"), ("b", "c"), ("a", "c"), ("a", "d"), ("d", "c"), ("c", "e")]
+    )
+    assert list(transitive_reduction(graph)) == [
+        ("a", "b"),
+        ("a", "d"),
+        ("b", "c"),
+        ("c", "e"),
+        ("d", "c"),
+    ]
+
+
+def test_transitive_reduction_with_cycles():
+    graph = ImportGraph.from_edges(
+        [("a", "b"), ("b", "a"), ("b", "c"), ("a", "c"), ("x", "a"), ("x", "c")]
+    )
+    assert set(transitive_reduction(graph)) == {
+        ("a", "b"),
+        ("b", "a"),
+        ("b", "c"),
+        ("a", "c"),
+        ("x", "a"),
+    }
+
+
+def test_match_modules():
+    graph = ImportGraph.from_edges(
+        [("pkg.a", "pkg.ab"), ("pkg.b.c", "pkg.a"), ("other", "pkg.b")]
+    )
+
+    def names(ids):
+        return [graph.modules[i] for i in ids]
+
+    assert names(match_modules(graph, ["pkg.a"])) == ["pkg.a", "pkg.ab"]
+    assert names(match_modules(graph, ["pkg.b.c", "other"])) == ["other", "pkg.b.c"]
+    assert names(match_modules(graph, ["pkg.*.c"])) == ["pkg.b.c"]
+    assert names(match_modules(graph, ["*b"])) == ["pkg.ab", "pkg.b"]
+    assert match_modules(graph, ["nope"]) == []
+
+
+def test_reachable():
+    graph = ImportGraph.from_edges(
+        [("a", "b"), ("b", "c"), ("c", "d"), ("x", "c"), ("d", "b")]
+    )
+    ids = graph.id_of
+
+    def names(distances):
+        return {graph.modules[i]: depth for i, depth in distances.items()}
+
+    assert names(reachable(graph, [ids("a")])) == {"b": 1, "c": 2, "d": 3}
+    assert names(reachable(graph, [ids("a")], max_depth=2)) == {"b": 1, "c": 2}
+    assert names(reachable(graph, [ids("c")], reverse=True)) == {
+        "a": 2,
+        "b": 1,
+        "c": 3,
+        "d": 2,
+        "x": 1,
+    }
+    assert names(reachable(graph, [ids("c")], max_depth=1, reverse=True)) == {
+        "b": 1,
+        "x": 1,
+    }
+    assert reachable(graph, []) == {}
+
+
+def test_split_by_package():
+    graph = ImportGraph.from_edges(
+        [("a.x", "a.y"), ("a.y", "b"), ("b.z", "a.x"), ("c", "b")]
+    )
+    graphs = split_by_package(graph)
+    assert sorted(graphs) == ["a", "b", "c"]
+    assert list(graphs["a"]) == [("a.x", "a.y"), ("a.y", "b")]
+    assert list(graphs["b"]) == [("b.z", "a.x")]
+    assert list(graphs["c"]) == [("c", "b")]
@@ -0,0 +1,77 @@
+import json
+import os
+
+from pycodegraph.analysis.cache import ParseCache, default_cache_dir
+from pycodegraph.analysis.writing import atomic_write_json
+
+
+def test_parse_cache_hits_unchanged_file(tmp_path, write):
+    src = tmp_path / "foo.py"
+    write(src, "import abc\nfrom bcd import cde\n")
+    cache = ParseCache(str(tmp_path / "cache"))
+
+    assert cache.find_imports_in_file(str(src)) == ["abc", "bcd.cde"]
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    assert cache.find_imports_in_file(str(src)) == ["abc", "bcd.cde"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_parse_cache_touched_file_is_not_reparsed(tmp_path, write):
+    src = tmp_path / "foo.py"
+    write(src, "import abc\n", mtime=1000000000)
+    cache = ParseCache(str(tmp_path / "cache"))
+    cache.find_imports_in_file(str(src))
+
+    write(src, "import abc\n", mtime=1000000100)
+    assert cache.find_imports_in_file(str(src)) == ["abc"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_parse_cache_changed_file_is_reparsed(tmp_path, write):
+    src = tmp_path / "foo.py"
+    write(src, "import abc\n", mtime=1000000000)
+    cache = ParseCache(str(tmp_path / "cache"))
+    cache.find_imports_in_file(str(src))
+
+    write(src, "import bcde\n", mtime=1000000000)
+    assert cache.find_imports_in_file(str(src)) == ["bcde"]
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_parse_cache_prune(tmp_path, write):
+    cache_dir = tmp_path / "cache"
+    old_version_dir = cache_dir / "v0"
+    old_version_dir.mkdir(parents=True)
+    src = tmp_path / "foo.py"
+    write(src, "import abc\n")
+    cache = ParseCache(str(cache_dir))
+    cache.find_imports_in_file(str(src))
+
+    cache.prune()
+    assert not old_version_dir.exists()
+    assert cache.find_imports_in_file(str(src)) == ["abc"]
+    assert cache.hits == 1
+
+    src.unlink()
+    cache.prune()
+    assert not any(files for _, _, files in os.walk(cache.path))
+
+
+def test_atomic_write_json(tmp_path):
+    path = tmp_path / "sub" / "data.json"
+    atomic_write_json(str(path), {"a": 1})
+    atomic_write_json(str(path), [1, 2])
+    assert json.loads(path.read_text()) == [1, 2]
+    assert os.listdir(str(path.parent)) == ["data.json"]
+
+
+def test_default_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_cache_dir() == str(tmp_path / "pycodegraph")
+    assert ParseCache().base_path == str(tmp_path / "pycodegraph")
+
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.delenv("LOCALAPPDATA", raising=False)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert default_cache_dir() == str(tmp_path / ".cache" / "pycodegraph")
@@ -0,0 +1,136 @@
+import multiprocessing
+
+import pytest
+
+from pycodegraph.analysis.discovery import (
+    compile_name_matcher,
+    find_ignore_rules,
+    parse_ignore_file,
+    walk_python_files,
+)
+from pycodegraph.analysis.imports import ImportAnalysis
+
+
+def walk(path, **kwargs):
+    return sorted(relpath for relpath, _ in walk_python_files(str(path), **kwargs))
+
+
+def is_ignored(ignore_file, relpath, is_dir=False):
+    (rule,) = parse_ignore_file([ignore_file])
+    target = relpath if rule.anchored else relpath.split("/")[-1]
+    return bool(rule.regex.match(target)) and (is_dir or not rule.dir_only)
+
+
+@pytest.mark.parametrize(
+    "pattern,relpath,is_dir,expected",
+    [
+        ("build", "build", True, True),
+        ("build", "a/b/build", True, True),
+        ("build/", "build", False, False),
+        ("/build", "build", True, True),
+        ("/build", "a/build", True, False),
+        ("*.py", "a/b.py", False, True),
+        ("a/*.py", "a/b.py", False, True),
+        ("a/*.py", "a/b/c.py", False, False),
+        ("a/**/c.py", "a/b/d/c.py", False, True),
+        ("a/**/c.py", "a/c.py", False, True),
+        ("**/c", "x/y/c", True, True),
+        ("a/**", "a/b/c", False, True),
+        ("file[0-9].py", "file1.py", False, True),
+        ("file[!0-9].py", "file1.py", False, False),
+        ("\\#name", "#name", False, True),
+    ],
+)
+def test_ignore_patterns(pattern, relpath, is_dir, expected):
+    assert is_ignored(pattern, relpath, is_dir) == expected
+
+
+def test_parse_ignore_file_skips_comments_and_blank_lines():
+    rules = parse_ignore_file(["# comment\n", "\n", "   \n", "!keep.py\n"])
+    assert len(rules) == 1
+    assert rules[0].negate
+
+
+def test_compile_name_matcher():
+    matcher = compile_name_matcher(["tests", "*_build", "venv?"])
+    assert matcher("tests")
+    assert matcher("docs_build")
+    assert matcher("venv3")
+    assert not matcher("test")
+    assert not matcher("venv")
+
+
+def test_exclude_globs_with_spawned_workers(tmp_path, write, monkeypatch):
+    # analyses are pickled to be sent to workers started with spawn, the
+    # default on macOS and Windows
+    spawn = multiprocessing.get_context("spawn")
+    monkeypatch.setattr(multiprocessing, "Pool", spawn.Pool)
+    write(tmp_path / "setup.py")
+    write(tmp_path / "pkg" / "__init__.py")
+    write(tmp_path / "pkg" / "a.py", "import pkg.b\nimport pkg.docs_build\n")
+    write(tmp_path / "pkg" / "b.py")
+    write(tmp_path / "pkg" / "docs_build" / "__init__.py", "import pkg.a\n")
+    analysis = ImportAnalysis(
+        str(tmp_path / "pkg"), depth=1, include=[], exclude=["*_build"], jobs=2
+    )
+    analysis.chunk_size = 1
+    assert set(analysis.find_imports()) == {("pkg.a", "pkg.b")}
+
+
+def test_walk_python_files(tmp_path, write):
+    write(tmp_path / "a.py")
+    write(tmp_path / "a.txt")
+    write(tmp_path / "pkg" / "__init__.py")
+    write(tmp_path / "pkg" / "b.py")
+    write(tmp_path / ".hidden" / "c.py")
+    write(tmp_path / "tests" / "test_a.py")
+    write(tmp_path / "docs_build" / "conf.py")
+    assert walk(tmp_path) == [
+        "a.py",
+        "docs_build/conf.py",
+        "pkg/__init__.py",
+        "pkg/b.py",
+        "tests/test_a.py",
+    ]
+    assert walk(tmp_path, exclude=["tests", "*_build"]) == [
+        "a.py",
+        "pkg/__init__.py",
+        "pkg/b.py",
+    ]
+    assert walk(tmp_path, filter=["pkg"]) == ["a.py", "pkg/__init__.py", "pkg/b.py"]
+    assert walk(tmp_path, threads=4) == walk(tmp_path)
+
+
+def test_walk_python_files_ignore_files(tmp_path, write):
+    write(tmp_path / ".gitignore", "build/\n/generated.py\n*_pb2.py\n")
+    write(tmp_path / "pkg" / ".ignore", "!keep_pb2.py\nlocal/\n")
+    write(tmp_path / "build" / "lib" / "pkg" / "a.py")
+    write(tmp_path / "generated.py")
+    write(tmp_path / "pkg" / "generated.py")
+    write(tmp_path / "pkg" / "a_pb2.py")
+    write(tmp_path / "pkg" / "keep_pb2.py")
+    write(tmp_path / "pkg" / "local" / "b.py")
+    write(tmp_path / "pkg" / "sub" / "c_pb2.py")
+
+    assert walk(tmp_path) == ["pkg/generated.py", "pkg/keep_pb2.py"]
+    assert walk(tmp_path, threads=2) == walk(tmp_path)
+    assert len(walk(tmp_path, ignore_files=False)) == 7
+
+
+def test_ignore_files_of_parent_directories_in_git_repository(tmp_path, write):
+    (tmp_path / ".git" / "info").mkdir(parents=True)
+    write(tmp_path / ".git" / "info" / "exclude", "scratch.py\n")
+    write(tmp_path / ".gitignore", "/src/pkg/gen/\n/pkg/\n")
+    write(tmp_path / "src" / ".gitignore", "*.tmp.py\n")
+    write(tmp_path / "src" / "pkg" / "a.py")
+    write(tmp_path / "src" / "pkg" / "a.tmp.py")
+    write(tmp_path / "src" / "pkg" / "scratch.py")
+    write(tmp_path / "src" / "pkg" / "gen" / "b.py")
+    write(tmp_path / "src" / "pkg" / "pkg" / "c.py")
+
+    # anchored patterns are relative to the directory of the ignore file, not
+    # to the directory being walked
+    assert walk(tmp_path / "src" / "pkg") == ["a.py", "pkg/c.py"]
+    assert find_ignore_rules(str(tmp_path / "src" / "pkg")).is_ignored(
+        "gen", "gen", True
+    )
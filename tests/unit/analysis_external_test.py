@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from pycodegraph.analysis.external import ExternalIndex, load_external_index
+from pycodegraph.analysis.imports import ImportAnalysis
+
+
+@pytest.fixture
+def site_packages(tmp_path, write):
+    path = tmp_path / "site-packages"
+    write(path / "pkg" / "__init__.py")
+    write(path / "pkg" / "sub" / "__init__.py")
+    write(path / "pkg" / "sub" / "mod.py")
+    write(path / "pkg" / "__pycache__" / "sub.cpython-36.pyc")
+    write(path / "single.py")
+    write(path / "nspkg" / "inner.py")
+    write(path / "notapackage" / "data.txt")
+    write(path / "pkg-1.0.dist-info" / "METADATA", "Name: Pkg-Dist\n\nbody\n")
+    write(path / "pkg-1.0.dist-info" / "top_level.txt", "pkg\n")
+    write(
+        path / "single-2.0.dist-info" / "RECORD",
+        "single.py,sha256=x,1\nsingle-2.0.dist-info/RECORD,,\n",
+    )
+    return path
+
+
+def test_external_index(site_packages, tmp_path, write):
+    write(tmp_path / "other" / "single.py")
+    write(tmp_path / "other" / "extra.py")
+    index = ExternalIndex.scan([str(site_packages), str(tmp_path / "other")])
+
+    assert "pkg.sub.mod" in index
+    assert "nspkg.inner" in index
+    assert "notapackage" not in index
+    assert "pkg.__pycache__" not in index
+    assert "extra" in index
+    assert index.find_module("pkg.sub.mod.func") == "pkg.sub.mod"
+    assert index.find_module("pkg.func") == "pkg"
+    assert index.find_module("sys") == "sys"
+    assert index.find_module("missing.mod") is None
+
+    assert index.distribution("pkg.sub") == "Pkg-Dist"
+    assert index.distribution("single") == "single"
+    assert index.distribution("nspkg") is None
+
+
+def test_external_index_persisted(site_packages, tmp_path, write):
+    cache_dir = str(tmp_path / "cache")
+    index = load_external_index([str(site_packages)], cache_dir=cache_dir)
+    assert "single" in index
+    (cache_dir_files,) = os.listdir(os.path.join(cache_dir, "external"))
+
+    write(site_packages / "single.py", "# changed, but still there\n")
+    os.unlink(str(site_packages / "pkg" / "sub" / "mod.py"))
+    index = load_external_index([str(site_packages)], cache_dir=cache_dir)
+    assert "pkg.sub.mod" in index
+
+    # new packages change the mtime of the directory they are installed in
+    write(site_packages / "newpkg" / "__init__.py")
+    index = load_external_index([str(site_packages)], cache_dir=cache_dir)
+    assert "newpkg" in index
+    assert "pkg.sub.mod" not in index
+    assert os.listdir(os.path.join(cache_dir, "external")) == [cache_dir_files]
+
+
+def test_import_analysis_with_external_index(site_packages, tmp_path, write):
+    write(tmp_path / "code" / "setup.py")
+    write(tmp_path / "code" / "app" / "__init__.py")
+    write(
+        tmp_path / "code" / "app" / "a.py",
+        "from pkg.sub.mod import func\nimport single\nfrom app import b\n",
+    )
+    write(tmp_path / "code" / "app" / "b.py")
+    index = ExternalIndex.scan([str(site_packages)])
+    path = str(tmp_path / "code" / "app")
+
+    analysis = ImportAnalysis(path, depth=10, include=["pkg", "single"])
+    assert ("app.a", "pkg.sub.mod.func") in analysis.find_imports()
+
+    analysis = ImportAnalysis(
+        path, depth=10, include=["pkg", "single"], external_index=index
+    )
+    assert list(analysis.find_imports()) == [
+        ("app.a", "app.b"),
+        ("app.a", "pkg.sub.mod"),
+        ("app.a", "single"),
+    ]
+
+    analysis = ImportAnalysis(
+        path,
+        depth=10,
+        include=["pkg", "single"],
+        external_index=index,
+        group_by_distribution=True,
+    )
+    assert list(analysis.find_imports()) == [
+        ("app.a", "Pkg-Dist"),
+        ("app.a", "app.b"),
+        ("app.a", "single"),
+    ]
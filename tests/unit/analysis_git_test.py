@@ -0,0 +1,77 @@
+import shutil
+import subprocess
+
+import pytest
+
+from pycodegraph.analysis.git import GitError, GitRevision
+from pycodegraph.analysis.imports import ImportAnalysis
+
+pytestmark = pytest.mark.skipif(not shutil.which("git"), reason="git not installed")
+
+
+def git(path, *args):
+    subprocess.check_call(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        + list(args),
+        cwd=str(path),
+        stdout=subprocess.DEVNULL,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path, write):
+    git(tmp_path, "init", "-q")
+    write(tmp_path / "setup.py", "")
+    write(tmp_path / "pkg" / "__init__.py", "")
+    write(tmp_path / "pkg" / "a.py", "from pkg import b\n")
+    write(tmp_path / "pkg" / "b.py", "from . import c\n")
+    write(tmp_path / "pkg" / "c.py", "import os\n")
+    write(tmp_path / "pkg" / "tests" / "test_a.py", "from pkg import a\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "first")
+
+    # change the working tree without committing
+    (tmp_path / "pkg" / "c.py").unlink()
+    write(tmp_path / "pkg" / "b.py", "from pkg import d\n")
+    write(tmp_path / "pkg" / "d.py", "")
+    return tmp_path
+
+
+def test_analyze_git_revision(repo):
+    source = GitRevision(str(repo / "pkg"), "HEAD")
+    analysis = ImportAnalysis(str(repo / "pkg"), include=[], source=source)
+    assert sorted(module for module, _ in analysis.module_files) == [
+        "pkg",
+        "pkg.a",
+        "pkg.b",
+        "pkg.c",
+        "pkg.tests.test_a",
+    ]
+    assert list(analysis.find_imports()) == [
+        ("pkg.a", "pkg.b"),
+        ("pkg.b", "pkg.c"),
+        ("pkg.tests", "pkg.a"),
+    ]
+
+    disk = ImportAnalysis(str(repo / "pkg"), include=[])
+    assert list(disk.find_imports()) == [
+        ("pkg.a", "pkg.b"),
+        ("pkg.b", "pkg.d"),
+        ("pkg.tests", "pkg.a"),
+    ]
+
+
+def test_analyze_git_revision_in_parallel(repo):
+    source = GitRevision(str(repo / "pkg"), "HEAD")
+    analysis = ImportAnalysis(
+        str(repo / "pkg"), include=[], exclude=["tests"], source=source, jobs=2
+    )
+    analysis.chunk_size = 1
+    assert list(analysis.find_imports()) == [("pkg.a", "pkg.b"), ("pkg.b", "pkg.c")]
+
+
+def test_git_revision_errors(repo, tmp_path_factory):
+    with pytest.raises(GitError, match="unknown revision"):
+        GitRevision(str(repo), "nonexistent")
+    with pytest.raises(GitError):
+        GitRevision(str(tmp_path_factory.mktemp("not_a_repo")), "HEAD")
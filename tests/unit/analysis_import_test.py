@@ -89,3 +89,24 @@ def test_resolve_relative_with_too_many_dots():
         resolve_relative_module("/path/to/foo/bar.py", "...foo", "/path/to")
     with pytest.raises(ValueError):
         resolve_relative_module("/path/to/foo/bar.py", "foo", "/path/to", 3)
+
+
+def test_import_analysis_parallel_matches_serial():
+    path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    serial = ImportAnalysis(path, depth=1, include=[], exclude=[])
+    parallel = ImportAnalysis(path, depth=1, include=[], exclude=[], jobs=2)
+    parallel.chunk_size = 2
+    assert parallel.find_imports() == serial.find_imports()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_import_analysis_at_depths(jobs):
+    path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    analysis = ImportAnalysis(path, include=[], exclude=[], jobs=jobs)
+    analysis.chunk_size = 2
+    graphs = analysis.find_imports_at_depths([0, 1, 3])
+    assert sorted(graphs) == [0, 1, 3]
+    for depth, graph in graphs.items():
+        single = ImportAnalysis(path, depth=depth, include=[], exclude=[])
+        assert graph == single.find_imports()
+    assert analysis.profile.counters["files_scanned"] == len(analysis.module_files)
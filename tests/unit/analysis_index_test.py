@@ -0,0 +1,30 @@
+import os.path
+
+from pycodegraph.analysis.index import ModuleIndex
+from pycodegraph.analysis.imports import ImportAnalysis, module_exists_on_filesystem
+
+
+def test_module_index():
+    index = ModuleIndex(
+        [
+            ("foo", "/path/to/foo/__init__.py"),
+            ("foo.bar", "/path/to/foo/bar.py"),
+        ]
+    )
+    assert index.module_exists("foo")
+    assert index.module_exists("foo.bar")
+    assert not index.module_exists("foo.baz")
+    assert index.is_package("foo")
+    assert not index.is_package("foo.bar")
+    assert (index.lookups, index.hits, index.misses) == (3, 2, 1)
+
+
+def test_module_index_matches_filesystem():
+    path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    analysis = ImportAnalysis(path, include=[])
+    for module, _ in analysis.module_files:
+        parent = module.rpartition(".")[0]
+        for name in (module, parent, module + ".nonexistent"):
+            assert analysis.module_exists(name) == module_exists_on_filesystem(
+                name, analysis.root_path
+            )
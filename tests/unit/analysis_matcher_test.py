@@ -0,0 +1,54 @@
+from fnmatch import fnmatch
+import pickle
+
+import pytest
+from pycodegraph.analysis.imports import module_matches
+from pycodegraph.analysis.matcher import ModuleMatcher
+
+PATTERNS = ["foo", "bar.baz", "qux.*", "*.tests", "x?z", "[ab]cd"]
+MODULES = [
+    "foo",
+    "foo.bar",
+    "foobar",
+    "bar",
+    "bar.baz",
+    "bar.baz.qux",
+    "bar.bazz",
+    "qux",
+    "qux.a",
+    "pkg.tests",
+    "pkg.tests.foo",
+    "xyz",
+    "xz",
+    "acd",
+    "ccd",
+]
+
+
+@pytest.mark.parametrize("allow_fnmatch", [True, False])
+@pytest.mark.parametrize("module", MODULES)
+def test_module_matcher_is_equivalent_to_module_matches(module, allow_fnmatch):
+    matcher = ModuleMatcher(PATTERNS, allow_fnmatch=allow_fnmatch)
+    expected = module_matches(module, PATTERNS, allow_fnmatch=allow_fnmatch)
+    assert matcher.matches(module) == expected
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_module_matcher_undotted_is_equivalent_to_highlights(module):
+    matcher = ModuleMatcher(PATTERNS, allow_fnmatch=True, dotted=False)
+    # how highlights used to be matched, one pattern at a time
+    expected = any(module.startswith(hl) or fnmatch(module, hl) for hl in PATTERNS)
+    assert matcher.matches(module) == expected
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_pickled_module_matcher(module):
+    matcher = ModuleMatcher(PATTERNS, allow_fnmatch=True)
+    pickled = pickle.loads(pickle.dumps(matcher))
+    assert pickled.matches(module) == matcher.matches(module)
+
+
+def test_empty_module_matcher():
+    matcher = ModuleMatcher(None)
+    assert not matcher
+    assert not matcher.matches("foo")
@@ -0,0 +1,66 @@
+import os.path
+
+import pytest
+
+from pycodegraph.analysis.cache import ParseCache
+from pycodegraph.analysis.imports import ImportAnalysis
+from pycodegraph.analysis.monorepo import MonorepoAnalysis, find_project_module_files
+
+
+@pytest.fixture
+def monorepo(tmp_path, write):
+    write(tmp_path / "liba" / "setup.py")
+    write(tmp_path / "liba" / "liba" / "__init__.py", "from .sub import x\n")
+    write(tmp_path / "liba" / "liba" / "sub" / "__init__.py", "from libb import y\n")
+    write(tmp_path / "liba" / "liba" / "sub" / "mod.py", "from ..sub import z\n")
+    write(tmp_path / "libb" / "pyproject.toml")
+    write(tmp_path / "libb" / "src" / "libb" / "__init__.py", "import liba.sub.mod\n")
+    write(tmp_path / "libb" / "libc" / "setup.cfg")
+    write(tmp_path / "libb" / "libc" / "libc.py", "import libb\n")
+    write(tmp_path / "tools" / "run.py", "import liba\n")
+    return tmp_path
+
+
+def test_find_project_module_files(monorepo):
+    root = str(monorepo)
+    assert sorted(find_project_module_files(root)) == [
+        ("liba", os.path.join(root, "liba/liba/__init__.py"), root + "/liba"),
+        ("liba.sub", os.path.join(root, "liba/liba/sub/__init__.py"), root + "/liba"),
+        ("liba.sub.mod", os.path.join(root, "liba/liba/sub/mod.py"), root + "/liba"),
+        ("libb", os.path.join(root, "libb/src/libb/__init__.py"), root + "/libb/src"),
+        ("libc", os.path.join(root, "libb/libc/libc.py"), root + "/libb/libc"),
+        ("tools.run", os.path.join(root, "tools/run.py"), root),
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_monorepo_analysis(monorepo, jobs):
+    analysis = MonorepoAnalysis(str(monorepo), depth=5, include=[], jobs=jobs)
+    analysis.chunk_size = 1
+    assert analysis.packages == ["liba", "libb", "libc", "tools"]
+    assert list(analysis.find_imports()) == [
+        ("liba", "liba.sub"),
+        ("liba.sub", "libb"),
+        ("liba.sub.mod", "liba.sub"),
+        ("libb", "liba.sub.mod"),
+        ("libc", "libb"),
+        ("tools.run", "liba"),
+    ]
+    assert list(analysis.at_depth(0).find_imports()) == [
+        ("liba", "libb"),
+        ("libb", "liba"),
+        ("libc", "libb"),
+        ("tools", "liba"),
+    ]
+
+
+def test_monorepo_analysis_shares_parse_cache(monorepo, tmp_path_factory):
+    cache = ParseCache(str(tmp_path_factory.mktemp("cache")))
+    single = ImportAnalysis(str(monorepo / "liba" / "liba"), include=[], cache=cache)
+    single.find_imports()
+    assert single.profile.counters["cache_misses"] == 3
+
+    analysis = MonorepoAnalysis(str(monorepo), include=[], cache=cache)
+    analysis.find_imports()
+    assert analysis.profile.counters["cache_hits"] == 3
+    assert analysis.profile.counters["cache_misses"] == 3
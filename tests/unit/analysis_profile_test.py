@@ -0,0 +1,76 @@
+import os.path
+
+from pycodegraph.analysis.cache import ParseCache
+from pycodegraph.analysis.imports import ImportAnalysis
+from pycodegraph.analysis.profile import Profile
+
+
+def test_profile_slowest_files():
+    profile = Profile(slowest=2)
+    profile.add_file("a.py", 0.1)
+    profile.add_file("b.py", 0.3)
+    profile.add_file("c.py", 0.2)
+    assert profile.slowest_files == [(0.3, "b.py"), (0.2, "c.py")]
+
+
+def test_profile_merge():
+    profile = Profile()
+    with profile.phase("parsing"):
+        pass
+    profile.count("files_scanned")
+    other = Profile()
+    other.add_time("parsing", 1.0, 0.5)
+    other.count("files_scanned", 2)
+    other.add_file("a.py", 1.0)
+
+    profile.merge(other)
+    assert profile.phases["parsing"][0] >= 1.0
+    assert profile.counters["files_scanned"] == 3
+    assert profile.slowest_files == [(1.0, "a.py")]
+    assert profile.to_dict()["counters"] == {"files_scanned": 3}
+
+
+def test_profile_format_aligns_counters():
+    profile = Profile()
+    profile.count("files_scanned", 3)
+    profile.count("find_module_cache_hits", 12345)
+    lines = profile.format().splitlines()
+    assert lines[-2:] == [
+        "files_scanned                     3",
+        "find_module_cache_hits        12345",
+    ]
+
+
+def test_import_analysis_profile():
+    path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    serial = ImportAnalysis(path, depth=1, include=[], exclude=[])
+    parallel = ImportAnalysis(path, depth=1, include=[], exclude=[], jobs=2)
+    parallel.chunk_size = 2
+    imports = serial.find_imports()
+    parallel.find_imports()
+
+    for analysis in (serial, parallel):
+        counters = analysis.profile.counters
+        assert counters["files_scanned"] == len(analysis.module_files)
+        assert counters["stat_calls"] == counters["files_scanned"]
+        assert counters["bytes_read"] > 0
+        assert counters["imports_seen"] >= counters["imports_kept"] >= len(imports)
+        assert counters["module_lookups"] > 0
+        assert set(analysis.profile.phases) >= {"discovery", "parsing", "resolution"}
+    # lookups and cache hits depend on how files are spread over processes,
+    # since each process has its own resolver caches
+    for counter in ("files_scanned", "bytes_read", "imports_seen", "imports_kept"):
+        assert serial.profile.counters[counter] == parallel.profile.counters[counter]
+    for counter in ("shorten", "find_module", "package_of_dir"):
+        assert serial.profile.counters["%s_cache_hits" % counter] > 0
+
+
+def test_import_analysis_profile_with_cache(tmp_path):
+    path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    cache = ParseCache(str(tmp_path / "cache"))
+    for _ in range(2):
+        analysis = ImportAnalysis(path, depth=1, include=[], exclude=[], cache=cache)
+        analysis.find_imports()
+        counters = analysis.profile.counters
+        assert counters["stat_calls"] == counters["files_scanned"]
+    assert counters["cache_hits"] == counters["files_scanned"]
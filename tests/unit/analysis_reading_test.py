@@ -0,0 +1,88 @@
+import mmap
+
+import pytest
+
+from pycodegraph.analysis.imports import (
+    ImportAnalysis,
+    SCANNERS,
+    find_imports_in_file,
+)
+from pycodegraph.analysis.reading import (
+    is_ascii_compatible,
+    open_source,
+    source_encoding,
+)
+
+
+@pytest.mark.parametrize(
+    "code,expect",
+    [
+        (b"import os\n", "utf-8"),
+        (b"", "utf-8"),
+        (b"\xef\xbb\xbfimport os\n", "utf-8"),
+        (b"# -*- coding: latin-1 -*-\nimport os\n", "iso8859-1"),
+        (b"#!/usr/bin/env python\n# vim: set fileencoding=cp1252 :\n", "cp1252"),
+        (b"import os\n# coding: latin-1\n", "utf-8"),
+        (b"# coding: shift_jis", "shift_jis"),
+        (b"# coding: no-such-encoding\n", "utf-8"),
+    ],
+)
+def test_source_encoding(code, expect):
+    assert source_encoding(code) == expect
+
+
+def test_is_ascii_compatible():
+    assert is_ascii_compatible("utf-8")
+    assert is_ascii_compatible("iso8859-15")
+    assert is_ascii_compatible("cp1252")
+    assert not is_ascii_compatible("utf-16")
+    assert not is_ascii_compatible("shift_jis")
+
+
+def test_open_source(tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_bytes(b"# coding: latin-1\nimport os\nname = '\xe6\xf8\xe5'\n")
+
+    with open_source(str(path)) as code:
+        assert isinstance(code, bytes)
+    with open_source(str(path), mmap_threshold=1) as code:
+        assert isinstance(code, mmap.mmap)
+        for scanner in SCANNERS.values():
+            assert list(scanner(code, path=str(path))) == ["os"]
+
+    assert find_imports_in_file(str(path)) == ["os"]
+    assert find_imports_in_file(str(path), scanner="fast") == ["os"]
+
+    empty = tmp_path / "empty.py"
+    empty.write_bytes(b"")
+    with open_source(str(empty), mmap_threshold=0) as code:
+        assert code == b""
+
+
+@pytest.fixture
+def large_file_tree(tmp_path):
+    (tmp_path / "setup.py").write_text("")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "small.py").write_text("import pkg.generated\n")
+    (tmp_path / "pkg" / "generated.py").write_text(
+        "import pkg.small\n" + "VALUE = 1\n" * 1000
+    )
+    return str(tmp_path / "pkg")
+
+
+@pytest.mark.parametrize("large_files", ["fast", "skip"])
+def test_max_file_size(large_file_tree, large_files):
+    analysis = ImportAnalysis(
+        large_file_tree,
+        include=[],
+        exclude=[],
+        max_file_size=1000,
+        large_files=large_files,
+    )
+    graph = analysis.find_imports()
+    assert analysis.profile.counters["files_too_large"] == 1
+    edges = {("pkg.small", "pkg.generated")}
+    if large_files == "fast":
+        edges.add(("pkg.generated", "pkg.small"))
+    assert set(graph) == edges
@@ -0,0 +1,73 @@
+import pickle
+
+import pytest
+
+from pycodegraph.analysis.imports import resolve_relative_module
+from pycodegraph.analysis.resolver import ModuleResolver
+
+
+def make_resolver(cache_size=100):
+    modules = {"foo", "foo.bar", "foo.bar.baz"}
+    return ModuleResolver(
+        "/path/to",
+        1,
+        lambda module: module if module in modules else False,
+        cache_size=cache_size,
+    )
+
+
+@pytest.mark.parametrize(
+    "path, module, level",
+    [
+        ("/path/to/foo/bar/baz.py", "bar", 2),
+        ("/path/to/foo/bar/baz.py", "baz.bar", 2),
+        ("/path/to/foo/bar/baz.py", "bar", 1),
+        ("/path/to/foo/bar/baz.py", None, 1),
+        ("/path/to/foo/bar.py", "baz", 1),
+    ],
+)
+def test_resolve_relative(path, module, level):
+    expected = resolve_relative_module(path, module, "/path/to", level)
+    assert make_resolver().resolve_relative(path, module, level) == expected
+
+
+def test_resolve_relative_beyond_top_level():
+    with pytest.raises(ValueError):
+        make_resolver().resolve_relative("/path/to/foo/bar.py", "foo", 3)
+
+
+def test_resolver_caches():
+    resolver = make_resolver()
+    for _ in range(3):
+        assert resolver.shorten("foo.bar.baz") == "foo.bar"
+        assert resolver.find_module("foo.bar") == "foo.bar"
+        assert resolver.find_module("foo.nope") is False
+        resolver.resolve_relative("/path/to/foo/a.py", "b", 1)
+        resolver.resolve_relative("/path/to/foo/c.py", "d", 1)
+
+    stats = resolver.pop_stats()
+    assert stats["shorten_cache_hits"] == 2
+    assert stats["shorten_cache_misses"] == 1
+    assert stats["find_module_cache_hits"] == 4
+    assert stats["find_module_cache_misses"] == 2
+    assert stats["package_of_dir_cache_hits"] == 5
+    assert stats["package_of_dir_cache_misses"] == 1
+
+    resolver.shorten("foo.bar.baz")
+    assert resolver.pop_stats()["shorten_cache_hits"] == 1
+
+
+def test_resolver_cache_size_is_bounded():
+    resolver = make_resolver(cache_size=2)
+    for idx in range(10):
+        resolver.shorten("foo.mod%d" % idx)
+    assert resolver.shorten.cache_info().currsize == 2
+
+
+def test_resolver_can_be_pickled():
+    resolver = ModuleResolver("/path/to", 1, str.upper)
+    resolver.shorten("foo.bar.baz")
+    copy = pickle.loads(pickle.dumps(resolver))
+    assert copy.shorten("foo.bar.baz") == "foo.bar"
+    assert copy.find_module("foo") == "FOO"
+    assert copy.pop_stats()["shorten_cache_misses"] == 1
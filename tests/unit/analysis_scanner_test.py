@@ -0,0 +1,134 @@
+import ast
+import glob
+import os.path
+
+import pytest
+from pycodegraph.analysis.imports import (
+    find_imports_in_code,
+    scan_imports_in_code,
+    _regexes,
+    _scan_import_statements,
+    _ScanError,
+)
+
+
+def assert_same_imports(code, **kwargs):
+    expected = sorted(find_imports_in_code(code, **kwargs))
+    assert sorted(scan_imports_in_code(code, **kwargs)) == expected
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import abc",
+        "import abc, bcd",
+        "import abc.bcd as cde, def_",
+        "import abc \\\n    . bcd",
+        "from abc import bcd, cde",
+        "from abc import *",
+        "from abc import (bcd, cde,)",
+        "from abc import (\n    bcd,  # comment ) with parens\n    cde as e,\n)",
+        "from abc import bcd as \\\n    cde",
+        "from . import abc",
+        "from .. import abc",
+        "from ...abc import bcd",
+        "from .abc import *",
+        "from.abc import bcd",
+        "from .import abc",
+        "x = 1; import abc; import bcd",
+        "if x: import abc\nelse: from bcd import cde",
+        "try:\n    import abc\nexcept ImportError:\n    abc = None",
+        "if TYPE_CHECKING:\n    from abc import bcd",
+        "def f():\n    def g():\n        import abc\n    return g",
+        "class A:\n    from abc import bcd",
+        "import abc  # import bcd",
+        "# import abc\nimport bcd",
+        "'''\nimport abc\n'''\nimport bcd",
+        'x = """\nfrom abc import bcd\n"""',
+        "x = 'import abc'; y = \"from abc import bcd\"",
+        "x = r'\\'import abc'\nimport bcd",
+        "x = {'a': 1}\ny = x[1:2]\nimport abc",
+        "def f(x: int) -> None:\n    import abc",
+        "importlib = 1\nfromage = 2\nimport abc",
+        "from importlib import import_module",
+        "import ñame",
+        "",
+    ],
+)
+def test_scanner_conformance(code):
+    assert_same_imports(code)
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "def f():\n    x = (yield\n         from g())",
+        "from abc import (bcd, )  cde",
+    ],
+)
+def test_scanner_falls_back_to_ast(code):
+    with pytest.raises(_ScanError):
+        list(_scan_import_statements(code))
+    assert_same_imports(code)
+
+
+def test_scanner_resolves_relative_imports():
+    assert_same_imports(
+        "from ..bar import baz\nfrom . import foo",
+        path="/path/to/foo/bar/baz.py",
+        root_path="/path/to",
+    )
+
+
+def _python_files():
+    package_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    stdlib_dir = os.path.dirname(ast.__file__)
+    return sorted(
+        glob.glob(
+            os.path.join(package_dir, "pycodegraph", "**", "*.py"), recursive=True
+        )
+        + glob.glob(os.path.join(stdlib_dir, "*.py"))
+    )
+
+
+@pytest.mark.parametrize("path", _python_files())
+def test_scanner_conformance_with_real_files(path):
+    with open(path, encoding="utf-8", errors="surrogateescape") as filehandle:
+        code = filehandle.read()
+    try:
+        ast.parse(code)
+    except SyntaxError:
+        pytest.skip("not valid syntax for this python version")
+    assert_same_imports(code)
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        b"import abc\nfrom . import (bcd,\n  cde)\n",
+        "# -*- coding: latin-1 -*-\nx = 'caf\xe9'\nimport abc\n".encode("latin-1"),
+        "# coding: shift_jis\nx = '表'\nimport abc\n".encode("shift_jis"),
+        "import caf\xe9, abc\n".encode("utf-8"),
+        b"\xef\xbb\xbfimport abc\n",
+    ],
+)
+def test_scanner_conformance_with_bytes(code):
+    assert_same_imports(code)
+
+
+@pytest.mark.parametrize("path", _python_files())
+def test_scanner_conformance_with_real_files_as_bytes(path):
+    with open(path, "rb") as filehandle:
+        code = filehandle.read()
+    try:
+        ast.parse(code)
+    except SyntaxError:
+        pytest.skip("not valid syntax for this python version")
+    assert_same_imports(code)
+
+
+def test_regexes_are_compiled_lazily():
+    assert _regexes.scan.search("import os")
+    assert "scan" in vars(_regexes)
+    assert not hasattr(_regexes, "nope")
+    assert getattr(_regexes, "nope", None) is None
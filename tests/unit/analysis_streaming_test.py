@@ -0,0 +1,91 @@
+import time
+import tracemalloc
+
+import pytest
+
+from pycodegraph.analysis.imports import ImportAnalysis
+
+FILLER = '''
+
+def function_%(idx)d(arg):
+    """Some text to make the file and its syntax tree bigger."""
+    return [x * %(idx)d for x in range(arg) if x %% 3] or {"key": "value"}
+'''
+
+
+def generate_tree(path, files):
+    """
+    Write files modules spread over 10 packages. Module names are reused across
+    packages, so that the names python interns while parsing do not grow with
+    the number of files.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "setup.py").write_text("")
+    for idx in range(files):
+        package = path / "pkg" / ("sub%d" % (idx % 10))
+        if not package.exists():
+            package.mkdir(parents=True)
+            (package / "__init__.py").write_text("")
+        code = "import os\nfrom pkg.sub%d import mod%d\nfrom . import mod%d\n" % (
+            (idx + 1) % 10,
+            idx // 10,
+            (idx // 10 + 1) % 5,
+        )
+        code += "".join(FILLER % {"idx": i} for i in range(15))
+        (package / ("mod%d.py" % (idx // 10))).write_text(code)
+
+
+def _peak_memory_of_analysis(path):
+    analysis = ImportAnalysis(str(path / "pkg"), include=[])
+    tracemalloc.start()
+    try:
+        edges = sum(1 for _ in analysis.iter_imports())
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return edges, peak
+
+
+def test_iter_imports_matches_find_imports(tmp_path):
+    generate_tree(tmp_path, 30)
+    analysis = ImportAnalysis(str(tmp_path / "pkg"), include=[])
+    edges = list(analysis.iter_imports())
+    assert len(edges) == len(set(edges))
+    assert sorted(edges) == list(analysis.find_imports())
+
+
+def test_iter_imports_memory_does_not_grow_with_tree_size(tmp_path):
+    generate_tree(tmp_path / "small", 50)
+    generate_tree(tmp_path / "large", 400)
+    small_edges, small_peak = _peak_memory_of_analysis(tmp_path / "small")
+    large_edges, large_peak = _peak_memory_of_analysis(tmp_path / "large")
+
+    assert small_edges == large_edges == 10
+    # only the file being analyzed is held in memory, so eight times as many
+    # files should take about the same amount of memory
+    assert large_peak < small_peak * 2
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_iter_imports_stops_at_deadline(tmp_path, jobs):
+    generate_tree(tmp_path, 30)
+    analysis = ImportAnalysis(str(tmp_path / "pkg"), include=[], jobs=jobs)
+    analysis.chunk_size = 4
+    progress = []
+    total = len(analysis.module_files)
+
+    edges = list(
+        analysis.iter_imports(
+            deadline=time.monotonic(), progress=lambda *args: progress.append(args)
+        )
+    )
+    assert analysis.partial == (1, total)
+    assert progress == [(1, total)]
+    assert set(edges) < set(analysis.find_imports())
+
+    progress = []
+    analysis.find_imports(
+        deadline=time.monotonic() + 60, progress=lambda *args: progress.append(args)
+    )
+    assert analysis.partial is None
+    assert progress[-1] == (total, total)
@@ -0,0 +1,212 @@
+import pytest
+
+from pycodegraph.analysis.cache import ParseCache
+from pycodegraph.analysis.imports import (
+    ImportAnalysis,
+    find_imports_and_symbols_in_code,
+)
+from pycodegraph.analysis.index import ModuleIndex
+from pycodegraph.analysis.symbols import SymbolIndex
+from pycodegraph.analysis.watch import IncrementalAnalysis
+
+
+def test_find_imports_and_symbols_in_code():
+    code = """
+import os.path
+import json as _json
+from . import sibling
+from .models import *
+try:
+    from fast import parse
+except ImportError:
+    def parse(x): pass
+CONSTANT, (OTHER, *REST) = 1, (2, 3)
+count: int = 0
+class Thing:
+    inner = 1
+    def method(self):
+        import secret
+"""
+    imports, symbols = find_imports_and_symbols_in_code(
+        code, path="/src/pkg/__init__.py", root_path="/src"
+    )
+    assert sorted(imports) == sorted(
+        ["os.path", "json", "pkg.sibling", "pkg.models", "fast.parse", "secret"]
+    )
+    assert symbols == {
+        "defined": ["CONSTANT", "OTHER", "REST", "Thing", "count", "parse"],
+        "imported": {
+            "os": "os",
+            "_json": "json",
+            "sibling": "pkg.sibling",
+            "parse": "fast.parse",
+        },
+        "star": ["pkg.models"],
+    }
+
+
+def test_find_imports_and_symbols_with_syntax_error():
+    assert find_imports_and_symbols_in_code("import (") == ([], None)
+
+
+def _symbols(defined=(), imported=None, star=()):
+    return {"defined": list(defined), "imported": imported or {}, "star": list(star)}
+
+
+def test_symbol_index_resolve():
+    modules = ModuleIndex(
+        [
+            ("pkg", "pkg/__init__.py"),
+            ("pkg.util", "pkg/util/__init__.py"),
+            ("pkg.util.helpers", "pkg/util/helpers.py"),
+            ("pkg.models", "pkg/models.py"),
+            ("pkg.loop", "pkg/loop/__init__.py"),
+        ]
+    )
+    index = SymbolIndex()
+    index.add(
+        "pkg",
+        _symbols(
+            defined=["VERSION", "helper"],
+            imported={"helper": "pkg.util.helper", "os": "os"},
+            star=["pkg.models"],
+        ),
+    )
+    index.add("pkg.util", _symbols(imported={"helper": "pkg.util.helpers.helper"}))
+    index.add("pkg.models", _symbols(defined=["Model", "_private"]))
+    index.add("pkg.loop", _symbols(imported={"a": "pkg.loop.b", "b": "pkg.loop.a"}))
+
+    assert index.resolve("pkg.util", modules) == "pkg.util"
+    assert index.resolve("pkg.helper", modules) == "pkg.util.helpers"
+    assert index.resolve("pkg.VERSION", modules) == "pkg"
+    assert index.resolve("pkg.Model", modules) == "pkg.models"
+    assert index.resolve("pkg._private", modules) == "pkg"
+    assert index.resolve("pkg.os", modules) == "pkg"
+    assert index.resolve("pkg.unknown", modules) == "pkg"
+    assert index.resolve("pkg.util.helpers.helper", modules) == "pkg.util.helpers"
+    assert index.resolve("pkg.loop.a", modules) == "pkg.loop"
+    assert index.resolve("other.thing", modules) is None
+    assert index.resolve("pkg.nosuch.thing", modules) is None
+    assert index.pop_stats() == {"symbols_followed": 6}
+
+
+@pytest.fixture
+def reexporting_tree(tmp_path, write):
+    write(tmp_path / "setup.py")
+    write(
+        tmp_path / "pkg" / "__init__.py",
+        "from .util.helpers import helper\nfrom .models import *\nVERSION = 1\n",
+    )
+    write(tmp_path / "pkg" / "util" / "__init__.py")
+    write(tmp_path / "pkg" / "util" / "helpers.py", "def helper(): pass\n")
+    write(tmp_path / "pkg" / "models.py", "class Model: pass\n")
+    write(tmp_path / "pkg" / "app.py", "from pkg import helper, Model, VERSION\n")
+    return tmp_path
+
+
+EXPECTED_EDGES = {
+    ("pkg", "pkg.models"),
+    ("pkg", "pkg.util.helpers"),
+    ("pkg.app", "pkg"),
+    ("pkg.app", "pkg.models"),
+    ("pkg.app", "pkg.util.helpers"),
+}
+
+
+def test_import_analysis_without_symbols(reexporting_tree):
+    path = str(reexporting_tree / "pkg")
+    analysis = ImportAnalysis(path, depth=1, include=[])
+    assert set(analysis.find_imports()) == {
+        ("pkg", "pkg.models"),
+        ("pkg", "pkg.util.helpers"),
+        ("pkg.app", "pkg"),
+    }
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_import_analysis_with_symbols(reexporting_tree, jobs):
+    analysis = ImportAnalysis(
+        str(reexporting_tree / "pkg"), depth=1, include=[], jobs=jobs, symbols=True
+    )
+    analysis.chunk_size = 1
+    assert set(analysis.find_imports()) == EXPECTED_EDGES
+    assert len(analysis.symbol_index) == 5
+
+    graphs = analysis.find_imports_at_depths([0, 1])
+    assert set(graphs[1]) == EXPECTED_EDGES
+    assert set(graphs[0]) == {
+        ("pkg", "pkg.models"),
+        ("pkg", "pkg.util"),
+        ("pkg.app", "pkg"),
+        ("pkg.app", "pkg.models"),
+        ("pkg.app", "pkg.util"),
+    }
+
+
+def test_import_analysis_symbols_are_cached(reexporting_tree, tmp_path_factory):
+    path = str(reexporting_tree / "pkg")
+    cache = ParseCache(str(tmp_path_factory.mktemp("cache")))
+    ImportAnalysis(path, depth=1, include=[], cache=cache).find_imports()
+
+    # entries without symbols are parsed again
+    analysis = ImportAnalysis(path, depth=1, include=[], cache=cache, symbols=True)
+    assert set(analysis.find_imports()) == EXPECTED_EDGES
+    assert analysis.profile.counters["cache_misses"] == 5
+
+    analysis = ImportAnalysis(path, depth=1, include=[], cache=cache, symbols=True)
+    assert set(analysis.find_imports()) == EXPECTED_EDGES
+    assert analysis.profile.counters["cache_hits"] == 5
+    assert analysis.profile.counters["cache_misses"] == 0
+
+
+def test_incremental_analysis_with_symbols(reexporting_tree, write):
+    analysis = ImportAnalysis(
+        str(reexporting_tree / "pkg"), depth=1, include=[], symbols=True
+    )
+    incremental = IncrementalAnalysis(analysis)
+    assert set(incremental.graph()) == EXPECTED_EDGES
+
+    # app.py is unchanged, but what it imports now comes from elsewhere
+    write(
+        reexporting_tree / "pkg" / "__init__.py",
+        "from .models import *\nfrom .models import Model as helper\n# changed\n",
+    )
+    assert incremental.refresh()
+    assert set(incremental.graph()) == {
+        ("pkg", "pkg.models"),
+        ("pkg.app", "pkg"),
+        ("pkg.app", "pkg.models"),
+    }
+
+
+def test_import_analysis_symbols_cached_by_fast_scanner(
+    reexporting_tree, tmp_path_factory
+):
+    path = str(reexporting_tree / "pkg")
+    cache = ParseCache(str(tmp_path_factory.mktemp("cache")))
+    analysis = ImportAnalysis(
+        path, depth=1, include=[], cache=cache, scanner="fast", symbols=True
+    )
+    analysis.find_imports()
+
+    # the fast scanner finds no symbols, so its entries can't be used here
+    analysis = ImportAnalysis(path, depth=1, include=[], cache=cache, symbols=True)
+    assert set(analysis.find_imports()) == EXPECTED_EDGES
+    assert analysis.profile.counters["cache_misses"] == 5
+
+    analysis = ImportAnalysis(path, depth=1, include=[], cache=cache, symbols=True)
+    assert set(analysis.find_imports()) == EXPECTED_EDGES
+    assert analysis.profile.counters["cache_hits"] == 5
+
+
+def test_import_analysis_caches_files_without_symbols(
+    reexporting_tree, tmp_path_factory, write
+):
+    write(reexporting_tree / "pkg" / "broken.py", "import pkg.models\nimport (\n")
+    path = str(reexporting_tree / "pkg")
+    cache = ParseCache(str(tmp_path_factory.mktemp("cache")))
+    for _ in range(2):
+        analysis = ImportAnalysis(path, depth=1, include=[], cache=cache, symbols=True)
+        assert set(analysis.find_imports()) == EXPECTED_EDGES
+    assert analysis.profile.counters["cache_hits"] == 6
+    assert analysis.profile.counters["cache_misses"] == 0
@@ -0,0 +1,65 @@
+from pycodegraph.analysis.imports import ImportAnalysis
+from pycodegraph.analysis.watch import IncrementalAnalysis
+
+
+def test_incremental_analysis(tmp_path, write):
+    write(tmp_path / "setup.py", "")
+    write(tmp_path / "pkg" / "__init__.py", "")
+    write(tmp_path / "pkg" / "a.py", "from pkg import b\n")
+    write(tmp_path / "pkg" / "b.py", "import os\n")
+    analysis = ImportAnalysis(str(tmp_path / "pkg"), include=[])
+    incremental = IncrementalAnalysis(analysis)
+    assert list(incremental.graph()) == [("pkg.a", "pkg.b")]
+    assert not incremental.refresh()
+
+    write(tmp_path / "pkg" / "b.py", "from pkg import a\nfrom pkg import c\n")
+    assert incremental.refresh()
+    # c does not exist yet, so it is assumed to be an attribute of pkg
+    assert list(incremental.graph()) == [
+        ("pkg.a", "pkg.b"),
+        ("pkg.b", "pkg"),
+        ("pkg.b", "pkg.a"),
+    ]
+
+    # adding c changes how the existing import of it in b is resolved
+    write(tmp_path / "pkg" / "c.py", "")
+    assert incremental.refresh()
+    assert list(incremental.graph()) == [
+        ("pkg.a", "pkg.b"),
+        ("pkg.b", "pkg.a"),
+        ("pkg.b", "pkg.c"),
+    ]
+
+    (tmp_path / "pkg" / "a.py").unlink()
+    assert incremental.refresh()
+    assert list(incremental.graph()) == [("pkg.b", "pkg"), ("pkg.b", "pkg.c")]
+
+
+def test_incremental_analysis_with_vanishing_file(tmp_path, write):
+    write(tmp_path / "setup.py", "")
+    write(tmp_path / "pkg" / "__init__.py", "")
+    write(tmp_path / "pkg" / "a.py", "from pkg import b\n")
+    write(tmp_path / "pkg" / "b.py", "")
+    analysis = ImportAnalysis(str(tmp_path / "pkg"), include=[])
+    incremental = IncrementalAnalysis(analysis)
+    discover_module_files = analysis.discover_module_files
+
+    def discover_and_remove():
+        # like a file removed by a checkout right after it was found
+        module_files = discover_module_files()
+        (tmp_path / "pkg" / "a.py").unlink()
+        return module_files
+
+    write(tmp_path / "pkg" / "a.py", "from pkg import b\nimport pkg.c\n")
+    write(tmp_path / "pkg" / "c.py", "")
+    analysis.discover_module_files = discover_and_remove
+    assert incremental.refresh()
+    assert list(incremental.graph()) == []
+
+    analysis.discover_module_files = discover_module_files
+    assert incremental.refresh()
+    assert "pkg.a" not in analysis.module_index.modules
+
+    write(tmp_path / "pkg" / "a.py", "import pkg.c\n")
+    assert incremental.refresh()
+    assert list(incremental.graph()) == [("pkg.a", "pkg.c")]
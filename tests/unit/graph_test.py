@@ -0,0 +1,52 @@
+import random
+import tracemalloc
+
+from pycodegraph.graph import ImportGraph, ImportGraphBuilder
+
+
+def test_import_graph():
+    graph = ImportGraph.from_edges([("b", "a"), ("a", "c"), ("a", "b"), ("a", "b")])
+    assert graph.modules == ["a", "b", "c"]
+    assert len(graph) == 3
+    assert list(graph) == [("a", "b"), ("a", "c"), ("b", "a")]
+    assert ("a", "c") in graph
+    assert ("c", "a") not in graph
+    assert ("x", "a") not in graph
+    assert graph.imports_of("a") == ["b", "c"]
+    assert graph.imported_by("a") == ["b"]
+    assert graph.imported_by("c") == ["a"]
+    assert graph["c"].imports == []
+
+
+def test_empty_import_graph():
+    graph = ImportGraphBuilder().build()
+    assert not graph
+    assert list(graph) == []
+
+
+def test_import_graph_equality():
+    edges = [("a", "b"), ("b", "c")]
+    assert ImportGraph.from_edges(edges) == ImportGraph.from_edges(reversed(edges))
+    assert ImportGraph.from_edges(edges) != ImportGraph.from_edges(edges[:1])
+
+
+def _allocated(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def test_import_graph_uses_less_memory_than_tuple_set():
+    rng = random.Random(0)
+    modules = ["pkg.mod%d.sub%d" % (i // 10, i % 10) for i in range(5000)]
+    pairs = [(rng.choice(modules), rng.choice(modules)) for _ in range(100000)]
+
+    tuples, tuples_size = _allocated(lambda: set((src, dst) for src, dst in pairs))
+    graph, graph_size = _allocated(lambda: ImportGraph.from_edges(pairs))
+
+    assert set(graph) == tuples
+    assert graph_size < tuples_size / 2
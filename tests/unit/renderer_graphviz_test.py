@@ -1,3 +1,4 @@
+import io
 import pycodegraph.renderers.graphviz
 
 
@@ -31,3 +32,11 @@ digraph {
 }
 	""".strip()
     )
+
+
+def test_render_to_matches_render():
+    imports = [("a", "b"), ("c", "a"), ("a", "c")]
+    stream = io.StringIO()
+    pycodegraph.renderers.graphviz.render_to(stream, imports, rankdir="LR")
+    expected = pycodegraph.renderers.graphviz.render(imports, rankdir="LR")
+    assert stream.getvalue() == expected + "\n"
@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from pycodegraph.graph import ImportGraph
+from pycodegraph.renderers import get_renderer
+
+
+def test_get_renderer():
+    assert get_renderer("dot").__name__ == "pycodegraph.renderers.graphviz"
+    with pytest.raises(ValueError, match="unknown format"):
+        get_renderer("png")
+
+
+def test_render_json():
+    renderer = get_renderer("json")
+    imports = [("b", "a"), ("a", "c")]
+    data = json.loads(renderer.render(imports, highlights=["a"], clusters=True))
+    assert data == {
+        "modules": ["a", "b", "c"],
+        "imports": [["a", "c"], ["b", "a"]],
+        "highlights": ["a"],
+    }
+    assert json.loads(renderer.render(ImportGraph.from_edges(imports))) == {
+        "modules": ["a", "b", "c"],
+        "imports": [["a", "c"], ["b", "a"]],
+    }
@@ -0,0 +1,83 @@
+import io
+import json
+
+import pytest
+
+from pycodegraph.graph import ImportGraph
+from pycodegraph.renderers import get_renderer
+
+
+def test_render_lines():
+    renderer = get_renderer("lines")
+    imports = [("b", "a"), ("a", "c")]
+    assert renderer.render(imports, highlights=["a"]) == "a -> c\nb -> a"
+    assert renderer.render(ImportGraph.from_edges(imports), partial=(1, 3)) == (
+        "a -> c\nb -> a\n# partial: analyzed 1 of 3 files"
+    )
+
+
+def test_render_jsonl():
+    renderer = get_renderer("jsonl")
+    stream = io.StringIO()
+    renderer.render_to(stream, [("b", "a"), ("a", "c")], partial=(1, 3))
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == [
+        {"source": "a", "target": "c"},
+        {"source": "b", "target": "a"},
+        {"partial": True, "files_analyzed": 1, "files_total": 3},
+    ]
+
+
+class Pipe(io.StringIO):
+    flushes = 0
+
+    def seekable(self):
+        return False
+
+    def flush(self):
+        self.flushes += 1
+
+
+@pytest.mark.parametrize("name", ["lines", "jsonl"])
+def test_stream_to(name):
+    renderer = get_renderer(name)
+    stream = io.StringIO()
+    written = []
+
+    def edges():
+        # each edge is written before the next one is generated
+        yield "b", "a"
+        written.append(stream.getvalue())
+        yield "a", "c"
+
+    renderer.stream_to(stream, edges(), partial=lambda: None)
+    assert written == [renderer.render([("b", "a")]) + "\n"]
+    # in the order they are generated, instead of sorted
+    lines = [renderer.render([("b", "a")]), renderer.render([("a", "c")])]
+    assert stream.getvalue() == "\n".join(lines) + "\n"
+
+    stream = io.StringIO()
+    renderer.stream_to(stream, iter([("b", "a")]), partial=lambda: (1, 2))
+    assert stream.getvalue() == renderer.render([("b", "a")], partial=(1, 2)) + "\n"
+
+
+@pytest.mark.parametrize("name", ["lines", "jsonl"])
+def test_stream_to_flushes_pipes(name):
+    renderer = get_renderer(name)
+    edges = [("b", "a"), ("a", "c")]
+    pipe = Pipe()
+    renderer.stream_to(pipe, iter(edges))
+    assert pipe.flushes == 2
+
+    # files are not flushed after every line
+    stream = io.StringIO()
+    stream.flush = None
+    renderer.stream_to(stream, iter(edges))
+
+
+def test_render_partial_graphs():
+    imports = [("a", "b")]
+    dot = get_renderer("dot").render(imports, partial=(1, 2))
+    assert dot.splitlines()[1] == "    // partial: analyzed 1 of 2 files"
+    data = json.loads(get_renderer("json").render(imports, partial=(1, 2)))
+    assert data["partial"] is True
+    assert (data["files_analyzed"], data["files_total"]) == (1, 2)
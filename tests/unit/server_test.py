@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from pycodegraph.analysis.imports import ImportAnalysis
+from pycodegraph.server import AnalysisServer, ServerError, send_request
+
+
+@pytest.fixture
+def server(tmp_path, write):
+    write(tmp_path / "setup.py", "")
+    write(tmp_path / "pkg" / "__init__.py", "")
+    write(tmp_path / "pkg" / "a.py", "from pkg import b\n")
+    write(tmp_path / "pkg" / "b.py", "from pkg import c\n")
+    write(tmp_path / "pkg" / "c.py", "")
+    return AnalysisServer(
+        lambda root, depth: ImportAnalysis(root, depth=depth, include=[])
+    )
+
+
+def test_server_handle(server, tmp_path):
+    root = str(tmp_path / "pkg")
+    response = server.handle({"command": "imports", "root": root, "module": "pkg.a"})
+    assert response["ok"]
+    assert response["result"] == ["pkg.b"]
+
+    response = server.handle(
+        {"command": "imported_by", "root": root, "module": "pkg.c"}
+    )
+    assert response["result"] == ["pkg.b"]
+
+    response = server.handle({"command": "render", "root": root})
+    assert '"pkg.a" -> "pkg.b"' in response["result"]
+
+    response = server.handle({"command": "status"})
+    assert response["result"]["analyses"][0]["files"] == 4
+
+    for request in (
+        {"command": "nope"},
+        {"command": "imports"},
+        {"command": "imports", "root": root, "module": "pkg.nope"},
+        ["not", "an", "object"],
+    ):
+        response = server.handle(request)
+        assert not response["ok"]
+        assert response["error"]
+
+    # nothing is analyzed for requests missing a module
+    response = server.handle({"command": "imports", "root": root, "depth": 1})
+    assert response["error"] == "no module given"
+    assert len(server.handle({"command": "status"})["result"]["analyses"]) == 1
+
+
+def test_server_picks_up_changes(server, tmp_path, write):
+    root = str(tmp_path / "pkg")
+    request = {"command": "imported_by", "root": root, "module": "pkg.c"}
+    assert server.handle(request)["result"] == ["pkg.b"]
+
+    write(tmp_path / "pkg" / "a.py", "from pkg import c\nfrom pkg import b\n")
+    assert server.handle(request)["result"] == ["pkg.a", "pkg.b"]
+
+
+def test_server_socket(server, tmp_path):
+    socket_path = str(tmp_path / "server.sock")
+    thread = threading.Thread(target=server.serve, args=(socket_path,))
+    thread.start()
+    try:
+        for _ in range(100):
+            if server.running and (tmp_path / "server.sock").exists():
+                break
+            thread.join(0.01)
+        root = str(tmp_path / "pkg")
+        request = {"command": "imports", "root": root, "module": "pkg.a"}
+        assert send_request(socket_path, request) == ["pkg.b"]
+        with pytest.raises(ServerError, match="not in the graph"):
+            send_request(socket_path, dict(request, module="pkg.nope"))
+        with pytest.raises(ServerError, match="already listening"):
+            server.serve(socket_path)
+    finally:
+        send_request(socket_path, {"command": "stop"})
+        thread.join()
+    assert not (tmp_path / "server.sock").exists()
+    with pytest.raises(ServerError, match="could not connect"):
+        send_request(socket_path, {"command": "status"})
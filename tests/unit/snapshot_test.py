@@ -0,0 +1,58 @@
+import gzip
+import json
+
+import pytest
+
+from pycodegraph.graph import ImportGraph
+from pycodegraph.snapshot import (
+    SnapshotError,
+    diff_graphs,
+    load_snapshot,
+    save_snapshot,
+)
+
+
+def test_save_and_load_snapshot(tmp_path):
+    path = str(tmp_path / "graph.snapshot")
+    graph = ImportGraph.from_edges([("a", "b"), ("b", "c"), ("a", "c")], ["d"])
+    params = {"depth": 1, "include": ["x"]}
+    save_snapshot(path, graph, params)
+
+    snapshot = load_snapshot(path)
+    assert snapshot.graph == graph
+    assert snapshot.graph.modules == ["a", "b", "c", "d"]
+    assert snapshot.params == params
+    assert snapshot.created
+
+
+def test_load_snapshot_errors(tmp_path):
+    path = str(tmp_path / "graph.snapshot")
+    with pytest.raises(SnapshotError):
+        load_snapshot(path)
+
+    with open(path, "w") as filehandle:
+        filehandle.write("digraph {}")
+    with pytest.raises(SnapshotError):
+        load_snapshot(path)
+
+    save_snapshot(path, ImportGraph.from_edges([]))
+    with gzip.open(path, "rt") as filehandle:
+        data = json.load(filehandle)
+    data["version"] += 1
+    with gzip.open(path, "wt") as filehandle:
+        json.dump(data, filehandle)
+    with pytest.raises(SnapshotError, match="version"):
+        load_snapshot(path)
+
+
+def test_diff_graphs():
+    old = ImportGraph.from_edges([("a", "b"), ("b", "c")])
+    new = ImportGraph.from_edges([("a", "b"), ("a", "d")])
+    diff = diff_graphs(old, new)
+    assert diff
+    assert diff.added_modules == ["d"]
+    assert diff.removed_modules == ["c"]
+    assert diff.added_edges == [("a", "d")]
+    assert diff.removed_edges == [("b", "c")]
+    assert list(diff.lines()) == ["- c", "+ d", "- b -> c", "+ a -> d"]
+    assert not diff_graphs(old, old)